@@ -153,6 +153,13 @@ export class WebSocketClient {
         }
         break;
         
+      case 'disaster_alert_batch':
+        // Alerts uploaded in bulk arrive as one summary; high-severity ones follow as an emergency_alert
+        if (message.notification && this.onNotification) {
+          this.onNotification(message.notification as NotificationData);
+        }
+        break;
+        
       case 'emergency_alert':
         if (message.data && this.onEmergencyAlert) {
           this.onEmergencyAlert(message.data as EmergencyAlert);
@@ -172,6 +179,11 @@ export class WebSocketClient {
       case 'pong':
         // Handle ping response
         break;
+
+      case 'heartbeat':
+        // Answer so the server doesn't reap this connection as idle
+        this.send({ type: 'heartbeat_ack' });
+        break;
         
       case 'subscription_confirmed':
         console.log('Subscription confirmed:', message.data);
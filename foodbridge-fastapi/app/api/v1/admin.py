@@ -1,7 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
+from app.core.dashboard import dashboard_metrics
+from app.core.cache import response_cache
+from app.core.security import password_pool_stats
+from app.core.websocket import manager
+from app.core.expiry import expiry_tracker
 from app.models import User, DisasterAlert, FoodInventory, SystemEvent
 from app.schemas import User as UserSchema
 from typing import Dict
@@ -11,17 +17,17 @@ router = APIRouter()
 
 
 @router.post("/backup")
-async def create_backup_snapshot(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_backup_snapshot(current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """Create a lightweight backup snapshot (admin only). Returns JSON snapshot.
     This is intentionally non-destructive and safe for demos.
     """
     if current_user.role.value != "admin" and current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
 
-    users_count = db.query(User).count()
-    active_alerts = db.query(DisasterAlert).filter(DisasterAlert.is_active == True).count()
-    food_items = db.query(FoodInventory).count()
-    recent_events = db.query(SystemEvent).order_by(SystemEvent.created_at.desc()).limit(10).all()
+    users_count = await db.scalar(select(func.count()).select_from(User))
+    active_alerts = await db.scalar(select(func.count()).select_from(DisasterAlert).where(DisasterAlert.is_active == True))
+    food_items = await db.scalar(select(func.count()).select_from(FoodInventory))
+    recent_events = (await db.scalars(select(SystemEvent).order_by(SystemEvent.created_at.desc()).limit(10))).all()
 
     # Minimal serialization
     events_serialized = []
@@ -42,3 +48,36 @@ async def create_backup_snapshot(current_user=Depends(get_current_user), db: Ses
     }
 
     return snapshot
+
+
+@router.get("/metrics")
+async def get_runtime_metrics(current_user=Depends(get_current_user)):
+    """Runtime counters for the in-process caches, worker pools, WebSocket fan-out and expiry sweeper (admin only)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+    return {
+        "response_cache": response_cache.stats(),
+        "password_pool": password_pool_stats(),
+        "websocket": manager.stats(),
+        "expiry": expiry_tracker.stats()
+    }
+
+
+@router.post("/dashboard-metrics/rebuild")
+async def rebuild_dashboard_metrics(current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Recompute the materialized dashboard metrics from the tables (admin only)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+    await dashboard_metrics.rebuild(db)
+    return await dashboard_metrics.snapshot(db)
+
+
+@router.get("/dashboard-metrics/consistency")
+async def check_dashboard_metrics(current_user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    """Compare the materialized dashboard metrics with a full recompute (admin only)"""
+    if current_user.role.value != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+    return await dashboard_metrics.check_consistency(db)
@@ -1,66 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, desc, select
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
+from app.core.geo import within_radius
+from app.core.allocation import allocate
+from app.core.cache import cached
+from app.core.dashboard import dashboard_metrics
 from app.models import (
     DisasterAlert, FoodInventory, VulnerabilityAssessment, 
     FoodDistribution, User, DisasterType, AlertSeverity, VulnerabilityLevel
 )
-from app.schemas import ClimateRisk, FoodShortageRisk, DashboardMetrics, ResourceAllocation
+from app.schemas import ClimateRisk, FoodShortageRisk, DashboardMetrics, ResourceAllocation, AllocationAssignment
+import logging
 import random
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 @router.get("/dashboard", response_model=DashboardMetrics)
-async def get_dashboard_metrics(db: Session = Depends(get_db)):
+async def get_dashboard_metrics(db: AsyncSession = Depends(get_db)):
     """Get comprehensive dashboard metrics"""
-    # Active disaster alerts
-    active_alerts = db.query(DisasterAlert).filter(DisasterAlert.is_active == True).count()
-    
-    # Total food inventory
-    total_food_kg = db.query(func.sum(FoodInventory.quantity)).filter(
-        and_(
-            FoodInventory.is_available == True,
-            FoodInventory.unit.in_(['kg', 'kilograms'])
-        )
-    ).scalar() or 0
-    
-    # Communities assessed
-    communities_assessed = db.query(VulnerabilityAssessment).count()
-    
-    # Upcoming food distributions
-    upcoming_distributions = db.query(FoodDistribution).filter(
-        and_(
-            FoodDistribution.scheduled_date >= datetime.utcnow(),
-            FoodDistribution.status.in_(['planned', 'ongoing'])
-        )
-    ).count()
-    
-    # High-risk communities
-    high_risk_communities = db.query(VulnerabilityAssessment).filter(
-        VulnerabilityAssessment.overall_vulnerability.in_([VulnerabilityLevel.HIGH, VulnerabilityLevel.VERY_HIGH])
-    ).count()
-    
-    # Emergency reserves running low
-    low_reserves = db.query(FoodInventory).filter(
-        and_(
-            FoodInventory.is_emergency_reserve == True,
-            FoodInventory.is_available == True,
-            FoodInventory.quantity < 100  # Assuming 100 units is low threshold
-        )
-    ).count()
-    
-    return DashboardMetrics(
-        active_alerts=active_alerts,
-        total_food_inventory_kg=float(total_food_kg),
-        communities_assessed=communities_assessed,
-        upcoming_distributions=upcoming_distributions,
-        high_risk_communities=high_risk_communities,
-        emergency_reserves_low=low_reserves
-    )
+    return await dashboard_metrics.snapshot(db)
 
 @router.get("/climate-risk-forecast")
 async def get_climate_risk_forecast(
@@ -116,16 +79,16 @@ async def get_climate_risk_forecast(
 async def get_food_shortage_risk_analysis(
     location: Optional[str] = None,
     radius_km: Optional[float] = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[FoodShortageRisk]:
     """Analyze food shortage risk for communities"""
     # Get vulnerability assessments
-    query = db.query(VulnerabilityAssessment)
+    query = select(VulnerabilityAssessment)
     
     if location:
-        query = query.filter(VulnerabilityAssessment.location.ilike(f"%{location}%"))
+        query = query.where(VulnerabilityAssessment.location.ilike(f"%{location}%"))
     
-    assessments = query.all()
+    assessments = (await db.scalars(query)).all()
     
     shortage_risks = []
     for assessment in assessments:
@@ -186,14 +149,14 @@ async def get_resource_allocation_analysis(
     lat: Optional[float] = Query(None, description="Target area latitude"),
     lng: Optional[float] = Query(None, description="Target area longitude"),
     radius_km: float = Query(25, description="Analysis radius in kilometers"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> List[ResourceAllocation]:
     """Analyze optimal resource allocation for disaster response"""
     allocations = []
     
     # If disaster alert is specified, get its location
     if disaster_alert_id:
-        alert = db.query(DisasterAlert).filter(DisasterAlert.id == disaster_alert_id).first()
+        alert = await db.get(DisasterAlert, disaster_alert_id)
         if alert:
             lat, lng = alert.latitude, alert.longitude
             radius_km = alert.radius_km
@@ -205,98 +168,95 @@ async def get_resource_allocation_analysis(
         )
     
     # Find vulnerable communities in the area
-    vulnerable_communities = db.query(VulnerabilityAssessment).filter(
+    vulnerable_communities = (await db.scalars(select(VulnerabilityAssessment).where(
         and_(
-            VulnerabilityAssessment.latitude.between(lat - radius_km/111, lat + radius_km/111),
-            VulnerabilityAssessment.longitude.between(lng - radius_km/111, lng + radius_km/111),
+            within_radius(VulnerabilityAssessment, lat, lng, radius_km),
             VulnerabilityAssessment.overall_vulnerability.in_([
                 VulnerabilityLevel.MEDIUM, 
                 VulnerabilityLevel.HIGH, 
                 VulnerabilityLevel.VERY_HIGH
             ])
         )
-    ).all()
+    ))).all()
     
     # Find available food resources in the area
-    available_food = db.query(FoodInventory).filter(
+    available_food = (await db.scalars(select(FoodInventory).where(
         and_(
             FoodInventory.is_available == True,
-            FoodInventory.latitude.isnot(None),
-            FoodInventory.longitude.isnot(None),
-            FoodInventory.latitude.between(lat - radius_km*2/111, lat + radius_km*2/111),
-            FoodInventory.longitude.between(lng - radius_km*2/111, lng + radius_km*2/111)
+            within_radius(FoodInventory, lat, lng, radius_km * 2)
         )
-    ).all()
+    ))).all()
     
-    for community in vulnerable_communities:
-        # Estimate food needs based on population and vulnerability
-        population = community.population or 1000  # Default estimate
-        
-        # Calculate daily food requirement (assuming 2kg per person per day)
-        daily_food_kg = population * 2
-        
-        # Adjust based on vulnerability level
-        vulnerability_multiplier = {
-            VulnerabilityLevel.MEDIUM: 1.2,
-            VulnerabilityLevel.HIGH: 1.5,
-            VulnerabilityLevel.VERY_HIGH: 2.0
-        }
-        
-        required_food = daily_food_kg * vulnerability_multiplier.get(
-            community.overall_vulnerability, 1.0
-        ) * 7  # One week supply
-        
-        # Find nearby food sources
-        nearby_food = []
-        for food_item in available_food:
-            distance = _calculate_simple_distance(
-                community.latitude, community.longitude,
-                food_item.latitude, food_item.longitude
-            )
-            if distance <= radius_km * 1.5:  # Extend search radius for sources
-                nearby_food.append({
-                    'item': food_item,
-                    'distance': distance
-                })
+    # Estimate food needs based on population and vulnerability
+    vulnerability_multiplier = {
+        VulnerabilityLevel.MEDIUM: 1.2,
+        VulnerabilityLevel.HIGH: 1.5,
+        VulnerabilityLevel.VERY_HIGH: 2.0
+    }
+    required_food = [
+        # Daily requirement of 2kg per person (default population estimate
+        # of 1000), adjusted for vulnerability, for one week
+        (community.population or 1000) * 2 * vulnerability_multiplier.get(community.overall_vulnerability, 1.0) * 7
+        for community in vulnerable_communities
+    ]
+    
+    # Allocate supply to communities without counting any item twice
+    # (extend search radius for sources)
+    assignments, method = await allocate(
+        [(community.latitude, community.longitude) for community in vulnerable_communities],
+        required_food,
+        [_vulnerability_to_numeric(community.overall_vulnerability) / 25 for community in vulnerable_communities],
+        [(food_item.latitude, food_item.longitude) for food_item in available_food],
+        [food_item.quantity if food_item.unit in ['kg', 'kilograms'] else 0.0 for food_item in available_food],
+        radius_km * 1.5
+    )
+    
+    assignments_by_community = {}
+    for source_index, community_index, kg, distance in sorted(assignments, key=lambda x: x[3]):
+        food_item = available_food[source_index]
+        assignments_by_community.setdefault(community_index, []).append(AllocationAssignment(
+            inventory_id=food_item.id,
+            source=f"{food_item.owner_organization or 'Unknown'} - {food_item.location}",
+            kg=round(kg, 1),
+            distance_km=round(distance, 1)
+        ))
+    
+    for position, community in enumerate(vulnerable_communities):
+        community_assignments = assignments_by_community.get(position, [])
         
-        # Calculate available food
-        available_kg = sum(
-            item['item'].quantity for item in nearby_food 
-            if item['item'].unit in ['kg', 'kilograms']
-        )
+        # Food allocated to this community
+        available_kg = sum(assignment.kg for assignment in community_assignments)
         
-        gap_kg = max(0, required_food - available_kg)
+        gap_kg = max(0, required_food[position] - available_kg)
         
         # Determine priority based on vulnerability and gap
         if community.overall_vulnerability == VulnerabilityLevel.VERY_HIGH:
             priority = AlertSeverity.CRITICAL
-        elif community.overall_vulnerability == VulnerabilityLevel.HIGH or gap_kg > required_food * 0.5:
+        elif community.overall_vulnerability == VulnerabilityLevel.HIGH or gap_kg > required_food[position] * 0.5:
             priority = AlertSeverity.HIGH
-        elif gap_kg > required_food * 0.25:
+        elif gap_kg > required_food[position] * 0.25:
             priority = AlertSeverity.MEDIUM
         else:
             priority = AlertSeverity.LOW
         
-        # Recommend sources
-        recommended_sources = []
-        if gap_kg > 0:
-            # Sort nearby food by distance and availability
-            sorted_sources = sorted(nearby_food, key=lambda x: x['distance'])
-            for source in sorted_sources[:3]:  # Top 3 closest sources
-                recommended_sources.append(
-                    f"{source['item'].owner_organization or 'Unknown'} - "
-                    f"{source['item'].location} ({source['distance']:.1f}km)"
-                )
+        # Recommend the closest allocated sources
+        recommended_sources = [
+            f"{assignment.source} ({assignment.distance_km:.1f}km)"
+            for assignment in community_assignments[:3]
+        ]
         
         allocations.append(ResourceAllocation(
             location=f"{community.community_name}, {community.location}",
             priority=priority,
-            required_food_kg=round(required_food, 1),
+            required_food_kg=round(required_food[position], 1),
             available_food_kg=round(available_kg, 1),
             gap_kg=round(gap_kg, 1),
-            recommended_sources=recommended_sources
+            recommended_sources=recommended_sources,
+            assignments=community_assignments
         ))
     
+    logger.info(f"Resource allocation for {len(allocations)} communities solved with {method} method")
+    
     # Sort by priority
     priority_order = {
         AlertSeverity.CRITICAL: 4,
@@ -308,17 +268,18 @@ async def get_resource_allocation_analysis(
     return sorted(allocations, key=lambda x: priority_order.get(x.priority, 0), reverse=True)
 
 @router.get("/trends/climate-impact")
+@cached(tags=[DisasterAlert, FoodDistribution])
 async def get_climate_impact_trends(
     months_back: int = Query(12, description="Number of months to analyze"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Analyze climate impact trends over time"""
     # Get disaster alerts over time
     start_date = datetime.utcnow() - timedelta(days=months_back * 30)
     
-    alerts = db.query(DisasterAlert).filter(
+    alerts = (await db.scalars(select(DisasterAlert).where(
         DisasterAlert.created_at >= start_date
-    ).all()
+    ))).all()
     
     # Group by month and disaster type
     monthly_trends = {}
@@ -333,9 +294,9 @@ async def get_climate_impact_trends(
         monthly_trends[month_key][disaster_type] += 1
     
     # Calculate food distribution trends
-    distributions = db.query(FoodDistribution).filter(
+    distributions = (await db.scalars(select(FoodDistribution).where(
         FoodDistribution.scheduled_date >= start_date
-    ).all()
+    ))).all()
     
     distribution_trends = {}
     for dist in distributions:
@@ -407,10 +368,6 @@ def _generate_food_security_recommendations(assessment: VulnerabilityAssessment,
     
     return recommendations
 
-def _calculate_simple_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Calculate simple distance between coordinates"""
-    return ((lat1 - lat2) ** 2 + (lng1 - lng2) ** 2) ** 0.5 * 111  # Rough km conversion
-
 def _get_most_common_disaster(alerts: List) -> str:
     """Get the most common disaster type"""
     if not alerts:
@@ -1,22 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 from app.db.session import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash, verify_token
+from app.db.events import on_commit
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import paginate, next_page, cursor_headers
+from app.core.security import create_access_token, verify_password, verify_password_async, get_password_hash_async, verify_token
 from app.models import User, UserRole
 from app.schemas import UserCreate, User as UserSchema, Token, UserLogin
 from datetime import timedelta
+from typing import Optional
+import time
 
 router = APIRouter()
 security = HTTPBearer()
 
+# Detached copies of authenticated users, keyed by (username, token exp)
+_user_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES)
+
+@on_commit
+def _invalidate_cached_users(changes):
+    """Drop cached users whose records were written"""
+    if User.__tablename__ in changes.bulk_tables:
+        _user_cache.clear()
+        return
+    usernames = {
+        row["username"]
+        for change in changes.rows if change.table == User.__tablename__
+        for row in (change.old, change.new) if row
+    }
+    for key in _user_cache.keys():
+        if key[0] in usernames:
+            _user_cache.pop(key)
+
+def _detached_copy(user: User) -> User:
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
 @router.post("/register", response_model=UserSchema)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if user exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))
     
     if existing_user:
         raise HTTPException(
@@ -25,7 +56,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -40,16 +71,16 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login", response_model=Token)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user and return access token"""
     # Find user
-    user = db.query(User).filter(User.username == login_data.username).first()
+    user = await db.scalar(select(User).where(User.username == login_data.username))
     
     # Debug logging
     print(f"Login attempt - Username: {login_data.username}, Password: {login_data.password}")
@@ -69,8 +100,10 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
             print(f"Plain text password mismatch: '{user.hashed_password}' != '{login_data.password}'")
             # Try bcrypt verification if plain text fails
             try:
-                password_match = verify_password(login_data.password, user.hashed_password)
+                password_match = await verify_password_async(login_data.password, user.hashed_password)
                 print(f"Bcrypt verification result: {password_match}")
+            except HTTPException:
+                raise
             except Exception as e:
                 print(f"Bcrypt verification failed: {e}")
                 password_match = False
@@ -89,7 +122,7 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.username})
+    access_token = create_access_token(data={"sub": user.username, "user_id": user.id, "role": user.role.value})
     
     return {
         "access_token": access_token, 
@@ -103,7 +136,7 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
         }
     }
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     """Get current authenticated user"""
     token = credentials.credentials
     payload = verify_token(token)
@@ -115,13 +148,26 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             detail="Could not validate credentials"
         )
     
-    user = db.query(User).filter(User.username == username).first()
+    # Reuse the user loaded for an earlier request with the same token,
+    # merged into this session without a query
+    cache_key = (username, payload.get("exp"))
+    cached_user = _user_cache.get(cache_key)
+    if cached_user is not None:
+        return await db.merge(cached_user, load=False)
+    
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        _user_cache.set(cache_key, _detached_copy(user), ttl)
+    
     return user
 
 @router.get("/me", response_model=UserSchema)
@@ -131,10 +177,12 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 @router.get("/users", response_model=list[UserSchema])
 async def list_users(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List users (admin only)"""
     if current_user.role != UserRole.ADMIN:
@@ -143,5 +191,7 @@ async def list_users(
             detail="Not enough permissions"
         )
     
-    users = db.query(User).offset(skip).limit(limit).all()
+    query = paginate(select(User), User.created_at, User.id, cursor, skip, limit)
+    users, cursor = next_page((await db.scalars(query)).all(), limit, "created_at")
+    response.headers.update(cursor_headers(cursor))
     return users
\ No newline at end of file
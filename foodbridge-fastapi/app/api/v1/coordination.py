@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
+from app.core.geo import within_radius
+from app.core.cache import cached
+from app.core.serialization import FastJSONResponse, loads
 from app.models import (
     EmergencyResponse, DisasterAlert, FoodDistribution, 
     FoodInventory, User, VulnerabilityAssessment,
@@ -14,18 +17,19 @@ import json
 
 router = APIRouter()
 
+# Text columns of EmergencyResponse holding JSON lists
+EMERGENCY_RESPONSE_JSON_FIELDS = ("supplies_needed", "participating_organizations", "affected_areas")
+
 @router.post("/emergency-responses")
 async def create_emergency_response(
     response_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new emergency response coordination"""
     # Validate disaster alert exists
     if response_data.get('disaster_alert_id'):
-        alert = db.query(DisasterAlert).filter(
-            DisasterAlert.id == response_data['disaster_alert_id']
-        ).first()
+        alert = await db.get(DisasterAlert, response_data['disaster_alert_id'])
         if not alert:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -50,8 +54,8 @@ async def create_emergency_response(
     )
     
     db.add(db_response)
-    db.commit()
-    db.refresh(db_response)
+    await db.commit()
+    await db.refresh(db_response)
     
     return db_response
 
@@ -63,60 +67,44 @@ async def list_emergency_responses(
     response_type: Optional[str] = None,
     priority: Optional[AlertSeverity] = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List emergency responses with filters"""
-    query = db.query(EmergencyResponse)
+    query = select(*EmergencyResponse.__table__.columns)
     
     if status_filter:
-        query = query.filter(EmergencyResponse.status == status_filter)
+        query = query.where(EmergencyResponse.status == status_filter)
     
     if response_type:
-        query = query.filter(EmergencyResponse.response_type == response_type)
+        query = query.where(EmergencyResponse.response_type == response_type)
     
     if priority:
-        query = query.filter(EmergencyResponse.priority == priority)
+        query = query.where(EmergencyResponse.priority == priority)
     
     if active_only:
-        query = query.filter(EmergencyResponse.status.in_(['planned', 'active']))
+        query = query.where(EmergencyResponse.status.in_(['planned', 'active']))
     
-    responses = query.order_by(EmergencyResponse.created_at.desc()).offset(skip).limit(limit).all()
+    rows = await db.execute(query.order_by(EmergencyResponse.created_at.desc()).offset(skip).limit(limit))
     
     # Convert JSON fields back to objects
     result = []
-    for response in responses:
-        response_dict = {
-            "id": response.id,
-            "disaster_alert_id": response.disaster_alert_id,
-            "response_type": response.response_type,
-            "status": response.status,
-            "priority": response.priority.value,
-            "personnel_required": response.personnel_required,
-            "vehicles_required": response.vehicles_required,
-            "supplies_needed": json.loads(response.supplies_needed) if response.supplies_needed else [],
-            "estimated_duration_hours": response.estimated_duration_hours,
-            "lead_organization": response.lead_organization,
-            "participating_organizations": json.loads(response.participating_organizations) if response.participating_organizations else [],
-            "contact_person": response.contact_person,
-            "contact_phone": response.contact_phone,
-            "staging_area": response.staging_area,
-            "affected_areas": json.loads(response.affected_areas) if response.affected_areas else [],
-            "created_at": response.created_at,
-            "updated_at": response.updated_at
-        }
+    for row in rows.mappings():
+        response_dict = dict(row)
+        for field in EMERGENCY_RESPONSE_JSON_FIELDS:
+            response_dict[field] = loads(response_dict[field]) if response_dict[field] else []
         result.append(response_dict)
     
-    return result
+    return FastJSONResponse(result)
 
 @router.put("/emergency-responses/{response_id}")
 async def update_emergency_response(
     response_id: int,
     update_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update emergency response status and details"""
-    response = db.query(EmergencyResponse).filter(EmergencyResponse.id == response_id).first()
+    response = await db.get(EmergencyResponse, response_id)
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -143,30 +131,31 @@ async def update_emergency_response(
     if 'affected_areas' in update_data:
         response.affected_areas = json.dumps(update_data['affected_areas'])
     
-    db.commit()
-    db.refresh(response)
+    await db.commit()
+    await db.refresh(response)
     return response
 
 @router.get("/organizations")
+@cached(tags=[EmergencyResponse, User])
 async def list_participating_organizations(
     response_type: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List organizations that have participated in emergency responses"""
-    query = db.query(EmergencyResponse.lead_organization).distinct()
+    query = select(EmergencyResponse.lead_organization).distinct()
     
     if response_type:
-        query = query.filter(EmergencyResponse.response_type == response_type)
+        query = query.where(EmergencyResponse.response_type == response_type)
     
-    organizations = [org[0] for org in query.all() if org[0]]
+    organizations = [org[0] for org in (await db.execute(query)).all() if org[0]]
     
     # Also get organizations from user registrations
-    user_orgs = db.query(User.organization).distinct().filter(
+    user_orgs = (await db.execute(select(User.organization).distinct().where(
         and_(
             User.organization.isnot(None),
             User.role.in_([UserRole.NGO, UserRole.EMERGENCY_RESPONDER])
         )
-    ).all()
+    ))).all()
     
     organizations.extend([org[0] for org in user_orgs if org[0] and org[0] not in organizations])
     
@@ -178,13 +167,13 @@ async def get_coordination_matrix(
     lat: Optional[float] = Query(None, description="Center latitude"),
     lng: Optional[float] = Query(None, description="Center longitude"),
     radius_km: float = Query(50, description="Analysis radius"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get coordination matrix showing resources, needs, and response capacity"""
     
     # If disaster alert specified, use its location
     if disaster_alert_id:
-        alert = db.query(DisasterAlert).filter(DisasterAlert.id == disaster_alert_id).first()
+        alert = await db.get(DisasterAlert, disaster_alert_id)
         if alert:
             lat, lng = alert.latitude, alert.longitude
             radius_km = alert.radius_km
@@ -196,39 +185,30 @@ async def get_coordination_matrix(
         )
     
     # Get vulnerable communities in area
-    vulnerable_communities = db.query(VulnerabilityAssessment).filter(
-        and_(
-            VulnerabilityAssessment.latitude.between(lat - radius_km/111, lat + radius_km/111),
-            VulnerabilityAssessment.longitude.between(lng - radius_km/111, lng + radius_km/111)
-        )
-    ).all()
+    vulnerable_communities = (await db.scalars(select(VulnerabilityAssessment).where(
+        within_radius(VulnerabilityAssessment, lat, lng, radius_km)
+    ))).all()
     
     # Get available resources (food inventory)
-    available_resources = db.query(FoodInventory).filter(
+    available_resources = (await db.scalars(select(FoodInventory).where(
         and_(
             FoodInventory.is_available == True,
-            FoodInventory.latitude.isnot(None),
-            FoodInventory.longitude.isnot(None),
-            FoodInventory.latitude.between(lat - radius_km*1.5/111, lat + radius_km*1.5/111),
-            FoodInventory.longitude.between(lng - radius_km*1.5/111, lng + radius_km*1.5/111)
+            within_radius(FoodInventory, lat, lng, radius_km * 1.5)
         )
-    ).all()
+    ))).all()
     
     # Get active emergency responses
-    active_responses = db.query(EmergencyResponse).filter(
+    active_responses = (await db.scalars(select(EmergencyResponse).where(
         EmergencyResponse.status.in_(['planned', 'active'])
-    ).all()
+    ))).all()
     
     # Get participating organizations and their capacity
-    organizations = db.query(User).filter(
+    organizations = (await db.scalars(select(User).where(
         and_(
             User.role.in_([UserRole.NGO, UserRole.EMERGENCY_RESPONDER]),
-            User.latitude.isnot(None),
-            User.longitude.isnot(None),
-            User.latitude.between(lat - radius_km*2/111, lat + radius_km*2/111),
-            User.longitude.between(lng - radius_km*2/111, lng + radius_km*2/111)
+            within_radius(User, lat, lng, radius_km * 2)
         )
-    ).all()
+    ))).all()
     
     # Calculate coordination metrics
     coordination_matrix = {
@@ -300,7 +280,7 @@ async def get_coordination_matrix(
 async def coordinate_emergency_response(
     coordination_request: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Coordinate emergency response based on needs and available resources"""
     
@@ -328,12 +308,12 @@ async def coordinate_emergency_response(
     }
     
     # Find matching organizations
-    suitable_orgs = db.query(User).filter(
+    suitable_orgs = (await db.scalars(select(User).where(
         and_(
             User.role.in_([UserRole.NGO, UserRole.EMERGENCY_RESPONDER]),
             User.is_active == True
         )
-    ).all()
+    ))).all()
     
     # Generate coordination actions
     for org in suitable_orgs[:5]:  # Limit to top 5 organizations
@@ -348,9 +328,9 @@ async def coordinate_emergency_response(
         plan["coordination_actions"].append(action)
     
     # Find available resources
-    available_resources = db.query(FoodInventory).filter(
+    available_resources = (await db.scalars(select(FoodInventory).where(
         FoodInventory.is_available == True
-    ).limit(10).all()
+    ).limit(10))).all()
     
     resource_matches = []
     for resource in available_resources:
@@ -381,13 +361,13 @@ async def coordinate_emergency_response(
 async def get_communication_tree(
     emergency_response_id: Optional[int] = None,
     disaster_alert_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get communication tree for emergency response coordination"""
     
     # Find relevant users and organizations
     if emergency_response_id:
-        response = db.query(EmergencyResponse).filter(EmergencyResponse.id == emergency_response_id).first()
+        response = await db.get(EmergencyResponse, emergency_response_id)
         if not response:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -395,13 +375,13 @@ async def get_communication_tree(
             )
     
     # Get emergency responders and NGOs
-    responders = db.query(User).filter(
+    responders = (await db.scalars(select(User).where(
         and_(
             User.role.in_([UserRole.EMERGENCY_RESPONDER, UserRole.NGO, UserRole.ADMIN]),
             User.is_active == True,
             User.phone.isnot(None)
         )
-    ).all()
+    ))).all()
     
     # Build communication tree
     comm_tree = {
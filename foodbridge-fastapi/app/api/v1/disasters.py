@@ -1,22 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select, func, case
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
 from app.models import DisasterAlert, User, DisasterType, AlertSeverity, Notification, NotificationType, NotificationPriority
 from app.schemas import DisasterAlertCreate, DisasterAlertUpdate, DisasterAlert as DisasterAlertSchema
 from app.core.websocket import manager
-import math
+from app.core.geo import within_radius, nearest_within, geocell_for
+from app.core.cache import cached
+from app.core.serialization import FastJSONResponse, fetch_rows, schema_columns
+from app.core.export import ExportFormat, export_response
+from app.core.bulk import bulk_insert, read_records
+from app.core.pagination import paginate, next_page, cursor_headers
 
 router = APIRouter()
 
+# Alerts listed in the broadcast for a bulk upload; its count covers the rest
+BATCH_BROADCAST_ALERTS = 50
+
 @router.post("/alerts", response_model=DisasterAlertSchema)
 async def create_disaster_alert(
     alert_data: DisasterAlertCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new disaster alert"""
     db_alert = DisasterAlert(
@@ -25,8 +33,8 @@ async def create_disaster_alert(
     )
     
     db.add(db_alert)
-    db.commit()
-    db.refresh(db_alert)
+    await db.commit()
+    await db.refresh(db_alert)
     
     # Create a broadcast notification for all users
     org_info = f" by {current_user.organization}" if hasattr(current_user, 'organization') and current_user.organization else f" by {current_user.username}"
@@ -41,8 +49,8 @@ async def create_disaster_alert(
     )
     
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
+    await db.refresh(notification)
     
     # Broadcast real-time notification to all connected users
     await manager.broadcast({
@@ -69,7 +77,7 @@ async def create_disaster_alert(
             "priority": notification.priority,
             "category": notification.category
         }
-    })
+    }, latitude=alert_data.latitude, longitude=alert_data.longitude)
     
     # Also send as emergency alert for high/critical severity
     if alert_data.severity in ["high", "critical"]:
@@ -82,55 +90,143 @@ async def create_disaster_alert(
             "location": alert_data.location,
             "latitude": alert_data.latitude,
             "longitude": alert_data.longitude,
-            "emergency_contact": alert_data.emergency_contact,
-            "response_instructions": alert_data.response_instructions,
+            "emergency_contact": getattr(alert_data, 'emergency_contact', None),
+            "response_instructions": getattr(alert_data, 'response_instructions', None),
             "created_at": db_alert.created_at.isoformat()
         })
     
     return db_alert
 
+@router.post("/alerts/bulk")
+async def bulk_create_disaster_alerts(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many disaster alerts from a JSON array or NDJSON body.
+
+    Rows are validated and inserted in chunks; the response has each row's
+    new id, or null and its errors. The whole upload raises one notification
+    and one broadcast rather than one per alert.
+    """
+    def values(alert: DisasterAlertCreate) -> dict:
+        return {**alert.dict(), "created_by": current_user.id, "geocell": geocell_for(alert.latitude, alert.longitude)}
+    
+    result = await bulk_insert(db, DisasterAlert, DisasterAlertCreate, read_records(request), values)
+    if result.inserted:
+        await announce_alert_batch(db, result.inserted, current_user)
+    return result.response()
+
+async def announce_alert_batch(db: AsyncSession, alerts: List[Dict], current_user: User):
+    """Notify and broadcast a batch of new alerts as one aggregated message"""
+    severe = [alert for alert in alerts if alert["severity"] in ["high", "critical"]]
+    org_info = f" by {current_user.organization}" if hasattr(current_user, 'organization') and current_user.organization else f" by {current_user.username}"
+    summary = "; ".join(f"{alert['title']} ({alert['location']})" for alert in alerts[:5])
+    if len(alerts) > 5:
+        summary += f" and {len(alerts) - 5} more"
+    
+    notification = Notification(
+        title=f"🚨 {len(alerts)} New Disaster Alerts{org_info}",
+        message=summary,
+        type=NotificationType.EMERGENCY,
+        priority=NotificationPriority.HIGH if severe else NotificationPriority.MEDIUM,
+        category="disaster_alert",
+        target_user_id=None,  # Broadcast to all users
+        action_url="/disasters/alerts"
+    )
+    
+    db.add(notification)
+    await db.commit()
+    await db.refresh(notification)
+    
+    await manager.broadcast({
+        "type": "disaster_alert_batch",
+        "data": {
+            "count": len(alerts),
+            "alerts": [
+                {
+                    "id": alert["id"],
+                    "title": alert["title"],
+                    "disaster_type": alert["disaster_type"].value,
+                    "severity": alert["severity"].value,
+                    "location": alert["location"],
+                    "latitude": alert["latitude"],
+                    "longitude": alert["longitude"],
+                    "created_at": alert["created_at"].isoformat()
+                }
+                for alert in alerts[:BATCH_BROADCAST_ALERTS]
+            ],
+            "created_by": current_user.username,
+            "created_by_role": current_user.role.value,
+            "created_by_organization": getattr(current_user, 'organization', None)
+        },
+        "notification": {
+            "id": notification.id,
+            "title": notification.title,
+            "message": notification.message,
+            "type": notification.type,
+            "priority": notification.priority,
+            "category": notification.category
+        }
+    })
+    
+    if severe:
+        await manager.send_emergency_alert({
+            "title": f"{len(severe)} high-severity disaster alerts",
+            "message": "; ".join(alert["title"] for alert in severe[:5]),
+            "severity": "critical" if any(alert["severity"] == "critical" for alert in severe) else "high",
+            "alert_ids": [alert["id"] for alert in severe],
+            "created_at": datetime.utcnow().isoformat()
+        })
+
 @router.get("/alerts", response_model=List[DisasterAlertSchema])
+@cached(tags=[DisasterAlert], rendered=True)
 async def list_disaster_alerts(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     disaster_type: Optional[DisasterType] = None,
     severity: Optional[AlertSeverity] = None,
     active_only: bool = True,
     lat: Optional[float] = Query(None, description="Latitude for location-based filtering"),
     lng: Optional[float] = Query(None, description="Longitude for location-based filtering"),
     radius_km: Optional[float] = Query(None, description="Radius in kilometers for location-based filtering"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List disaster alerts with optional filters"""
-    query = db.query(DisasterAlert)
+    query = select(DisasterAlert)
     
     # Apply filters
     if active_only:
-        query = query.filter(DisasterAlert.is_active == True)
+        query = query.where(DisasterAlert.is_active == True)
     
     if disaster_type:
-        query = query.filter(DisasterAlert.disaster_type == disaster_type)
+        query = query.where(DisasterAlert.disaster_type == disaster_type)
     
     if severity:
-        query = query.filter(DisasterAlert.severity == severity)
+        query = query.where(DisasterAlert.severity == severity)
     
     # Location-based filtering
     if lat is not None and lng is not None and radius_km is not None:
-        # Simple distance calculation (for more accurate results, use PostGIS)
-        query = query.filter(
-            and_(
-                DisasterAlert.latitude.between(lat - radius_km/111, lat + radius_km/111),
-                DisasterAlert.longitude.between(lng - radius_km/111, lng + radius_km/111)
-            )
-        )
+        query = query.where(within_radius(DisasterAlert, lat, lng, radius_km))
     
-    alerts = query.order_by(DisasterAlert.created_at.desc()).offset(skip).limit(limit).all()
-    return alerts
+    query = paginate(query, DisasterAlert.created_at, DisasterAlert.id, cursor, skip, limit)
+    rows, cursor = next_page(await fetch_rows(db, query, DisasterAlertSchema), limit, "created_at")
+    return FastJSONResponse(rows, headers=cursor_headers(cursor))
+
+@router.get("/alerts/export")
+async def export_disaster_alerts(
+    format: ExportFormat = ExportFormat.NDJSON,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every disaster alert as NDJSON, CSV or gzipped CSV"""
+    query = select(*schema_columns(DisasterAlert, DisasterAlertSchema)).order_by(DisasterAlert.id)
+    return export_response(query, format, "disaster_alerts")
 
 @router.get("/alerts/{alert_id}", response_model=DisasterAlertSchema)
-async def get_disaster_alert(alert_id: int, db: Session = Depends(get_db)):
+async def get_disaster_alert(alert_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific disaster alert"""
-    alert = db.query(DisasterAlert).filter(DisasterAlert.id == alert_id).first()
+    alert = await db.get(DisasterAlert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -143,10 +239,10 @@ async def update_disaster_alert(
     alert_id: int,
     alert_update: DisasterAlertUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a disaster alert"""
-    alert = db.query(DisasterAlert).filter(DisasterAlert.id == alert_id).first()
+    alert = await db.get(DisasterAlert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -165,18 +261,18 @@ async def update_disaster_alert(
     for field, value in update_data.items():
         setattr(alert, field, value)
     
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
     return alert
 
 @router.delete("/alerts/{alert_id}")
 async def delete_disaster_alert(
     alert_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a disaster alert"""
-    alert = db.query(DisasterAlert).filter(DisasterAlert.id == alert_id).first()
+    alert = await db.get(DisasterAlert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -190,8 +286,8 @@ async def delete_disaster_alert(
             detail="Not enough permissions to delete this alert"
         )
     
-    db.delete(alert)
-    db.commit()
+    await db.delete(alert)
+    await db.commit()
     return {"message": "Disaster alert deleted successfully"}
 
 @router.get("/alerts/nearby/{lat}/{lng}")
@@ -200,77 +296,49 @@ async def get_nearby_alerts(
     lng: float,
     radius_km: float = 50,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get disaster alerts near a specific location"""
-    query = db.query(DisasterAlert)
+    query = select(DisasterAlert).where(within_radius(DisasterAlert, lat, lng, radius_km))
     
     if active_only:
-        query = query.filter(DisasterAlert.is_active == True)
+        query = query.where(DisasterAlert.is_active == True)
     
-    # Simple distance calculation
-    alerts = query.filter(
-        and_(
-            DisasterAlert.latitude.between(lat - radius_km/111, lat + radius_km/111),
-            DisasterAlert.longitude.between(lng - radius_km/111, lng + radius_km/111)
-        )
-    ).all()
-    
-    # Calculate actual distances and sort
-    nearby_alerts = []
-    for alert in alerts:
-        distance = calculate_distance(lat, lng, alert.latitude, alert.longitude)
-        if distance <= radius_km:
-            alert_dict = {
-                "alert": alert,
-                "distance_km": round(distance, 2)
-            }
-            nearby_alerts.append(alert_dict)
-    
-    # Sort by distance
-    nearby_alerts.sort(key=lambda x: x["distance_km"])
-    
-    return nearby_alerts
-
-def calculate_distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    """Calculate distance between two points using Haversine formula"""
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = math.radians(lat1)
-    lng1_rad = math.radians(lng1)
-    lat2_rad = math.radians(lat2)
-    lng2_rad = math.radians(lng2)
+    alerts = (await db.scalars(query)).all()
     
-    dlat = lat2_rad - lat1_rad
-    dlng = lng2_rad - lng1_rad
-    
-    a = math.sin(dlat/2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlng/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+    # Calculate actual distances, nearest first
+    return [
+        {"alert": DisasterAlertSchema.model_validate(alert), "distance_km": round(distance, 2)}
+        for alert, distance in nearest_within(lat, lng, radius_km, alerts)
+    ]
 
 @router.get("/stats/overview")
-async def get_disaster_stats(db: Session = Depends(get_db)):
+async def get_disaster_stats(db: AsyncSession = Depends(get_db)):
     """Get overview statistics for disaster alerts"""
-    total_alerts = db.query(DisasterAlert).count()
-    active_alerts = db.query(DisasterAlert).filter(DisasterAlert.is_active == True).count()
+    # One pass over the (is_active, disaster_type, created_at) index: counts per
+    # type and status, with the last 7 days summed alongside
+    week_ago = datetime.utcnow() - timedelta(days=7)
+    rows = (await db.execute(
+        select(
+            DisasterAlert.disaster_type,
+            DisasterAlert.is_active,
+            func.count().label("alerts"),
+            func.sum(case((DisasterAlert.created_at >= week_ago, 1), else_=0)).label("recent")
+        ).group_by(DisasterAlert.is_active, DisasterAlert.disaster_type)
+    )).all()
     
-    # Alerts by type
-    alerts_by_type = {}
-    for disaster_type in DisasterType:
-        count = db.query(DisasterAlert).filter(
-            and_(
-                DisasterAlert.disaster_type == disaster_type,
-                DisasterAlert.is_active == True
-            )
-        ).count()
-        alerts_by_type[disaster_type.value] = count
+    total_alerts = 0
+    active_alerts = 0
+    recent_alerts = 0
     
-    # Recent alerts (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_alerts = db.query(DisasterAlert).filter(
-        DisasterAlert.created_at >= week_ago
-    ).count()
+    # Alerts by type
+    alerts_by_type = {disaster_type.value: 0 for disaster_type in DisasterType}
+    for row in rows:
+        total_alerts += row.alerts
+        recent_alerts += row.recent or 0
+        if row.is_active:
+            active_alerts += row.alerts
+            alerts_by_type[row.disaster_type.value] += row.alerts
     
     return {
         "total_alerts": total_alerts,
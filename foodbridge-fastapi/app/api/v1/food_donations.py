@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 from datetime import datetime, timedelta
 
@@ -7,6 +8,7 @@ from ...db.session import get_db
 from ...models import FoodDonation, User, ProduceType, DonationStatus, DonationUrgency
 from .auth import get_current_user
 from ...core.websocket import websocket_manager
+from ...core.aggregation import donation_summary_query
 
 router = APIRouter()
 
@@ -111,7 +113,7 @@ class FoodDonationResponse(BaseModel):
 @router.post("/", response_model=FoodDonationResponse)
 async def create_food_donation(
     donation: FoodDonationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new food donation offer (farmers only)"""
@@ -151,8 +153,8 @@ async def create_food_donation(
     )
     
     db.add(db_donation)
-    db.commit()
-    db.refresh(db_donation)
+    await db.commit()
+    await db.refresh(db_donation)
     
     # Broadcast new donation to connected users
     await websocket_manager.broadcast_to_role_based_channels({
@@ -168,7 +170,7 @@ async def create_food_donation(
             "farmer_name": current_user.full_name,
             "farmer_organization": current_user.organization
         }
-    })
+    }, latitude=db_donation.latitude, longitude=db_donation.longitude)
     
     # Prepare response
     response_data = FoodDonationResponse.from_orm(db_donation)
@@ -186,27 +188,27 @@ async def get_food_donations(
     available_only: bool = Query(True, description="Show only available donations"),
     limit: int = Query(50, le=100, description="Maximum number of donations to return"),
     offset: int = Query(0, ge=0, description="Number of donations to skip"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of food donations with filters"""
     
-    query = db.query(FoodDonation).filter(FoodDonation.is_active == True)
+    query = select(FoodDonation).where(FoodDonation.is_active == True)
     
     # Apply filters
     if available_only:
-        query = query.filter(FoodDonation.status == DonationStatus.AVAILABLE)
+        query = query.where(FoodDonation.status == DonationStatus.AVAILABLE)
     elif status:
-        query = query.filter(FoodDonation.status == status)
+        query = query.where(FoodDonation.status == status)
     
     if produce_type:
-        query = query.filter(FoodDonation.produce_type == produce_type)
+        query = query.where(FoodDonation.produce_type == produce_type)
     
     if urgency:
-        query = query.filter(FoodDonation.urgency == urgency)
+        query = query.where(FoodDonation.urgency == urgency)
     
     if location:
-        query = query.filter(FoodDonation.farm_location.ilike(f"%{location}%"))
+        query = query.where(FoodDonation.farm_location.ilike(f"%{location}%"))
     
     # Order by urgency and creation date
     query = query.order_by(
@@ -215,7 +217,7 @@ async def get_food_donations(
         FoodDonation.created_at.desc()
     )
     
-    donations = query.offset(offset).limit(limit).all()
+    donations = (await db.scalars(query.offset(offset).limit(limit))).all()
     
     # Enrich with farmer and claimed_by information
     result = []
@@ -223,14 +225,14 @@ async def get_food_donations(
         response_data = FoodDonationResponse.from_orm(donation)
         
         # Add farmer info
-        farmer = db.query(User).filter(User.id == donation.farmer_id).first()
+        farmer = await db.get(User, donation.farmer_id)
         if farmer:
             response_data.farmer_name = farmer.full_name
             response_data.farmer_organization = farmer.organization
         
         # Add claimed_by info
         if donation.claimed_by:
-            claimed_by = db.query(User).filter(User.id == donation.claimed_by).first()
+            claimed_by = await db.get(User, donation.claimed_by)
             if claimed_by:
                 response_data.claimed_by_name = claimed_by.full_name
                 response_data.claimed_by_organization = claimed_by.organization
@@ -242,15 +244,15 @@ async def get_food_donations(
 @router.get("/{donation_id}", response_model=FoodDonationResponse)
 async def get_food_donation(
     donation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific food donation by ID"""
     
-    donation = db.query(FoodDonation).filter(
+    donation = await db.scalar(select(FoodDonation).where(
         FoodDonation.id == donation_id,
         FoodDonation.is_active == True
-    ).first()
+    ))
     
     if not donation:
         raise HTTPException(status_code=404, detail="Food donation not found")
@@ -258,13 +260,13 @@ async def get_food_donation(
     # Prepare response with farmer info
     response_data = FoodDonationResponse.from_orm(donation)
     
-    farmer = db.query(User).filter(User.id == donation.farmer_id).first()
+    farmer = await db.get(User, donation.farmer_id)
     if farmer:
         response_data.farmer_name = farmer.full_name
         response_data.farmer_organization = farmer.organization
     
     if donation.claimed_by:
-        claimed_by = db.query(User).filter(User.id == donation.claimed_by).first()
+        claimed_by = await db.get(User, donation.claimed_by)
         if claimed_by:
             response_data.claimed_by_name = claimed_by.full_name
             response_data.claimed_by_organization = claimed_by.organization
@@ -275,15 +277,15 @@ async def get_food_donation(
 async def update_food_donation(
     donation_id: int,
     donation_update: FoodDonationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a food donation (farmers can update their own donations)"""
     
-    donation = db.query(FoodDonation).filter(
+    donation = await db.scalar(select(FoodDonation).where(
         FoodDonation.id == donation_id,
         FoodDonation.is_active == True
-    ).first()
+    ))
     
     if not donation:
         raise HTTPException(status_code=404, detail="Food donation not found")
@@ -309,12 +311,12 @@ async def update_food_donation(
     
     donation.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(donation)
+    await db.commit()
+    await db.refresh(donation)
     
     # Prepare response
     response_data = FoodDonationResponse.from_orm(donation)
-    farmer = db.query(User).filter(User.id == donation.farmer_id).first()
+    farmer = await db.get(User, donation.farmer_id)
     if farmer:
         response_data.farmer_name = farmer.full_name
         response_data.farmer_organization = farmer.organization
@@ -324,7 +326,7 @@ async def update_food_donation(
 @router.post("/{donation_id}/claim")
 async def claim_food_donation(
     donation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Claim a food donation (NGOs and emergency responders only)"""
@@ -336,10 +338,10 @@ async def claim_food_donation(
             detail="Only NGOs and emergency responders can claim food donations"
         )
     
-    donation = db.query(FoodDonation).filter(
+    donation = await db.scalar(select(FoodDonation).where(
         FoodDonation.id == donation_id,
         FoodDonation.is_active == True
-    ).first()
+    ))
     
     if not donation:
         raise HTTPException(status_code=404, detail="Food donation not found")
@@ -356,7 +358,7 @@ async def claim_food_donation(
     donation.claimed_at = datetime.utcnow()
     donation.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     # Notify farmer about the claim
     await websocket_manager.send_to_user(donation.farmer_id, {
@@ -376,15 +378,15 @@ async def claim_food_donation(
 @router.post("/{donation_id}/collect")
 async def mark_donation_collected(
     donation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Mark a donation as collected"""
     
-    donation = db.query(FoodDonation).filter(
+    donation = await db.scalar(select(FoodDonation).where(
         FoodDonation.id == donation_id,
         FoodDonation.is_active == True
-    ).first()
+    ))
     
     if not donation:
         raise HTTPException(status_code=404, detail="Food donation not found")
@@ -407,22 +409,22 @@ async def mark_donation_collected(
     donation.collected_at = datetime.utcnow()
     donation.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Food donation marked as collected", "donation_id": donation_id}
 
 @router.delete("/{donation_id}")
 async def cancel_food_donation(
     donation_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Cancel/delete a food donation"""
     
-    donation = db.query(FoodDonation).filter(
+    donation = await db.scalar(select(FoodDonation).where(
         FoodDonation.id == donation_id,
         FoodDonation.is_active == True
-    ).first()
+    ))
     
     if not donation:
         raise HTTPException(status_code=404, detail="Food donation not found")
@@ -458,42 +460,18 @@ async def cancel_food_donation(
     donation.is_active = False
     donation.updated_at = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Food donation cancelled successfully", "donation_id": donation_id}
 
 # Statistics endpoint
 @router.get("/stats/summary")
 async def get_donation_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get food donation statistics"""
     
-    total_donations = db.query(FoodDonation).filter(FoodDonation.is_active == True).count()
-    available_donations = db.query(FoodDonation).filter(
-        FoodDonation.is_active == True,
-        FoodDonation.status == DonationStatus.AVAILABLE
-    ).count()
-    claimed_donations = db.query(FoodDonation).filter(
-        FoodDonation.is_active == True,
-        FoodDonation.status == DonationStatus.CLAIMED
-    ).count()
-    collected_donations = db.query(FoodDonation).filter(
-        FoodDonation.is_active == True,
-        FoodDonation.status == DonationStatus.COLLECTED
-    ).count()
-    urgent_donations = db.query(FoodDonation).filter(
-        FoodDonation.is_active == True,
-        FoodDonation.status == DonationStatus.AVAILABLE,
-        FoodDonation.is_urgent == True
-    ).count()
-    
-    return {
-        "total_donations": total_donations,
-        "available_donations": available_donations,
-        "claimed_donations": claimed_donations,
-        "collected_donations": collected_donations,
-        "urgent_donations": urgent_donations,
-        "completion_rate": round((collected_donations / max(total_donations, 1)) * 100, 1)
-    }
\ No newline at end of file
+    summary = (await db.execute(donation_summary_query())).one()._asdict()
+    summary["completion_rate"] = round((summary["collected_donations"] / max(summary["total_donations"], 1)) * 100, 1)
+    return summary
\ No newline at end of file
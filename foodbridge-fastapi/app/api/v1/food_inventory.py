@@ -1,10 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select
 from typing import List, Optional
 from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
+from app.core.geo import within_radius, nearest_within, geocell_for
+from app.core.cache import cached
+from app.core.serialization import FastJSONResponse, fetch_rows, schema_columns
+from app.core.export import ExportFormat, export_response
+from app.core.bulk import bulk_insert, read_records
+from app.core.inventory_sync import read_feed, plan_sync, apply_sync
+from app.core.websocket import manager
+from app.core.pagination import paginate, next_page, cursor_headers
+from app.core.aggregation import inventory_summary_query, inventory_summary, distribution_summary_query
+from app.core.config import settings
+from app.core.expiry import expiry_tracker
 from app.models import FoodInventory, User, FoodDistribution
 from app.schemas import (
     FoodInventoryCreate, 
@@ -22,21 +33,94 @@ router = APIRouter()
 async def create_food_inventory(
     inventory_data: FoodInventoryCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Add new food inventory item"""
     db_inventory = FoodInventory(**inventory_data.dict())
     
     db.add(db_inventory)
-    db.commit()
-    db.refresh(db_inventory)
+    await db.commit()
+    await db.refresh(db_inventory)
     
     return db_inventory
 
+@router.post("/inventory/bulk")
+async def bulk_create_food_inventory(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Add many food inventory items from a JSON array or NDJSON body.
+
+    Rows are validated and inserted in chunks; the response has each row's
+    new id, or null and its errors.
+    """
+    def values(item: FoodInventoryCreate) -> dict:
+        return {**item.dict(), "geocell": geocell_for(item.latitude, item.longitude)}
+    
+    result = await bulk_insert(db, FoodInventory, FoodInventoryCreate, read_records(request), values)
+    return result.response()
+
+@router.post("/inventory/sync")
+async def sync_food_inventory(
+    request: Request,
+    owner_organization: str = Query(..., description="Organization whose inventory the feed lists in full"),
+    dry_run: bool = Query(False, description="Report what would change without writing"),
+    allow_empty: bool = Query(False, description="Accept a feed without valid items, marking all of the organization's items unavailable"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Reconcile an organization's inventory with a full warehouse feed.
+
+    The body is a JSON array or NDJSON of items, each with its external_id.
+    New items are inserted, existing ones get only their changed fields
+    updated and items missing from the feed are marked unavailable, so
+    re-sending the same feed writes nothing. Only members of the
+    organization and admins may sync it, and a feed without valid items is
+    refused unless allow_empty is set, so a truncated upload can't wipe
+    the organization's stock.
+    """
+    # Check permissions (only the organization itself or an admin can replace its inventory)
+    if current_user.organization != owner_organization and current_user.role.value != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to sync this organization's inventory"
+        )
+    
+    feed = await read_feed(read_records(request), owner_organization)
+    if not feed.lines and not allow_empty and not dry_run:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Feed has no valid items; set allow_empty to mark all of this organization's inventory unavailable"
+        )
+    plan = await plan_sync(db, owner_organization, feed)
+    if plan and not dry_run:
+        await apply_sync(db, plan)
+        counts = plan.counts()
+        await manager.send_system_update({
+            "event_type": "inventory_synced",
+            "data_type": "food_inventory",
+            "record_id": None,
+            "change_type": "sync",
+            "description": f"{owner_organization} inventory synced: {counts['inserted']} added, "
+                           f"{counts['updated']} updated, {counts['deleted']} removed"
+        })
+    
+    return {
+        "owner_organization": owner_organization,
+        "dry_run": dry_run,
+        "received": feed.received,
+        **plan.counts(),
+        "failed": len(feed.errors),
+        "errors": feed.errors
+    }
+
 @router.get("/inventory", response_model=List[FoodInventorySchema])
+@cached(tags=[FoodInventory], rendered=True)
 async def list_food_inventory(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     category: Optional[str] = None,
     location: Optional[str] = None,
     available_only: bool = True,
@@ -45,27 +129,27 @@ async def list_food_inventory(
     lat: Optional[float] = Query(None, description="Latitude for location-based search"),
     lng: Optional[float] = Query(None, description="Longitude for location-based search"),
     radius_km: Optional[float] = Query(50, description="Search radius in kilometers"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List food inventory with optional filters"""
-    query = db.query(FoodInventory)
+    query = select(FoodInventory)
     
     # Apply filters
     if available_only:
-        query = query.filter(FoodInventory.is_available == True)
+        query = query.where(FoodInventory.is_available == True)
     
     if emergency_only:
-        query = query.filter(FoodInventory.is_emergency_reserve == True)
+        query = query.where(FoodInventory.is_emergency_reserve == True)
     
     if category:
-        query = query.filter(FoodInventory.category.ilike(f"%{category}%"))
+        query = query.where(FoodInventory.category.ilike(f"%{category}%"))
     
     if location:
-        query = query.filter(FoodInventory.location.ilike(f"%{location}%"))
+        query = query.where(FoodInventory.location.ilike(f"%{location}%"))
     
     if expiring_soon_days is not None:
         expiry_threshold = datetime.utcnow() + timedelta(days=expiring_soon_days)
-        query = query.filter(
+        query = query.where(
             and_(
                 FoodInventory.expiry_date.isnot(None),
                 FoodInventory.expiry_date <= expiry_threshold
@@ -74,20 +158,45 @@ async def list_food_inventory(
     
     # Location-based filtering
     if lat is not None and lng is not None:
-        query = query.filter(
-            and_(
-                FoodInventory.latitude.between(lat - radius_km/111, lat + radius_km/111),
-                FoodInventory.longitude.between(lng - radius_km/111, lng + radius_km/111)
-            )
-        )
+        query = query.where(within_radius(FoodInventory, lat, lng, radius_km))
     
-    inventory = query.order_by(FoodInventory.created_at.desc()).offset(skip).limit(limit).all()
-    return inventory
+    query = paginate(query, FoodInventory.created_at, FoodInventory.id, cursor, skip, limit)
+    rows, cursor = next_page(await fetch_rows(db, query, FoodInventorySchema), limit, "created_at")
+    return FastJSONResponse(rows, headers=cursor_headers(cursor))
+
+@router.get("/inventory/export")
+async def export_food_inventory(
+    format: ExportFormat = ExportFormat.NDJSON,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every food inventory item as NDJSON, CSV or gzipped CSV"""
+    query = select(*schema_columns(FoodInventory, FoodInventorySchema)).order_by(FoodInventory.id)
+    return export_response(query, format, "food_inventory")
+
+@router.get("/inventory/expiring-next")
+async def get_expiring_next(
+    limit: int = Query(20, ge=1, le=500),
+    within_days: Optional[int] = Query(None, ge=0, le=settings.EXPIRY_HORIZON_DAYS,
+                                       description="Only items expiring within X days"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Available items expiring soonest, served from the in-memory expiry heap"""
+    return await expiry_tracker.expiring_next(db, limit, within_days)
+
+async def announce_expired_inventory(count: int):
+    """Tell clients about one sweep's expired stock as a single update"""
+    await manager.send_system_update({
+        "event_type": "inventory_expired",
+        "data_type": "food_inventory",
+        "record_id": None,
+        "change_type": "expire",
+        "description": f"{count} expired inventory items marked unavailable"
+    })
 
 @router.get("/inventory/{inventory_id}", response_model=FoodInventorySchema)
-async def get_food_inventory_item(inventory_id: int, db: Session = Depends(get_db)):
+async def get_food_inventory_item(inventory_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific food inventory item"""
-    item = db.query(FoodInventory).filter(FoodInventory.id == inventory_id).first()
+    item = await db.get(FoodInventory, inventory_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -100,10 +209,10 @@ async def update_food_inventory(
     inventory_id: int,
     inventory_update: FoodInventoryUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update food inventory item"""
-    item = db.query(FoodInventory).filter(FoodInventory.id == inventory_id).first()
+    item = await db.get(FoodInventory, inventory_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,26 +224,26 @@ async def update_food_inventory(
     for field, value in update_data.items():
         setattr(item, field, value)
     
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
     return item
 
 @router.delete("/inventory/{inventory_id}")
 async def delete_food_inventory_item(
     inventory_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete food inventory item"""
-    item = db.query(FoodInventory).filter(FoodInventory.id == inventory_id).first()
+    item = await db.get(FoodInventory, inventory_id)
     if not item:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Food inventory item not found"
         )
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     return {"message": "Food inventory item deleted successfully"}
 
 # Food Distribution Endpoints
@@ -142,14 +251,14 @@ async def delete_food_inventory_item(
 async def create_food_distribution(
     distribution_data: FoodDistributionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new food distribution event"""
     db_distribution = FoodDistribution(**distribution_data.dict())
     
     db.add(db_distribution)
-    db.commit()
-    db.refresh(db_distribution)
+    await db.commit()
+    await db.refresh(db_distribution)
     
     return db_distribution
 
@@ -157,30 +266,32 @@ async def create_food_distribution(
 async def list_food_distributions(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     status_filter: Optional[str] = None,
     upcoming_only: bool = False,
     organization: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List food distribution events"""
-    query = db.query(FoodDistribution)
+    query = select(FoodDistribution)
     
     if status_filter:
-        query = query.filter(FoodDistribution.status == status_filter)
+        query = query.where(FoodDistribution.status == status_filter)
     
     if upcoming_only:
-        query = query.filter(FoodDistribution.scheduled_date >= datetime.utcnow())
+        query = query.where(FoodDistribution.scheduled_date >= datetime.utcnow())
     
     if organization:
-        query = query.filter(FoodDistribution.organizing_ngo.ilike(f"%{organization}%"))
+        query = query.where(FoodDistribution.organizing_ngo.ilike(f"%{organization}%"))
     
-    distributions = query.order_by(FoodDistribution.scheduled_date.desc()).offset(skip).limit(limit).all()
-    return distributions
+    query = paginate(query, FoodDistribution.scheduled_date, FoodDistribution.id, cursor, skip, limit)
+    rows, cursor = next_page(await fetch_rows(db, query, FoodDistributionSchema), limit, "scheduled_date")
+    return FastJSONResponse(rows, headers=cursor_headers(cursor))
 
 @router.get("/distributions/{distribution_id}", response_model=FoodDistributionSchema)
-async def get_food_distribution(distribution_id: int, db: Session = Depends(get_db)):
+async def get_food_distribution(distribution_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific food distribution event"""
-    distribution = db.query(FoodDistribution).filter(FoodDistribution.id == distribution_id).first()
+    distribution = await db.get(FoodDistribution, distribution_id)
     if not distribution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -193,10 +304,10 @@ async def update_food_distribution(
     distribution_id: int,
     distribution_update: FoodDistributionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update food distribution event"""
-    distribution = db.query(FoodDistribution).filter(FoodDistribution.id == distribution_id).first()
+    distribution = await db.get(FoodDistribution, distribution_id)
     if not distribution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -208,78 +319,23 @@ async def update_food_distribution(
     for field, value in update_data.items():
         setattr(distribution, field, value)
     
-    db.commit()
-    db.refresh(distribution)
+    await db.commit()
+    await db.refresh(distribution)
     return distribution
 
 # Analytics and Statistics
 @router.get("/stats/inventory-summary")
-async def get_inventory_summary(db: Session = Depends(get_db)):
+async def get_inventory_summary(db: AsyncSession = Depends(get_db)):
     """Get food inventory summary statistics"""
-    total_items = db.query(FoodInventory).count()
-    available_items = db.query(FoodInventory).filter(FoodInventory.is_available == True).count()
-    emergency_reserves = db.query(FoodInventory).filter(FoodInventory.is_emergency_reserve == True).count()
-    
-    # Total quantity by category
-    category_stats = db.query(
-        FoodInventory.category,
-        func.sum(FoodInventory.quantity).label('total_quantity'),
-        func.count(FoodInventory.id).label('item_count')
-    ).filter(FoodInventory.is_available == True).group_by(FoodInventory.category).all()
-    
-    # Expiring soon (next 30 days)
-    expiry_threshold = datetime.utcnow() + timedelta(days=30)
-    expiring_soon = db.query(FoodInventory).filter(
-        and_(
-            FoodInventory.expiry_date.isnot(None),
-            FoodInventory.expiry_date <= expiry_threshold,
-            FoodInventory.is_available == True
-        )
-    ).count()
-    
-    return {
-        "total_items": total_items,
-        "available_items": available_items,
-        "emergency_reserves": emergency_reserves,
-        "expiring_soon_30_days": expiring_soon,
-        "category_breakdown": [
-            {
-                "category": stat.category or "uncategorized",
-                "total_quantity": float(stat.total_quantity or 0),
-                "item_count": stat.item_count
-            }
-            for stat in category_stats
-        ]
-    }
+    rows = (await db.execute(inventory_summary_query(datetime.utcnow()))).all()
+    return inventory_summary(rows)
 
 @router.get("/stats/distribution-summary")
-async def get_distribution_summary(db: Session = Depends(get_db)):
+async def get_distribution_summary(db: AsyncSession = Depends(get_db)):
     """Get food distribution summary statistics"""
-    total_events = db.query(FoodDistribution).count()
-    completed_events = db.query(FoodDistribution).filter(FoodDistribution.status == "completed").count()
-    upcoming_events = db.query(FoodDistribution).filter(
-        and_(
-            FoodDistribution.scheduled_date >= datetime.utcnow(),
-            FoodDistribution.status.in_(["planned", "ongoing"])
-        )
-    ).count()
-    
-    # Total beneficiaries served
-    total_beneficiaries = db.query(func.sum(FoodDistribution.actual_beneficiaries)).scalar() or 0
-    
-    # This month's distributions
-    current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    monthly_events = db.query(FoodDistribution).filter(
-        FoodDistribution.scheduled_date >= current_month_start
-    ).count()
-    
-    return {
-        "total_events": total_events,
-        "completed_events": completed_events,
-        "upcoming_events": upcoming_events,
-        "total_beneficiaries_served": int(total_beneficiaries),
-        "events_this_month": monthly_events
-    }
+    summary = (await db.execute(distribution_summary_query(datetime.utcnow()))).one()._asdict()
+    summary["total_beneficiaries_served"] = int(summary["total_beneficiaries_served"])
+    return summary
 
 @router.get("/search/nearby-resources")
 async def search_nearby_food_resources(
@@ -287,38 +343,19 @@ async def search_nearby_food_resources(
     lng: float,
     radius_km: float = 25,
     emergency_only: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Search for nearby food resources"""
-    query = db.query(FoodInventory).filter(FoodInventory.is_available == True)
+    query = select(FoodInventory).where(FoodInventory.is_available == True)
     
     if emergency_only:
-        query = query.filter(FoodInventory.is_emergency_reserve == True)
+        query = query.where(FoodInventory.is_emergency_reserve == True)
     
     # Location-based filtering
-    resources = query.filter(
-        and_(
-            FoodInventory.latitude.isnot(None),
-            FoodInventory.longitude.isnot(None),
-            FoodInventory.latitude.between(lat - radius_km/111, lat + radius_km/111),
-            FoodInventory.longitude.between(lng - radius_km/111, lng + radius_km/111)
-        )
-    ).all()
-    
-    # Calculate distances and add to response
-    nearby_resources = []
-    for resource in resources:
-        if resource.latitude and resource.longitude:
-            # Simple distance calculation
-            distance = ((lat - resource.latitude) ** 2 + (lng - resource.longitude) ** 2) ** 0.5 * 111
-            if distance <= radius_km:
-                resource_dict = {
-                    "resource": resource,
-                    "distance_km": round(distance, 2)
-                }
-                nearby_resources.append(resource_dict)
-    
-    # Sort by distance
-    nearby_resources.sort(key=lambda x: x["distance_km"])
+    resources = (await db.scalars(query.where(within_radius(FoodInventory, lat, lng, radius_km)))).all()
     
-    return nearby_resources
\ No newline at end of file
+    # Calculate distances, nearest first
+    return [
+        {"resource": FoodInventorySchema.model_validate(resource), "distance_km": round(distance, 2)}
+        for resource, distance in nearest_within(lat, lng, radius_km, resources)
+    ]
\ No newline at end of file
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, status
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
 import json
 import uuid
@@ -10,6 +11,7 @@ from datetime import datetime, timedelta
 from app.db.session import get_db
 from app.core.websocket import manager, handle_websocket_message
 from app.core.security import verify_token
+from app.core.pagination import paginate, next_page, cursor_headers
 from app.models import User, Notification, EmergencyAlert, SystemEvent
 from app.schemas import (
     NotificationCreate, Notification as NotificationSchema,
@@ -22,21 +24,46 @@ security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
 @router.websocket("/ws/{connection_id}")
-async def websocket_endpoint(websocket: WebSocket, connection_id: str, token: Optional[str] = None):
-    """WebSocket endpoint for real-time communication"""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    connection_id: str,
+    token: Optional[str] = None,
+    resume_from: Optional[int] = None,
+    stream: Optional[str] = None,
+    topics: Optional[str] = None,
+    batch_ms: int = 0,
+    encoding: str = "json"
+):
+    """WebSocket endpoint for real-time communication.
+
+    Reconnecting clients pass the seq and stream of the last message they got
+    as resume_from and stream to have missed broadcasts replayed, optionally
+    limited to a comma-separated list of topics. batch_ms > 0 asks for
+    messages coalesced into array frames over that window, and
+    encoding=msgpack for binary frames.
+    """
     user_id = None
+    role = None
     
     # Verify token if provided
     if token:
         try:
             payload = verify_token(token)
             user_id = payload.get("user_id")
+            role = payload.get("role")
         except Exception:
             # Continue without user_id if token is invalid
             pass
     
     # Accept connection
-    await manager.connect(websocket, connection_id, user_id)
+    await manager.connect(
+        websocket, connection_id, user_id, role,
+        resume_from=resume_from,
+        stream=stream,
+        topics=[topic for topic in (topics or "").split(",") if topic],
+        batch_ms=batch_ms,
+        encoding=encoding
+    )
     
     try:
         while True:
@@ -45,16 +72,18 @@ async def websocket_endpoint(websocket: WebSocket, connection_id: str, token: Op
             await handle_websocket_message(websocket, connection_id, data)
             
     except WebSocketDisconnect:
-        manager.disconnect(connection_id, user_id)
+        manager.disconnect(connection_id, user_id, websocket)
         logger.info(f"Client {connection_id} disconnected")
 
 @router.get("/notifications", response_model=List[NotificationSchema])
 async def get_user_notifications(
+    response: Response,
     skip: int = 0, 
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     unread_only: bool = False,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get notifications for the current user"""
     try:
@@ -66,22 +95,24 @@ async def get_user_notifications(
             detail="Invalid authentication token"
         )
     
-    query = db.query(Notification).filter(
+    query = select(Notification).where(
         (Notification.target_user_id == user_id) | 
         (Notification.target_user_id.is_(None))  # Broadcast notifications
     )
     
     if unread_only:
-        query = query.filter(Notification.is_read == False)
+        query = query.where(Notification.is_read == False)
     
-    notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+    query = paginate(query, Notification.created_at, Notification.id, cursor, skip, limit)
+    notifications, cursor = next_page((await db.scalars(query)).all(), limit, "created_at")
+    response.headers.update(cursor_headers(cursor))
     return notifications
 
 @router.post("/notifications", response_model=NotificationSchema)
 async def create_notification(
     notification_data: NotificationCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new notification (Admin/NGO only)"""
     try:
@@ -104,8 +135,8 @@ async def create_notification(
     # Create notification
     notification = Notification(**notification_data.dict())
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    await db.commit()
+    await db.refresh(notification)
     
     # Broadcast via WebSocket
     await manager.send_notification({
@@ -122,7 +153,7 @@ async def create_notification(
     # Update broadcast status
     notification.is_broadcasted = True
     notification.broadcast_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return notification
 
@@ -130,7 +161,7 @@ async def create_notification(
 async def mark_notification_read(
     notification_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark a notification as read"""
     try:
@@ -142,10 +173,10 @@ async def mark_notification_read(
             detail="Invalid authentication token"
         )
     
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         (Notification.target_user_id == user_id) | (Notification.target_user_id.is_(None))
-    ).first()
+    ))
     
     if not notification:
         raise HTTPException(
@@ -154,7 +185,7 @@ async def mark_notification_read(
         )
     
     notification.is_read = True
-    db.commit()
+    await db.commit()
     
     return {"message": "Notification marked as read"}
 
@@ -162,7 +193,7 @@ async def mark_notification_read(
 async def create_emergency_alert(
     alert_data: EmergencyAlertCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create and broadcast an emergency alert"""
     try:
@@ -185,8 +216,8 @@ async def create_emergency_alert(
     # Create alert
     alert = EmergencyAlert(**alert_data.dict(), issued_by_user_id=user_id)
     db.add(alert)
-    db.commit()
-    db.refresh(alert)
+    await db.commit()
+    await db.refresh(alert)
     
     # Broadcast emergency alert via WebSocket
     await manager.send_emergency_alert({
@@ -206,7 +237,7 @@ async def create_emergency_alert(
     # Update broadcast status
     alert.is_broadcasted = True
     alert.broadcast_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return alert
 
@@ -216,22 +247,22 @@ async def get_emergency_alerts(
     skip: int = 0,
     limit: int = 20,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get emergency alerts"""
-    query = db.query(EmergencyAlert)
+    query = select(EmergencyAlert)
     
     if active_only:
-        query = query.filter(EmergencyAlert.is_active == True)
+        query = query.where(EmergencyAlert.is_active == True)
     
-    alerts = query.order_by(EmergencyAlert.created_at.desc()).offset(skip).limit(limit).all()
+    alerts = (await db.scalars(query.order_by(EmergencyAlert.created_at.desc()).offset(skip).limit(limit))).all()
     return alerts
 
 @router.put("/emergency-alerts/{alert_id}/resolve")
 async def resolve_emergency_alert(
     alert_id: int,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Resolve an emergency alert"""
     try:
@@ -250,7 +281,7 @@ async def resolve_emergency_alert(
             detail="Insufficient permissions to resolve emergency alerts"
         )
     
-    alert = db.query(EmergencyAlert).filter(EmergencyAlert.id == alert_id).first()
+    alert = await db.get(EmergencyAlert, alert_id)
     if not alert:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -259,7 +290,7 @@ async def resolve_emergency_alert(
     
     alert.is_active = False
     alert.resolved_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Notify about resolution
     await manager.send_notification({
@@ -285,7 +316,7 @@ async def get_websocket_status():
 async def log_system_event(
     event_data: SystemEventCreate,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Log a system event for real-time tracking"""
     try:
@@ -295,10 +326,10 @@ async def log_system_event(
         user_id = None
     
     # Create system event
-    event = SystemEvent(**event_data.dict(), user_id=user_id or event_data.user_id)
+    event = SystemEvent(**event_data.dict(exclude={"user_id"}), user_id=user_id or event_data.user_id)
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     
     # Broadcast system update if it affects data
     if event.affected_data_type and event.change_type:
@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from typing import List, Optional
 from app.db.session import get_db
 from app.api.v1.auth import get_current_user
+from app.core.geo import within_radius
+from app.core.cache import cached
+from app.core.serialization import FastJSONResponse, fetch_rows, schema_columns
+from app.core.export import ExportFormat, export_response
+from app.core.pagination import paginate, next_page, cursor_headers
 from app.models import VulnerabilityAssessment, User, VulnerabilityLevel
 from app.schemas import (
     VulnerabilityAssessmentCreate,
@@ -16,7 +21,7 @@ router = APIRouter()
 async def create_vulnerability_assessment(
     assessment_data: VulnerabilityAssessmentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new vulnerability assessment"""
     # Calculate overall vulnerability and scores
@@ -57,8 +62,8 @@ async def create_vulnerability_assessment(
     db_assessment = VulnerabilityAssessment(**assessment_dict)
     
     db.add(db_assessment)
-    db.commit()
-    db.refresh(db_assessment)
+    await db.commit()
+    await db.refresh(db_assessment)
     
     return db_assessment
 
@@ -66,38 +71,44 @@ async def create_vulnerability_assessment(
 async def list_vulnerability_assessments(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page; replaces skip"),
     vulnerability_level: Optional[VulnerabilityLevel] = None,
     location: Optional[str] = None,
     lat: Optional[float] = Query(None, description="Latitude for location-based search"),
     lng: Optional[float] = Query(None, description="Longitude for location-based search"),
     radius_km: Optional[float] = Query(50, description="Search radius in kilometers"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List vulnerability assessments with optional filters"""
-    query = db.query(VulnerabilityAssessment)
+    query = select(VulnerabilityAssessment)
     
     if vulnerability_level:
-        query = query.filter(VulnerabilityAssessment.overall_vulnerability == vulnerability_level)
+        query = query.where(VulnerabilityAssessment.overall_vulnerability == vulnerability_level)
     
     if location:
-        query = query.filter(VulnerabilityAssessment.location.ilike(f"%{location}%"))
+        query = query.where(VulnerabilityAssessment.location.ilike(f"%{location}%"))
     
     # Location-based filtering
     if lat is not None and lng is not None:
-        query = query.filter(
-            and_(
-                VulnerabilityAssessment.latitude.between(lat - radius_km/111, lat + radius_km/111),
-                VulnerabilityAssessment.longitude.between(lng - radius_km/111, lng + radius_km/111)
-            )
-        )
+        query = query.where(within_radius(VulnerabilityAssessment, lat, lng, radius_km))
     
-    assessments = query.order_by(VulnerabilityAssessment.assessment_date.desc()).offset(skip).limit(limit).all()
-    return assessments
+    query = paginate(query, VulnerabilityAssessment.assessment_date, VulnerabilityAssessment.id, cursor, skip, limit)
+    rows, cursor = next_page(await fetch_rows(db, query, VulnerabilityAssessmentSchema), limit, "assessment_date")
+    return FastJSONResponse(rows, headers=cursor_headers(cursor))
+
+@router.get("/assessments/export")
+async def export_vulnerability_assessments(
+    format: ExportFormat = ExportFormat.NDJSON,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every vulnerability assessment as NDJSON, CSV or gzipped CSV"""
+    query = select(*schema_columns(VulnerabilityAssessment, VulnerabilityAssessmentSchema)).order_by(VulnerabilityAssessment.id)
+    return export_response(query, format, "vulnerability_assessments")
 
 @router.get("/assessments/{assessment_id}", response_model=VulnerabilityAssessmentSchema)
-async def get_vulnerability_assessment(assessment_id: int, db: Session = Depends(get_db)):
+async def get_vulnerability_assessment(assessment_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific vulnerability assessment"""
-    assessment = db.query(VulnerabilityAssessment).filter(VulnerabilityAssessment.id == assessment_id).first()
+    assessment = await db.get(VulnerabilityAssessment, assessment_id)
     if not assessment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -110,10 +121,10 @@ async def update_vulnerability_assessment(
     assessment_id: int,
     assessment_update: VulnerabilityAssessmentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update vulnerability assessment"""
-    assessment = db.query(VulnerabilityAssessment).filter(VulnerabilityAssessment.id == assessment_id).first()
+    assessment = await db.get(VulnerabilityAssessment, assessment_id)
     if not assessment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -164,31 +175,32 @@ async def update_vulnerability_assessment(
         if hasattr(assessment, field):
             setattr(assessment, field, value)
     
-    db.commit()
-    db.refresh(assessment)
+    await db.commit()
+    await db.refresh(assessment)
     return assessment
 
 @router.get("/stats/vulnerability-overview")
-async def get_vulnerability_overview(db: Session = Depends(get_db)):
+@cached(tags=[VulnerabilityAssessment])
+async def get_vulnerability_overview(db: AsyncSession = Depends(get_db)):
     """Get vulnerability assessment overview statistics"""
-    total_assessments = db.query(VulnerabilityAssessment).count()
+    total_assessments = await db.scalar(select(func.count()).select_from(VulnerabilityAssessment))
     
     # Count by vulnerability level
     vulnerability_counts = {}
     for level in VulnerabilityLevel:
-        count = db.query(VulnerabilityAssessment).filter(
+        count = await db.scalar(select(func.count()).select_from(VulnerabilityAssessment).where(
             VulnerabilityAssessment.overall_vulnerability == level
-        ).count()
+        ))
         vulnerability_counts[level.value] = count
     
     # Average scores
-    avg_climate_score = db.query(func.avg(VulnerabilityAssessment.climate_resilience_score)).scalar() or 0
-    avg_food_security_score = db.query(func.avg(VulnerabilityAssessment.food_security_score)).scalar() or 0
+    avg_climate_score = await db.scalar(select(func.avg(VulnerabilityAssessment.climate_resilience_score))) or 0
+    avg_food_security_score = await db.scalar(select(func.avg(VulnerabilityAssessment.food_security_score))) or 0
     
     # High-risk communities (high or very high vulnerability)
-    high_risk_count = db.query(VulnerabilityAssessment).filter(
+    high_risk_count = await db.scalar(select(func.count()).select_from(VulnerabilityAssessment).where(
         VulnerabilityAssessment.overall_vulnerability.in_([VulnerabilityLevel.HIGH, VulnerabilityLevel.VERY_HIGH])
-    ).count()
+    ))
     
     return {
         "total_assessments": total_assessments,
@@ -203,23 +215,18 @@ async def get_high_risk_hotspots(
     lat: Optional[float] = Query(None, description="Center latitude for regional search"),
     lng: Optional[float] = Query(None, description="Center longitude for regional search"),
     radius_km: Optional[float] = Query(100, description="Search radius in kilometers"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get high-risk vulnerability hotspots"""
-    query = db.query(VulnerabilityAssessment).filter(
+    query = select(VulnerabilityAssessment).where(
         VulnerabilityAssessment.overall_vulnerability.in_([VulnerabilityLevel.HIGH, VulnerabilityLevel.VERY_HIGH])
     )
     
     # Location-based filtering if provided
     if lat is not None and lng is not None:
-        query = query.filter(
-            and_(
-                VulnerabilityAssessment.latitude.between(lat - radius_km/111, lat + radius_km/111),
-                VulnerabilityAssessment.longitude.between(lng - radius_km/111, lng + radius_km/111)
-            )
-        )
+        query = query.where(within_radius(VulnerabilityAssessment, lat, lng, radius_km))
     
-    hotspots = query.order_by(VulnerabilityAssessment.climate_resilience_score.asc()).all()
+    hotspots = (await db.scalars(query.order_by(VulnerabilityAssessment.climate_resilience_score.asc()))).all()
     
     return {
         "high_risk_communities": len(hotspots),
@@ -240,9 +247,9 @@ async def get_high_risk_hotspots(
     }
 
 @router.get("/recommendations/{assessment_id}")
-async def get_vulnerability_recommendations(assessment_id: int, db: Session = Depends(get_db)):
+async def get_vulnerability_recommendations(assessment_id: int, db: AsyncSession = Depends(get_db)):
     """Get specific recommendations based on vulnerability assessment"""
-    assessment = db.query(VulnerabilityAssessment).filter(VulnerabilityAssessment.id == assessment_id).first()
+    assessment = await db.get(VulnerabilityAssessment, assessment_id)
     if not assessment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
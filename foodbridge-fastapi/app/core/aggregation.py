@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Select, and_, func, select
+from typing import Dict, Sequence
+from app.models import FoodInventory, FoodDistribution, FoodDonation, DonationStatus
+
+EXPIRING_SOON_DAYS = 30
+UPCOMING_DISTRIBUTION_STATUSES = ("planned", "ongoing")
+
+
+def count_where(*conditions):
+    """COUNT(*) FILTER (WHERE ...): rows matching every condition"""
+    return func.count().filter(and_(*conditions))
+
+
+def sum_where(column, *conditions):
+    """SUM of column over the rows matching every condition; 0 when none do"""
+    return func.coalesce(func.sum(column).filter(and_(*conditions)), 0)
+
+
+def inventory_summary_query(now: datetime) -> Select:
+    """Every inventory counter per category, in one pass over the table.
+
+    Grouping by category lets the per-category breakdown and the table-wide
+    totals come from the same scan; the totals are the sums of the groups.
+    """
+    available = FoodInventory.is_available == True
+    return select(
+        FoodInventory.category,
+        func.count().label("total_items"),
+        count_where(available).label("available_items"),
+        count_where(FoodInventory.is_emergency_reserve == True).label("emergency_reserves"),
+        count_where(
+            available,
+            FoodInventory.expiry_date.isnot(None),
+            FoodInventory.expiry_date <= now + timedelta(days=EXPIRING_SOON_DAYS)
+        ).label("expiring_soon"),
+        sum_where(FoodInventory.quantity, available).label("available_quantity"),
+    ).group_by(FoodInventory.category).order_by(FoodInventory.category)
+
+
+def inventory_summary(rows: Sequence) -> Dict:
+    """Shape the per-category rows of inventory_summary_query into the summary response"""
+    return {
+        "total_items": sum(row.total_items for row in rows),
+        "available_items": sum(row.available_items for row in rows),
+        "emergency_reserves": sum(row.emergency_reserves for row in rows),
+        f"expiring_soon_{EXPIRING_SOON_DAYS}_days": sum(row.expiring_soon for row in rows),
+        "category_breakdown": [
+            {
+                "category": row.category or "uncategorized",
+                "total_quantity": float(row.available_quantity),
+                "item_count": row.available_items
+            }
+            for row in rows if row.available_items
+        ]
+    }
+
+
+def distribution_summary_query(now: datetime) -> Select:
+    """Every distribution counter in one pass over the table"""
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return select(
+        func.count().label("total_events"),
+        count_where(FoodDistribution.status == "completed").label("completed_events"),
+        count_where(
+            FoodDistribution.scheduled_date >= now,
+            FoodDistribution.status.in_(UPCOMING_DISTRIBUTION_STATUSES)
+        ).label("upcoming_events"),
+        func.coalesce(func.sum(FoodDistribution.actual_beneficiaries), 0).label("total_beneficiaries_served"),
+        count_where(FoodDistribution.scheduled_date >= month_start).label("events_this_month"),
+    )
+
+
+def donation_summary_query() -> Select:
+    """Every counter over active donations in one pass"""
+    available = FoodDonation.status == DonationStatus.AVAILABLE
+    return select(
+        func.count().label("total_donations"),
+        count_where(available).label("available_donations"),
+        count_where(FoodDonation.status == DonationStatus.CLAIMED).label("claimed_donations"),
+        count_where(FoodDonation.status == DonationStatus.COLLECTED).label("collected_donations"),
+        count_where(available, FoodDonation.is_urgent == True).label("urgent_donations"),
+    ).where(FoodDonation.is_active == True)
@@ -0,0 +1,249 @@
+from typing import List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+from scipy.spatial import cKDTree
+import numpy as np
+import asyncio
+import logging
+import math
+import time
+from app.core.config import settings
+from app.core.geo import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+
+def to_unit_vectors(lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """Project coordinates onto the unit sphere as (x, y, z) points.
+
+    Straight-line (chord) distance between projected points grows
+    monotonically with great-circle distance, so a KD-tree over them gives
+    exact nearest neighbours on the globe.
+    """
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    lngs_rad = np.radians(np.asarray(lngs, dtype=np.float64))
+    cos_lats = np.cos(lats_rad)
+    return np.column_stack((
+        cos_lats * np.cos(lngs_rad),
+        cos_lats * np.sin(lngs_rad),
+        np.sin(lats_rad)
+    ))
+
+
+def km_to_chord(distance_km: float) -> float:
+    """Chord length on the unit sphere for a great-circle distance"""
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def chord_to_km(chords: np.ndarray) -> np.ndarray:
+    """Great-circle distances for chord lengths on the unit sphere"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0.0, 1.0))
+
+
+class SourceIndex:
+    """KD-tree over food sources for batched nearest-source lookups"""
+
+    def __init__(self, lats: Sequence[float], lngs: Sequence[float]):
+        self.size = len(lats)
+        self._tree = cKDTree(to_unit_vectors(lats, lngs)) if self.size else None
+
+    def nearest(self, lats: Sequence[float], lngs: Sequence[float], k: int, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest sources within radius_km of every query point.
+
+        Returns (indices, distances_km) arrays of shape (points, k), nearest
+        first. Slots without a source in range hold index -1 and distance inf.
+        """
+        points = len(lats)
+        indices = np.full((points, k), -1, dtype=np.int64)
+        distances = np.full((points, k), np.inf)
+        if not points or self._tree is None:
+            return indices, distances
+
+        chords, found = self._tree.query(
+            to_unit_vectors(lats, lngs),
+            k=k,
+            distance_upper_bound=km_to_chord(radius_km)
+        )
+        chords = np.asarray(chords, dtype=np.float64).reshape(points, k)
+        found = np.asarray(found).reshape(points, k)
+
+        in_range = found < self.size
+        indices[in_range] = found[in_range]
+        distances[in_range] = chord_to_km(chords[in_range])
+        return indices, distances
+
+
+# Optimal allocation
+#
+# Sources (food items with a supply in kg) and communities (with a demand in
+# kg and a priority weight) form a transportation problem over candidate
+# arcs: the nearest sources in reach of each community. The LP minimises
+# total kg-km shipped plus a per-community penalty on unmet demand. The
+# penalty exceeds the longest arc, so all demand that can be met is met,
+# and higher-weight communities win contested supply.
+
+def candidate_arcs(
+    community_coords: List[Tuple[float, float]],
+    source_coords: List[Tuple[float, float]],
+    radius_km: float,
+    candidates: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(source, community, km) arrays for each community's nearest sources in reach"""
+    index = SourceIndex(
+        [lat for lat, _ in source_coords],
+        [lng for _, lng in source_coords]
+    )
+    nearest_indices, nearest_distances = index.nearest(
+        [lat for lat, _ in community_coords],
+        [lng for _, lng in community_coords],
+        min(candidates, max(len(source_coords), 1)),
+        radius_km
+    )
+    in_range = nearest_indices >= 0
+    communities = np.broadcast_to(np.arange(len(community_coords))[:, None], nearest_indices.shape)
+    return nearest_indices[in_range], communities[in_range], nearest_distances[in_range]
+
+
+def _penalties(weights: np.ndarray, arc_km: np.ndarray) -> np.ndarray:
+    longest = float(arc_km.max()) if len(arc_km) else 0.0
+    return (longest + 1.0) * weights
+
+
+def greedy_allocation(
+    supply_kg: np.ndarray,
+    demand_kg: np.ndarray,
+    weights: np.ndarray,
+    arc_source: np.ndarray,
+    arc_community: np.ndarray,
+    arc_km: np.ndarray
+) -> np.ndarray:
+    """Feasible fallback: serve communities by weight, nearest arcs first"""
+    remaining_supply = np.array(supply_kg, dtype=np.float64)
+    remaining_demand = np.array(demand_kg, dtype=np.float64)
+    flows = np.zeros(len(arc_km))
+
+    for arc in np.lexsort((arc_km, -weights[arc_community])):
+        source, community = arc_source[arc], arc_community[arc]
+        amount = min(remaining_supply[source], remaining_demand[community])
+        if amount > 0:
+            flows[arc] = amount
+            remaining_supply[source] -= amount
+            remaining_demand[community] -= amount
+    return flows
+
+
+def solve_transportation(
+    supply_kg: np.ndarray,
+    demand_kg: np.ndarray,
+    weights: np.ndarray,
+    arc_source: np.ndarray,
+    arc_community: np.ndarray,
+    arc_km: np.ndarray,
+    time_limit: float
+) -> Tuple[np.ndarray, str]:
+    """Min-cost flow over the candidate arcs. Returns (kg per arc, method used)."""
+    arcs, communities, sources = len(arc_km), len(demand_kg), len(supply_kg)
+    if not arcs:
+        return np.zeros(0), "empty"
+
+    # Variables: one flow per arc, then one unmet-demand slack per community
+    cost = np.concatenate((arc_km, _penalties(weights, arc_km)))
+    supply_rows = coo_matrix(
+        (np.ones(arcs), (arc_source, np.arange(arcs))),
+        shape=(sources, arcs + communities)
+    )
+    demand_rows = coo_matrix(
+        (np.ones(arcs + communities), (
+            np.concatenate((arc_community, np.arange(communities))),
+            np.arange(arcs + communities)
+        )),
+        shape=(communities, arcs + communities)
+    )
+
+    result = linprog(
+        cost,
+        A_ub=supply_rows.tocsr(), b_ub=supply_kg,
+        A_eq=demand_rows.tocsr(), b_eq=demand_kg,
+        bounds=(0, None),
+        method="highs",
+        options={"time_limit": time_limit}
+    )
+    if result.status == 0 and result.x is not None:
+        return np.maximum(result.x[:arcs], 0.0), "optimal"
+
+    logger.warning(f"Allocation LP stopped without an optimum ({result.message}), using greedy allocation")
+    return greedy_allocation(supply_kg, demand_kg, weights, arc_source, arc_community, arc_km), "greedy"
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.ALLOCATION_WORKERS)
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the solver worker processes, cancelling queued solves"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def allocate(
+    community_coords: List[Tuple[float, float]],
+    demand_kg: Sequence[float],
+    weights: Sequence[float],
+    source_coords: List[Tuple[float, float]],
+    supply_kg: Sequence[float],
+    radius_km: float
+) -> Tuple[List[Tuple[int, int, float, float]], str]:
+    """Allocate source supply to community demand within the time budget.
+
+    The LP runs in a worker process so it never blocks the event loop. If it
+    misses the budget a greedy allocation over the same arcs is returned.
+    Returns ([(source_index, community_index, kg, km)], method).
+    """
+    started = time.perf_counter()
+    supply = np.asarray(supply_kg, dtype=np.float64)
+    demand = np.asarray(demand_kg, dtype=np.float64)
+    weight = np.asarray(weights, dtype=np.float64)
+
+    # Sources without any kg supply can't be allocated
+    usable = np.flatnonzero(supply > 0)
+    arc_source, arc_community, arc_km = candidate_arcs(
+        community_coords,
+        [source_coords[index] for index in usable],
+        radius_km,
+        settings.ALLOCATION_CANDIDATES
+    )
+    supply = supply[usable]
+
+    # Leave the worker headroom inside the budget for its own greedy fallback
+    remaining = max(settings.ALLOCATION_TIME_BUDGET_SECONDS - (time.perf_counter() - started), 0.1)
+    loop = asyncio.get_running_loop()
+    try:
+        flows, method = await asyncio.wait_for(
+            loop.run_in_executor(
+                _get_executor(), solve_transportation,
+                supply, demand, weight, arc_source, arc_community, arc_km,
+                remaining * 0.6
+            ),
+            timeout=remaining
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Allocation solver exceeded its time budget, using greedy allocation")
+        flows = await loop.run_in_executor(
+            None, greedy_allocation, supply, demand, weight, arc_source, arc_community, arc_km
+        )
+        method = "greedy"
+
+    assignments = [
+        (int(usable[arc_source[arc]]), int(arc_community[arc]), float(flows[arc]), float(arc_km[arc]))
+        for arc in np.flatnonzero(flows > 1e-6)
+    ]
+    return assignments, method
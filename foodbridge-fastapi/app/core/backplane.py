@@ -0,0 +1,156 @@
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Largest envelope the local socket backplane sends; Unix datagrams above the socket buffer size fail
+MAX_DATAGRAM_BYTES = 200_000
+
+
+class InMemoryBackplane:
+    """Delivers to backplanes sharing the same hub in this process.
+
+    With its own hub (the default) nothing leaves the process, which is all a
+    single worker needs. Managers given a shared hub stand in for separate
+    workers in tests.
+    """
+
+    def __init__(self, hub: Optional[List] = None):
+        self.hub = hub if hub is not None else []
+        self._handler: Optional[Callable] = None
+
+    async def start(self, handler: Callable[[Dict], None]):
+        self._handler = handler
+        self.hub.append(self)
+
+    async def publish(self, envelope: Dict):
+        for peer in list(self.hub):
+            if peer is not self:
+                peer._handler(envelope)
+
+    async def stop(self):
+        if self in self.hub:
+            self.hub.remove(self)
+
+
+class LocalSocketBackplane:
+    """Workers on one host exchange envelopes as datagrams over Unix sockets.
+
+    Every process binds a socket in a shared directory and publishing sends a
+    datagram to every other socket there, so `uvicorn --workers N` needs no
+    extra service. Sockets left behind by dead processes are removed when a
+    send to them is refused.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._receiver: Optional[socket.socket] = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    async def start(self, handler: Callable[[Dict], None]):
+        os.makedirs(self.directory, exist_ok=True)
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._receiver.setblocking(False)
+        asyncio.get_running_loop().add_reader(self._receiver.fileno(), self._read, handler)
+
+    def _read(self, handler: Callable[[Dict], None]):
+        while True:
+            try:
+                data = self._receiver.recv(MAX_DATAGRAM_BYTES)
+            except BlockingIOError:
+                return
+            try:
+                handler(json.loads(data))
+            except Exception as e:
+                logger.error(f"Dropping backplane message: {e}")
+
+    async def publish(self, envelope: Dict):
+        data = json.dumps(envelope, default=str).encode()
+        if len(data) > MAX_DATAGRAM_BYTES:
+            logger.error(f"Backplane message of {len(data)} bytes is too large to publish")
+            return
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if path == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self._sender.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Nobody is bound to it any more
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                logger.warning(f"Backplane peer {name} isn't keeping up; message dropped")
+
+    async def stop(self):
+        if self._receiver is not None:
+            asyncio.get_running_loop().remove_reader(self._receiver.fileno())
+            self._receiver.close()
+            self._receiver = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._sender.close()
+
+
+class RedisBackplane:
+    """Processes on any number of hosts exchange envelopes over a Redis pub/sub channel"""
+
+    def __init__(self, url: str, channel: str):
+        import redis.asyncio as redis  # Optional dependency, only needed for this backplane
+        self._redis = redis.from_url(url)
+        self.channel = channel
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[Dict], None]):
+        self._listener = asyncio.get_running_loop().create_task(self._listen(handler))
+
+    async def _listen(self, handler: Callable[[Dict], None]):
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            handler(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Backplane subscription to {self.channel} failed, retrying: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, envelope: Dict):
+        await self._redis.publish(self.channel, json.dumps(envelope, default=str))
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await self._redis.close()
+
+
+def create_backplane():
+    if settings.WS_BACKPLANE == "redis":
+        try:
+            return RedisBackplane(settings.REDIS_URL, settings.WS_BACKPLANE_CHANNEL)
+        except ImportError:
+            logger.warning("WS_BACKPLANE is redis but the redis package isn't installed; realtime stays in-process")
+    elif settings.WS_BACKPLANE == "local":
+        return LocalSocketBackplane(settings.WS_BACKPLANE_DIR)
+    return InMemoryBackplane()
@@ -0,0 +1,126 @@
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Type
+from app.core.config import settings
+from app.core.serialization import loads
+import logging
+
+logger = logging.getLogger(__name__)
+
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+
+class InvalidLine(NamedTuple):
+    """An NDJSON line that isn't valid JSON; reported as that row's error"""
+    error: str
+
+
+def _parse_line(line: bytes):
+    try:
+        return loads(line)
+    except ValueError as e:
+        return InvalidLine(f"Invalid JSON: {e}")
+
+
+async def read_records(request: Request) -> AsyncIterator[Any]:
+    """Records from a JSON array body, or from an NDJSON body line by line as it arrives"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        pending = b""
+        async for chunk in request.stream():
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+        if pending.strip():
+            yield _parse_line(pending)
+        return
+
+    try:
+        records = loads(await request.body())
+    except ValueError:
+        records = None
+    if not isinstance(records, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body must be a JSON array of records, or NDJSON with an NDJSON content type"
+        )
+    for record in records:
+        yield record
+
+
+class BulkResult:
+    """Outcome of a bulk insert: the id given to each record (None if it failed) and per-row errors"""
+
+    def __init__(self):
+        self.ids: List[Optional[int]] = []
+        self.errors: List[Dict] = []
+        self.inserted: List[Dict] = []  # Values of the inserted rows, with their id and created_at
+
+    def fail(self, index: int, errors: List[Dict]):
+        self.errors.append({"index": index, "errors": errors})
+
+    def response(self) -> Dict:
+        return {
+            "received": len(self.ids),
+            "inserted": len(self.inserted),
+            "failed": len(self.errors),
+            "ids": self.ids,
+            "errors": sorted(self.errors, key=lambda error: error["index"])
+        }
+
+
+async def _insert_chunk(db: AsyncSession, model, chunk: List[tuple], result: BulkResult):
+    """Insert one chunk's rows with a single executemany and commit them"""
+    statement = insert(model).returning(model.id, model.created_at, sort_by_parameter_order=True)
+    try:
+        rows = (await db.execute(statement, [values for _, values in chunk])).all()
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Bulk insert into {model.__tablename__} failed: {e}")
+        for index, _ in chunk:
+            result.fail(index, [{"type": "insert_failed", "msg": f"Insert failed: {e.__class__.__name__}"}])
+        return
+    for (index, values), row in zip(chunk, rows):
+        result.ids[index] = row.id
+        result.inserted.append({**values, "id": row.id, "created_at": row.created_at})
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model,
+    schema: Type[BaseModel],
+    records: AsyncIterator[Any],
+    prepare: Callable[[BaseModel], Dict]
+) -> BulkResult:
+    """Validate records and insert the valid ones, BULK_CHUNK_SIZE rows per transaction.
+
+    prepare turns a validated record into the column values to insert. The
+    rows go in through a Core INSERT, so ORM events such as geocell tracking
+    don't run and prepare must fill in derived columns itself. A chunk that
+    fails to insert is rolled back and reported row by row; other chunks
+    are unaffected.
+    """
+    result = BulkResult()
+    chunk = []
+    async for record in records:
+        index = len(result.ids)
+        result.ids.append(None)
+        if isinstance(record, InvalidLine):
+            result.fail(index, [{"type": "json_invalid", "msg": record.error}])
+            continue
+        try:
+            chunk.append((index, prepare(schema.model_validate(record))))
+        except ValidationError as e:
+            result.fail(index, e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+        if len(chunk) >= settings.BULK_CHUNK_SIZE:
+            await _insert_chunk(db, model, chunk, result)
+            chunk = []
+    if chunk:
+        await _insert_chunk(db, model, chunk, result)
+    return result
@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+from app.core.config import settings
+from app.core.serialization import FastJSONResponse
+from app.db.events import ChangeSet, on_commit
+import asyncio
+import functools
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Parameter types that make up a cache key; dependencies like sessions and users are skipped
+KEY_TYPES = (str, int, float, bool, Enum, date, datetime)
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after their own TTL"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def keys(self) -> List:
+        return list(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int):
+        self._entries = TTLCache(max_entries)
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str):
+        return self._entries.get(key)
+
+    async def set(self, key: str, value, ttl: float):
+        self._entries.set(key, value, ttl)
+
+    async def tag_versions(self, tags: List[str]) -> List[int]:
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    async def bump(self, tags: Iterable[str]):
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache shared across processes through Redis; entries expire with SETEX"""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # Optional dependency, only needed for this backend
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str):
+        value = await self._redis.get(f"cache:{key}")
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value, ttl: float):
+        await self._redis.setex(f"cache:{key}", max(1, int(ttl)), json.dumps(value))
+
+    async def tag_versions(self, tags: List[str]) -> List[int]:
+        values = await self._redis.mget([f"cache-tag:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, tags: Iterable[str]):
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"cache-tag:{tag}")
+            await pipe.execute()
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """Caches GET responses keyed on route and normalized query parameters.
+
+    Entries are tagged with the tables they read. Each tag carries a version
+    that is part of the key, so a commit writing a table bumps its version
+    and every entry built from the old data stops being reachable. A response
+    computed while a write commits is stored under the old version and is
+    never served.
+    """
+
+    def __init__(self, backend, default_ttl: float):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._pending_tags = set()  # Written tables not yet bumped in the backend
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def invalidate(self, changes: ChangeSet):
+        """Commit listener: bump the tags of every table the transaction wrote"""
+        self._pending_tags |= changes.tables
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self.flush())
+
+    async def flush(self):
+        """Apply pending invalidations before serving from the cache"""
+        if not self._pending_tags and not self._flush_lock.locked():
+            return
+        # Lookups wait for an in-flight bump so they never read the old versions
+        async with self._flush_lock:
+            if not self._pending_tags:
+                return
+            tags, self._pending_tags = self._pending_tags, set()
+            try:
+                await self.backend.bump(tags)
+            except Exception as e:
+                self._pending_tags |= tags
+                logger.error(f"Cache invalidation failed: {e}")
+                raise
+
+    def stats(self) -> Dict:
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "routes": {
+                route: {"hits": self.hits.get(route, 0), "misses": self.misses.get(route, 0)}
+                for route in sorted(set(self.hits) | set(self.misses))
+            }
+        }
+
+    def cached(self, tags: List[Any], model: Any = None, ttl: Optional[float] = None, rendered: bool = False):
+        """Decorator caching an endpoint's JSON-ready result.
+
+        tags are the models (or table names) the endpoint reads. model is the
+        response type used to serialize ORM results; plain results go through
+        jsonable_encoder. rendered endpoints return a FastJSONResponse, whose
+        body and headers are cached and served again without re-encoding.
+        """
+        tag_names = sorted(getattr(tag, "__tablename__", tag) for tag in tags)
+        adapter = TypeAdapter(model) if model is not None else None
+
+        def decorator(func):
+            route = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                try:
+                    await self.flush()
+                    versions = await self.backend.tag_versions(tag_names)
+                    params = sorted(
+                        (name, value.value if isinstance(value, Enum) else str(value))
+                        for name, value in kwargs.items()
+                        if value is not None and isinstance(value, KEY_TYPES)
+                    )
+                    key = f"{route}:{'.'.join(map(str, versions))}?{urlencode(params)}"
+                    value = await self.backend.get(key)
+                except Exception as e:
+                    logger.error(f"Cache lookup for {route} failed: {e}")
+                    return await func(*args, **kwargs)
+
+                if value is not None:
+                    self.hits[route] = self.hits.get(route, 0) + 1
+                    if rendered:
+                        return FastJSONResponse(value["body"].encode(), headers=value["headers"])
+                    return value
+
+                self.misses[route] = self.misses.get(route, 0) + 1
+                result = await func(*args, **kwargs)
+                if rendered:
+                    headers = {
+                        name: header for name, header in result.headers.items()
+                        if name not in ("content-length", "content-type")
+                    }
+                    value = {"body": result.body.decode(), "headers": headers}
+                elif adapter is not None:
+                    value = adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json")
+                else:
+                    value = jsonable_encoder(result)
+                try:
+                    await self.backend.set(key, value, ttl or self.default_ttl)
+                except Exception as e:
+                    logger.error(f"Cache store for {route} failed: {e}")
+                return result if rendered else value
+
+            return wrapper
+        return decorator
+
+
+def create_backend():
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("CACHE_BACKEND is redis but the redis package isn't installed; using the in-process cache")
+    return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+
+
+response_cache = ResponseCache(create_backend(), settings.CACHE_TTL_SECONDS)
+on_commit(response_cache.invalidate)
+cached = response_cache.cached
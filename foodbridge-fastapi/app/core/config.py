@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import os
 
 class Settings(BaseSettings):
@@ -11,9 +11,29 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
     ALGORITHM: str = "HS256"
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # Verified tokens and their users are reused for this long
+    AUTH_CACHE_MAX_ENTRIES: int = 4096
+    
+    # Password hashing runs on its own bounded thread pool
+    BCRYPT_ROUNDS: int = 12  # Work factor for new hashes
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Logins beyond this many in flight get a 429
     
     # Database
     DATABASE_URL: str = "sqlite:///./climate_food_security.db"
+    ASYNC_DATABASE_URL: str = ""  # Derived from DATABASE_URL when empty
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    
+    # SQLite tuned mode: WAL, one writer connection and a pool of read-only readers
+    SQLITE_TUNED: bool = False
+    SQLITE_READ_POOL_SIZE: int = 8
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
     
     # CORS
     ALLOWED_HOSTS: List[str] = ["*"]
@@ -22,9 +42,55 @@ class Settings(BaseSettings):
     WEATHER_API_KEY: str = ""
     DISASTER_API_KEY: str = ""
     
+    # Resource allocation solver
+    ALLOCATION_TIME_BUDGET_SECONDS: float = 3.0
+    ALLOCATION_WORKERS: int = 2
+    ALLOCATION_CANDIDATES: int = 25  # Nearest sources considered per community
+    
+    # Materialized dashboard metrics
+    DASHBOARD_REBUILD_SECONDS: float = 300.0  # Full recompute interval, picks up writes from other processes
+    
     # Redis for caching and background tasks
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Response cache for read-heavy GET endpoints
+    CACHE_BACKEND: str = "memory"  # memory, or redis (needs the redis package and REDIS_URL)
+    CACHE_TTL_SECONDS: float = 30.0
+    CACHE_MAX_ENTRIES: int = 1024
+    
+    # WebSocket delivery: per-connection outbound queues drained by writer tasks
+    WS_SEND_TIMEOUT_SECONDS: float = 2.0  # Clients that can't take a message within this are evicted
+    WS_QUEUE_SIZE: int = 256  # Messages buffered per connection
+    # Overflow policy per message type: drop_oldest, never_drop or disconnect
+    WS_OVERFLOW_POLICIES: Dict[str, str] = {"system_update": "drop_oldest", "heartbeat": "drop_oldest", "emergency_alert": "never_drop"}
+    WS_DEFAULT_OVERFLOW_POLICY: str = "disconnect"
+    # Backplane carrying broadcasts and user messages between workers: memory (single process),
+    # local (Unix sockets in WS_BACKPLANE_DIR, for workers on one host) or redis (REDIS_URL)
+    WS_BACKPLANE: str = "memory"
+    WS_BACKPLANE_DIR: str = "/tmp/foodbridge-realtime"
+    WS_BACKPLANE_CHANNEL: str = "foodbridge:realtime"
+    WS_BACKPLANE_DEDUP_ENTRIES: int = 10000  # Recently delivered envelope ids remembered per process
+    WS_BACKPLANE_DEDUP_SECONDS: float = 60.0
+    # Recent broadcasts kept per topic for clients resuming after a disconnect. A resume missing
+    # more than WS_QUEUE_SIZE messages gets resync_required instead of a replay
+    WS_REPLAY_BUFFER_SIZE: int = 256
+    WS_MAX_BATCH_MS: int = 250  # Longest batching window a client can ask for
+    WS_PER_MESSAGE_DEFLATE: bool = True  # Offer permessage-deflate compression to clients that support it
+    WS_HEARTBEAT_SECONDS: float = 30.0  # Quiet connections get a heartbeat this often and should answer it
+    WS_IDLE_TIMEOUT_SECONDS: float = 90.0  # Connections that send nothing for this long are reaped
+    WS_MAX_CONNECTIONS_PER_USER: int = 10  # Further connections close the user's oldest one
+
+    # Bulk exports streamed from a server-side cursor
+    EXPORT_BATCH_SIZE: int = 2000  # Rows fetched and encoded per chunk
+
+    # Bulk ingest endpoints
+    BULK_CHUNK_SIZE: int = 500  # Rows validated, inserted and committed together
+
+    # Background expiry sweeper for food inventory
+    EXPIRY_SWEEP_SECONDS: float = 300.0  # Interval between sweeps; each also reloads the expiry heap
+    EXPIRY_SWEEP_BATCH_SIZE: int = 1000  # Expired items marked unavailable per UPDATE and commit
+    EXPIRY_HORIZON_DAYS: int = 30  # Items expiring within this many days are kept in memory
+    
     # ML Model paths
     VULNERABILITY_MODEL_PATH: str = "./models/vulnerability_model.pkl"
     FOOD_SHORTAGE_MODEL_PATH: str = "./models/food_shortage_model.pkl"
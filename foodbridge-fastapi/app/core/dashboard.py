@@ -0,0 +1,212 @@
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from app.core.config import settings
+from app.db.events import ChangeSet, on_commit
+from app.models import DisasterAlert, FoodInventory, VulnerabilityAssessment, FoodDistribution, VulnerabilityLevel
+from app.schemas import DashboardMetrics
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+KG_UNITS = ("kg", "kilograms")
+HIGH_RISK_LEVELS = (VulnerabilityLevel.HIGH, VulnerabilityLevel.VERY_HIGH)
+UPCOMING_STATUSES = ("planned", "ongoing")
+LOW_RESERVE_THRESHOLD = 100  # Emergency reserves below this quantity count as low
+
+COUNTERS = ("active_alerts", "total_food_inventory_kg", "communities_assessed",
+            "high_risk_communities", "emergency_reserves_low")
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _alert_counts(row: Dict) -> Dict:
+    return {"active_alerts": 1 if row["is_active"] else 0}
+
+
+def _inventory_counts(row: Dict) -> Dict:
+    available = bool(row["is_available"])
+    quantity = row["quantity"]
+    return {
+        "total_food_inventory_kg": (quantity or 0.0) if available and row["unit"] in KG_UNITS else 0.0,
+        "emergency_reserves_low": 1 if (
+            row["is_emergency_reserve"] and available and quantity is not None and quantity < LOW_RESERVE_THRESHOLD
+        ) else 0
+    }
+
+
+def _assessment_counts(row: Dict) -> Dict:
+    return {
+        "communities_assessed": 1,
+        "high_risk_communities": 1 if row["overall_vulnerability"] in HIGH_RISK_LEVELS else 0
+    }
+
+
+# Counter contributions of a single row, per table
+ROW_COUNTS = {
+    DisasterAlert.__tablename__: _alert_counts,
+    FoodInventory.__tablename__: _inventory_counts,
+    VulnerabilityAssessment.__tablename__: _assessment_counts,
+}
+
+
+def _scheduled_date(row: Optional[Dict]) -> Optional[datetime]:
+    """Date a distribution counts towards upcoming events on, if it's planned or ongoing"""
+    if row is None or row["status"] not in UPCOMING_STATUSES:
+        return None
+    return _naive_utc(row["scheduled_date"])
+
+
+async def compute_dashboard_counts(db: AsyncSession):
+    """Recompute every dashboard metric from the tables"""
+    active_alerts = await db.scalar(select(func.count()).select_from(DisasterAlert).where(DisasterAlert.is_active == True))
+
+    total_food_kg = await db.scalar(select(func.sum(FoodInventory.quantity)).where(
+        and_(
+            FoodInventory.is_available == True,
+            FoodInventory.unit.in_(KG_UNITS)
+        )
+    )) or 0
+
+    communities_assessed = await db.scalar(select(func.count()).select_from(VulnerabilityAssessment))
+
+    high_risk_communities = await db.scalar(select(func.count()).select_from(VulnerabilityAssessment).where(
+        VulnerabilityAssessment.overall_vulnerability.in_(HIGH_RISK_LEVELS)
+    ))
+
+    low_reserves = await db.scalar(select(func.count()).select_from(FoodInventory).where(
+        and_(
+            FoodInventory.is_emergency_reserve == True,
+            FoodInventory.is_available == True,
+            FoodInventory.quantity < LOW_RESERVE_THRESHOLD
+        )
+    ))
+
+    # Upcoming distributions are kept as their dates, since they stop counting as time passes
+    scheduled = (await db.scalars(select(FoodDistribution.scheduled_date).where(
+        and_(
+            FoodDistribution.scheduled_date >= datetime.utcnow(),
+            FoodDistribution.status.in_(UPCOMING_STATUSES)
+        )
+    ))).all()
+
+    counts = {
+        "active_alerts": active_alerts,
+        "total_food_inventory_kg": float(total_food_kg),
+        "communities_assessed": communities_assessed,
+        "high_risk_communities": high_risk_communities,
+        "emergency_reserves_low": low_reserves
+    }
+    return counts, sorted(_naive_utc(date) for date in scheduled)
+
+
+class DashboardMetricsStore:
+    """In-process dashboard metrics kept current from committed writes.
+
+    Commits touching alerts, inventory, assessments or distributions apply
+    per-row deltas, so reading the metrics doesn't touch the database. The
+    store rebuilds from the tables when it starts, after bulk statements it
+    can't attribute to rows, and every DASHBOARD_REBUILD_SECONDS to pick up
+    writes made by other processes.
+    """
+
+    def __init__(self, rebuild_seconds: float):
+        self.rebuild_seconds = rebuild_seconds
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._scheduled = []  # Sorted dates of planned/ongoing distributions
+        self._lock = threading.Lock()
+        self._rebuild_lock = asyncio.Lock()
+        self._stale = True
+        self._built_at = 0.0
+        self._version = 0  # Bumped on every applied change, to detect writes during a rebuild
+
+    @property
+    def is_stale(self) -> bool:
+        return self._stale or time.monotonic() - self._built_at > self.rebuild_seconds
+
+    def invalidate(self):
+        self._stale = True
+
+    def apply(self, changes: ChangeSet):
+        """Fold one transaction's row changes into the counters"""
+        with self._lock:
+            for change in changes.rows:
+                if change.table == FoodDistribution.__tablename__:
+                    self._move_scheduled(_scheduled_date(change.old), _scheduled_date(change.new))
+                    continue
+                counts_for = ROW_COUNTS.get(change.table)
+                if counts_for is None:
+                    continue
+                for key, value in (counts_for(change.old) if change.old else {}).items():
+                    self._counts[key] -= value
+                for key, value in (counts_for(change.new) if change.new else {}).items():
+                    self._counts[key] += value
+            self._version += 1
+
+        if changes.bulk_tables & (set(ROW_COUNTS) | {FoodDistribution.__tablename__}):
+            self.invalidate()
+
+    def _move_scheduled(self, old: Optional[datetime], new: Optional[datetime]):
+        if old is not None:
+            position = bisect_left(self._scheduled, old)
+            # Past dates may already have been trimmed
+            if position < len(self._scheduled) and self._scheduled[position] == old:
+                del self._scheduled[position]
+        if new is not None:
+            insort(self._scheduled, new)
+
+    def _upcoming(self) -> int:
+        # Dates in the past never count again, so drop them as time moves on
+        del self._scheduled[:bisect_left(self._scheduled, datetime.utcnow())]
+        return len(self._scheduled)
+
+    async def rebuild(self, db: AsyncSession, force: bool = True):
+        """Recompute every metric from the tables"""
+        async with self._rebuild_lock:
+            # Another request may have rebuilt while this one waited
+            if not force and not self.is_stale:
+                return
+            version = self._version
+            counts, scheduled = await compute_dashboard_counts(db)
+            with self._lock:
+                self._counts = counts
+                self._scheduled = scheduled
+                self._built_at = time.monotonic()
+                # A commit landing mid-rebuild may be missing from the snapshot
+                self._stale = self._version != version
+            logger.info("Dashboard metrics rebuilt")
+
+    async def snapshot(self, db: AsyncSession) -> DashboardMetrics:
+        """Current metrics, rebuilding first if the store is stale"""
+        if self.is_stale:
+            await self.rebuild(db, force=False)
+        with self._lock:
+            return DashboardMetrics(
+                upcoming_distributions=self._upcoming(),
+                **self._counts
+            )
+
+    async def check_consistency(self, db: AsyncSession) -> Dict:
+        """Compare the materialized metrics with a full recompute"""
+        materialized = (await self.snapshot(db)).dict()
+        counts, scheduled = await compute_dashboard_counts(db)
+        recomputed = DashboardMetrics(upcoming_distributions=len(scheduled), **counts).dict()
+        mismatches = {
+            key: {"materialized": materialized[key], "recomputed": recomputed[key]}
+            for key in recomputed
+            if abs(materialized[key] - recomputed[key]) > 1e-6 * max(1.0, abs(recomputed[key]))
+        }
+        return {"consistent": not mismatches, "mismatches": mismatches, "recomputed": recomputed}
+
+
+dashboard_metrics = DashboardMetricsStore(settings.DASHBOARD_REBUILD_SECONDS)
+on_commit(dashboard_metrics.apply)
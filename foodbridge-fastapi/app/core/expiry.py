@@ -0,0 +1,227 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta, timezone
+from heapq import heapify, heappop, heappush
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.db.events import ChangeSet, on_commit
+from app.models import FoodInventory
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Columns kept in memory for each tracked item, enough to answer "expiring next" without a query
+TRACKED_FIELDS = ("id", "item_name", "category", "quantity", "unit", "location", "is_emergency_reserve", "expiry_date")
+
+
+def _expiry_of(row: Optional[Dict]) -> Optional[datetime]:
+    """Naive UTC expiry of an available item, None if it isn't available or never expires"""
+    if row is None or not row["is_available"] or row["expiry_date"] is None:
+        return None
+    expiry = row["expiry_date"]
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+def expired_batch(now: datetime, batch_size: int):
+    """Ids of up to batch_size available items that expired by now"""
+    return select(FoodInventory.id).where(
+        FoodInventory.is_available == True,
+        FoodInventory.expiry_date <= now
+    ).order_by(FoodInventory.expiry_date).limit(batch_size)
+
+
+def retire_expired(item_ids: List[int], now: datetime):
+    """UPDATE marking the given items unavailable if they are still available and expired by now"""
+    return (
+        update(FoodInventory)
+        .where(
+            FoodInventory.id.in_(item_ids),
+            FoodInventory.is_available == True,
+            FoodInventory.expiry_date <= now
+        )
+        .values(is_available=False, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ExpiryTracker:
+    """Available inventory expiring within EXPIRY_HORIZON_DAYS, nearest expiry first.
+
+    Items sit in a min-heap of (expiry, id) kept current from committed
+    writes. An item that changes gets a fresh heap entry and its old one is
+    skipped when reached, since it no longer matches the item's expiry.
+    A background sweeper marks expired stock unavailable every
+    EXPIRY_SWEEP_SECONDS and rebuilds the heap from the table, which picks up
+    items entering the horizon and writes made by other processes.
+    """
+
+    def __init__(self, sweep_seconds: float, batch_size: int, horizon_days: int):
+        self.sweep_seconds = sweep_seconds
+        self.batch_size = batch_size
+        self.horizon = timedelta(days=horizon_days)
+        self._heap = []
+        self._items: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._rebuild_lock = asyncio.Lock()
+        self._stale = True
+        self._version = 0  # Bumped on every applied change, to detect writes during a rebuild
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats = {"sweeps": 0, "expired": 0, "rebuilds": 0, "last_sweep_ms": 0.0}
+
+    def invalidate(self):
+        self._stale = True
+
+    def apply(self, changes: ChangeSet):
+        """Fold one transaction's inventory changes into the heap"""
+        horizon_end = datetime.utcnow() + self.horizon
+        with self._lock:
+            for change in changes.rows:
+                if change.table != FoodInventory.__tablename__:
+                    continue
+                row = change.new or change.old
+                expiry = _expiry_of(change.new)
+                if expiry is None or expiry > horizon_end:
+                    self._items.pop(row["id"], None)
+                    continue
+                self._items[row["id"]] = {**{field: row[field] for field in TRACKED_FIELDS}, "expiry_date": expiry}
+                heappush(self._heap, (expiry, row["id"]))
+            self._version += 1
+            # Superseded entries only leave when reached, so compact if they pile up
+            if len(self._heap) > 2 * len(self._items) + 1000:
+                self._compact()
+
+        if FoodInventory.__tablename__ in changes.bulk_tables:
+            self.invalidate()
+
+    def _compact(self):
+        self._heap = [(item["expiry_date"], item_id) for item_id, item in self._items.items()]
+        heapify(self._heap)
+
+    def _current(self, entry) -> bool:
+        item = self._items.get(entry[1])
+        return item is not None and item["expiry_date"] == entry[0]
+
+    async def rebuild(self, db: AsyncSession, force: bool = True):
+        """Reload the items expiring within the horizon from the table"""
+        async with self._rebuild_lock:
+            if not force and not self._stale:
+                return
+            version = self._version
+            now = datetime.utcnow()
+            rows = (await db.execute(select(*(getattr(FoodInventory, field) for field in TRACKED_FIELDS)).where(
+                FoodInventory.is_available == True,
+                FoodInventory.expiry_date > now,
+                FoodInventory.expiry_date <= now + self.horizon
+            ))).all()
+            with self._lock:
+                self._items = {row.id: row._asdict() for row in rows}
+                self._compact()
+                # A commit landing mid-rebuild may be missing from the snapshot
+                self._stale = self._version != version
+            self._stats["rebuilds"] += 1
+
+    async def expiring_next(self, db: AsyncSession, limit: int, within_days: Optional[int] = None) -> List[Dict]:
+        """Up to limit items expiring soonest, optionally only those expiring within within_days.
+
+        within_days must not exceed the horizon. Without it, when the heap
+        runs out before limit items, the rest come from the expiry index.
+        """
+        if self._stale:
+            await self.rebuild(db, force=False)
+        now = datetime.utcnow()
+        until = now + (timedelta(days=within_days) if within_days is not None else self.horizon)
+        with self._lock:
+            # Entries that have expired or been superseded can go for good
+            while self._heap and (self._heap[0][0] <= now or not self._current(self._heap[0])):
+                expiry, item_id = heappop(self._heap)
+                if expiry <= now and self._current((expiry, item_id)):
+                    del self._items[item_id]
+
+            # Walk the heap smallest first without popping: the next smallest
+            # entry is always a child of one already visited
+            found = []
+            frontier = [(self._heap[0], 0)] if self._heap else []
+            while frontier and len(found) < limit:
+                entry, index = heappop(frontier)
+                if entry[0] > until:
+                    break
+                if self._current(entry):
+                    found.append(dict(self._items[entry[1]]))
+                for child in (2 * index + 1, 2 * index + 2):
+                    if child < len(self._heap):
+                        heappush(frontier, (self._heap[child], child))
+
+        if within_days is None and len(found) < limit:
+            found.extend(await self._expiring_after(db, found, limit - len(found), now))
+        return found
+
+    async def _expiring_after(self, db: AsyncSession, found: List[Dict], limit: int, now: datetime) -> List[Dict]:
+        """Next items to expire after those already found, beyond what the heap holds"""
+        query = select(*(getattr(FoodInventory, field) for field in TRACKED_FIELDS)).where(
+            FoodInventory.is_available == True,
+            FoodInventory.expiry_date >= (found[-1]["expiry_date"] if found else now)
+        )
+        if found:
+            query = query.where(FoodInventory.id.notin_([item["id"] for item in found]))
+        rows = await db.execute(query.order_by(FoodInventory.expiry_date, FoodInventory.id).limit(limit))
+        return [row._asdict() for row in rows]
+
+    async def sweep(self, session_factory) -> int:
+        """Mark every expired available item unavailable, one batch per commit.
+
+        Expired ids are selected first, so a sweep that finds none writes
+        nothing and doesn't invalidate cached inventory or dashboard metrics.
+        """
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        expired = 0
+        async with session_factory() as db:
+            while True:
+                item_ids = (await db.scalars(expired_batch(now, self.batch_size))).all()
+                if not item_ids:
+                    break
+                result = await db.execute(retire_expired(item_ids, now))
+                await db.commit()
+                expired += result.rowcount
+                if len(item_ids) < self.batch_size:
+                    break
+            await self.rebuild(db)
+        self._stats["sweeps"] += 1
+        self._stats["expired"] += expired
+        self._stats["last_sweep_ms"] = (time.perf_counter() - start) * 1000
+        return expired
+
+    def stats(self) -> Dict:
+        """Sweep counters and the size of the in-memory heap"""
+        return {"tracked": len(self._items), "heap_entries": len(self._heap), **self._stats}
+
+    async def start(self, session_factory, on_expired=None):
+        """Start the sweeper; on_expired(count) is awaited after a sweep that retired items"""
+        self._sweeper = asyncio.get_running_loop().create_task(self._run(session_factory, on_expired))
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _run(self, session_factory, on_expired):
+        while True:
+            try:
+                expired = await self.sweep(session_factory)
+                if expired:
+                    logger.info(f"Marked {expired} expired inventory items unavailable")
+                    if on_expired is not None:
+                        await on_expired(expired)
+            except Exception as e:
+                logger.error(f"Inventory expiry sweep failed: {e}")
+            await asyncio.sleep(self.sweep_seconds)
+
+
+expiry_tracker = ExpiryTracker(settings.EXPIRY_SWEEP_SECONDS, settings.EXPIRY_SWEEP_BATCH_SIZE,
+                               settings.EXPIRY_HORIZON_DAYS)
+on_commit(expiry_tracker.apply)
@@ -0,0 +1,98 @@
+from datetime import datetime
+from enum import Enum
+from fastapi.responses import StreamingResponse
+from sqlalchemy import DateTime, Enum as SQLEnum, Select
+from typing import AsyncIterator, List
+from app.core.config import settings
+from app.core.serialization import dumps
+from app.db.session import AsyncSessionLocal
+import csv
+import io
+import zlib
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    CSV_GZIP = "csv.gz"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.CSV_GZIP: "application/gzip",
+}
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _encode_ndjson(keys: List[str], result) -> AsyncIterator[bytes]:
+    async for batch in result.partitions():
+        yield b"".join([dumps(dict(zip(keys, row))) + b"\n" for row in batch])
+
+
+def _encode_rows(batch, converted: List[int]):
+    for row in batch:
+        row = list(row)
+        for index in converted:
+            row[index] = _csv_value(row[index])
+        yield row
+
+
+async def _encode_csv(keys: List[str], result, converted: List[int]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(keys)
+    async for batch in result.partitions():
+        writer.writerows(_encode_rows(batch, converted))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode()  # Just the header when there were no rows
+
+
+async def stream_rows(session_factory, query: Select, format: ExportFormat) -> AsyncIterator[bytes]:
+    """Encode a query's rows batch by batch as they arrive from a server-side cursor.
+
+    Only EXPORT_BATCH_SIZE rows are held at a time. The export opens its own
+    session because the response body is produced after the endpoint, and
+    its dependencies, have returned.
+    """
+    async with session_factory() as db:
+        # Stream on the Core connection; the rows are plain tuples, so the ORM loading layer adds nothing
+        connection = await db.connection()
+        result = await connection.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        keys = list(result.keys())
+        if format is ExportFormat.NDJSON:
+            encoded = _encode_ndjson(keys, result)
+        else:
+            # Only datetimes and enums need converting; csv writes everything else as is
+            converted = [
+                index for index, column in enumerate(query.selected_columns)
+                if isinstance(column.type, (DateTime, SQLEnum))
+            ]
+            encoded = _encode_csv(keys, result, converted)
+        # wbits=31 writes a gzip container rather than a bare zlib stream
+        compressor = zlib.compressobj(wbits=31) if format is ExportFormat.CSV_GZIP else None
+        async for chunk in encoded:
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        if compressor is not None:
+            yield compressor.flush()
+
+
+def export_response(query: Select, format: ExportFormat, name: str) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%d}.{format.value}"
+    return StreamingResponse(
+        stream_rows(AsyncSessionLocal, query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,209 @@
+from sqlalchemy import and_, or_, event
+from typing import List, Optional, Tuple
+import numpy as np
+import math
+
+# Geohash cells stored on geo-located rows. Precision 7 is roughly 150m x 150m,
+# fine enough that a radius query at any useful scale can pick a coarser prefix.
+GEOCELL_PRECISION = 7
+
+# Upper bound on the number of cells used to cover a radius query. The covering
+# precision is the finest one that stays under this bound.
+MAX_COVERING_CELLS = 16
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {char: index for index, char in enumerate(_BASE32)}
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOCELL_PRECISION) -> str:
+    """Encode a coordinate as a geohash string of the given precision"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_lo = mid
+            else:
+                bits <<= 1
+                lng_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geocell_for(lat: Optional[float], lng: Optional[float]) -> Optional[str]:
+    """Geocell value to store for a row, or None when it has no coordinates"""
+    if lat is None or lng is None:
+        return None
+    return encode_geohash(lat, lng, GEOCELL_PRECISION)
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """Return (min_lat, max_lat, min_lng, max_lng) enclosing a circle around a point.
+
+    Longitude degrees shrink with cos(latitude), so the longitude span widens
+    away from the equator instead of using a flat km-per-degree factor.
+    """
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    lat_delta = math.degrees(angular_radius)
+    min_lat = max(lat - lat_delta, -90.0)
+    max_lat = min(lat + lat_delta, 90.0)
+
+    # The circle touches a pole, so every longitude is in range
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    ratio = math.sin(angular_radius) / math.cos(math.radians(lat))
+    if ratio >= 1.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    lng_delta = math.degrees(math.asin(ratio))
+    return min_lat, max_lat, max(lng - lng_delta, -180.0), min(lng + lng_delta, 180.0)
+
+
+def haversine_km(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """Great-circle distances in km from one point to arrays of coordinates"""
+    lat_rad = math.radians(lat)
+    lats_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    dlat = lats_rad - lat_rad
+    dlng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat_rad) * np.cos(lats_rad) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_within(lat: float, lng: float, radius_km: float, rows, lat_attr: str = "latitude", lng_attr: str = "longitude"):
+    """Pair rows with their distance from a point, keeping those within radius_km sorted nearest first.
+
+    All candidates are scored with a single vectorized haversine call.
+    """
+    rows = [row for row in rows if getattr(row, lat_attr) is not None and getattr(row, lng_attr) is not None]
+    if not rows:
+        return []
+
+    distances = haversine_km(
+        lat, lng,
+        [getattr(row, lat_attr) for row in rows],
+        [getattr(row, lng_attr) for row in rows]
+    )
+    order = np.argsort(distances, kind="stable")
+    return [(rows[index], float(distances[index])) for index in order if distances[index] <= radius_km]
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    """Height and width in degrees of a geohash cell"""
+    total_bits = precision * 5
+    lat_bits = total_bits // 2
+    lng_bits = total_bits - lat_bits
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _cell_span(lo: float, hi: float, origin: float, size: float, count: int) -> Tuple[int, int]:
+    start = int((max(lo, origin) - origin) // size)
+    end = int((min(hi, -origin) - origin) // size)
+    return max(0, start), min(count - 1, end)
+
+
+def covering_cells(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> List[str]:
+    """Geohash prefixes that together cover a bounding box"""
+    for precision in range(GEOCELL_PRECISION, 0, -1):
+        lat_size, lng_size = _cell_size(precision)
+        lat_count = int(round(180.0 / lat_size))
+        lng_count = int(round(360.0 / lng_size))
+        row_start, row_end = _cell_span(min_lat, max_lat, -90.0, lat_size, lat_count)
+        col_start, col_end = _cell_span(min_lng, max_lng, -180.0, lng_size, lng_count)
+
+        if (row_end - row_start + 1) * (col_end - col_start + 1) > MAX_COVERING_CELLS and precision > 1:
+            continue
+
+        return sorted({
+            encode_geohash(
+                -90.0 + (row + 0.5) * lat_size,
+                -180.0 + (col + 0.5) * lng_size,
+                precision
+            )
+            for row in range(row_start, row_end + 1)
+            for col in range(col_start, col_end + 1)
+        })
+    return []
+
+
+def _prefix_successor(prefix: str) -> Optional[str]:
+    """Smallest geohash string that sorts after every string starting with prefix"""
+    chars = list(prefix)
+    while chars:
+        index = _BASE32_INDEX[chars[-1]]
+        if index + 1 < len(_BASE32):
+            chars[-1] = _BASE32[index + 1]
+            return "".join(chars)
+        chars.pop()
+    return None
+
+
+def cell_ranges(cells: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """Collapse sorted geohash prefixes into half-open [lo, hi) string ranges"""
+    ranges: List[Tuple[str, Optional[str]]] = []
+    for cell in sorted(cells):
+        hi = _prefix_successor(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], hi)
+        else:
+            ranges.append((cell, hi))
+    return ranges
+
+
+def radius_ranges(lat: float, lng: float, radius_km: float) -> List[Tuple[str, Optional[str]]]:
+    """Geocell ranges covering a circle of radius_km around a point"""
+    return cell_ranges(covering_cells(*bounding_box(lat, lng, radius_km)))
+
+
+def within_radius(model, lat: float, lng: float, radius_km: float):
+    """Filter clause selecting rows of a geocell-indexed model near a point.
+
+    The geocell ranges narrow the scan to an index range per covering cell and
+    the bounding box trims the cell edges.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    cell_filters = [
+        and_(model.geocell >= lo, model.geocell < hi) if hi is not None else model.geocell >= lo
+        for lo, hi in radius_ranges(lat, lng, radius_km)
+    ]
+    return and_(
+        or_(*cell_filters),
+        model.latitude.between(min_lat, max_lat),
+        model.longitude.between(min_lng, max_lng)
+    )
+
+
+def _sync_geocell(mapper, connection, target):
+    target.geocell = geocell_for(target.latitude, target.longitude)
+
+
+def track_geocell(model):
+    """Keep model.geocell in sync with latitude/longitude on insert and update"""
+    event.listen(model, "before_insert", _sync_geocell)
+    event.listen(model, "before_update", _sync_geocell)
+    return model
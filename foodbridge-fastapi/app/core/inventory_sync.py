@@ -0,0 +1,142 @@
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Set
+from app.core.bulk import InvalidLine
+from app.core.config import settings
+from app.core.geo import geocell_for
+from app.models import FoodInventory
+from app.schemas import FoodInventoryFeedLine
+
+# Columns a feed line sets; a row is only updated when one of them differs
+SYNCED_FIELDS = [
+    name for name in FoodInventoryFeedLine.model_fields if name not in ("owner_organization", "external_id")
+] + ["is_available"]
+
+
+class InventoryFeed:
+    """Validated lines of one feed, keyed on external_id, with per-line errors"""
+
+    def __init__(self):
+        self.lines: Dict[str, Dict] = {}
+        self.errors: List[Dict] = []
+        self.received = 0
+        self.protected: Set[str] = set()  # external_ids of invalid lines, never soft-deleted
+
+    def fail(self, index: int, errors: List[Dict], record: Any = None):
+        self.errors.append({"index": index, "errors": errors})
+        external_id = record.get("external_id") if isinstance(record, dict) else None
+        if isinstance(external_id, str):
+            self.protected.add(external_id)
+
+
+def _line_values(line: FoodInventoryFeedLine, owner_organization: str, now: datetime) -> Dict:
+    values = line.model_dump()
+    values["owner_organization"] = owner_organization
+    expiry_date = values["expiry_date"]
+    if expiry_date is not None and expiry_date.tzinfo is not None:
+        # Stored naive in UTC; compare the same way or every aware date would look changed
+        values["expiry_date"] = expiry_date.astimezone(timezone.utc).replace(tzinfo=None)
+    # Listed in the feed, so back in stock if it had been dropped, unless it has expired
+    # (the expiry sweeper retires those, and a resent feed mustn't bring them back)
+    values["is_available"] = values["expiry_date"] is None or values["expiry_date"] > now
+    return values
+
+
+async def read_feed(records: AsyncIterator[Any], owner_organization: str) -> InventoryFeed:
+    feed = InventoryFeed()
+    now = datetime.utcnow()
+    async for record in records:
+        index = feed.received
+        feed.received += 1
+        if isinstance(record, InvalidLine):
+            feed.fail(index, [{"type": "json_invalid", "msg": record.error}])
+            continue
+        try:
+            values = _line_values(FoodInventoryFeedLine.model_validate(record), owner_organization, now)
+        except ValidationError as e:
+            feed.fail(index, e.errors(include_url=False, include_context=False, include_input=False), record)
+            continue
+        if values["external_id"] in feed.lines:
+            feed.fail(index, [{"type": "duplicate", "loc": ["external_id"], "msg": "external_id appears earlier in the feed"}])
+            continue
+        feed.lines[values["external_id"]] = values
+    return feed
+
+
+class SyncPlan:
+    """Writes that bring an organization's inventory in line with a feed"""
+
+    def __init__(self):
+        self.inserts: List[Dict] = []
+        self.updates: List[Dict] = []  # id plus only the columns that changed
+        self.deletes: List[int] = []  # Rows missing from the feed, to mark unavailable
+        self.unchanged = 0
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+            "deleted": len(self.deletes),
+            "unchanged": self.unchanged
+        }
+
+    def __bool__(self):
+        return bool(self.inserts or self.updates or self.deletes)
+
+
+async def plan_sync(db: AsyncSession, owner_organization: str, feed: InventoryFeed) -> SyncPlan:
+    """Diff the feed against the organization's current rows"""
+    columns = [FoodInventory.id, FoodInventory.external_id, *(getattr(FoodInventory, name) for name in SYNCED_FIELDS)]
+    current = await db.execute(select(*columns).where(
+        FoodInventory.owner_organization == owner_organization,
+        FoodInventory.external_id.isnot(None)
+    ))
+
+    plan = SyncPlan()
+    remaining = dict(feed.lines)
+    for row in current:
+        line = remaining.pop(row.external_id, None)
+        if line is None:
+            if row.is_available and row.external_id not in feed.protected:
+                plan.deletes.append(row.id)
+            continue
+        existing = row._mapping
+        changed = {name: line[name] for name in SYNCED_FIELDS if line[name] != existing[name]}
+        if changed:
+            # Geocells are only worth computing for items that moved
+            if "latitude" in changed or "longitude" in changed:
+                changed["geocell"] = geocell_for(line["latitude"], line["longitude"])
+            plan.updates.append({"id": row.id, **changed})
+        else:
+            plan.unchanged += 1
+    plan.inserts = [
+        {**line, "geocell": geocell_for(line["latitude"], line["longitude"])} for line in remaining.values()
+    ]
+    return plan
+
+
+async def apply_sync(db: AsyncSession, plan: SyncPlan):
+    """Apply a plan in BULK_CHUNK_SIZE transactions.
+
+    Updates go out as executemany UPDATE ... WHERE id = ?, grouped by the
+    set of changed columns, and soft deletes as UPDATE ... WHERE id IN (...).
+    A sync that fails part way can simply be re-run: the plan is recomputed
+    from what was committed.
+    """
+    size = settings.BULK_CHUNK_SIZE
+    now = datetime.utcnow()
+    for start in range(0, len(plan.inserts), size):
+        await db.execute(insert(FoodInventory), plan.inserts[start:start + size])
+        await db.commit()
+    for start in range(0, len(plan.updates), size):
+        await db.execute(update(FoodInventory), [{**row, "updated_at": now} for row in plan.updates[start:start + size]])
+        await db.commit()
+    for start in range(0, len(plan.deletes), size):
+        await db.execute(
+            update(FoodInventory)
+            .where(FoodInventory.id.in_(plan.deletes[start:start + size]))
+            .values(is_available=False, updated_at=now)
+        )
+        await db.commit()
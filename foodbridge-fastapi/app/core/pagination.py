@@ -0,0 +1,63 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_, tuple_
+from typing import Any, Dict, List, Optional, Tuple
+import json
+
+# Response header carrying the cursor for the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id], separators=(",", ":"))
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        sort_value, row_id = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(sort_value) if sort_value is not None else None, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def paginate(query: Select, sort_column, id_column, cursor: Optional[str], skip: int, limit: int) -> Select:
+    """Order a list query newest first on (sort_column, id) and select one page.
+
+    A cursor starts the page right after the row it names, which stays an
+    index range scan however deep the page is and doesn't shift when new
+    rows arrive. Without one the old skip offset applies. One row past the
+    page is fetched so next_page knows whether there is more.
+
+    Rows whose sort_column is NULL (legacy rows, raw inserts) come last,
+    newest id first, since a tuple comparison would never select them.
+    """
+    query = query.order_by(sort_column.desc().nulls_last(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            query = query.where(and_(sort_column.is_(None), id_column < row_id))
+        else:
+            query = query.where(or_(tuple_(sort_column, id_column) < (sort_value, row_id), sort_column.is_(None)))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def next_page(rows: List[Any], limit: int, sort_field: str) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row paginate fetched; return the page and the cursor following it"""
+    page = rows[:limit]
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    if isinstance(last, dict):
+        return page, encode_cursor(last[sort_field], last["id"])
+    return page, encode_cursor(getattr(last, sort_field), last.id)
+
+
+def cursor_headers(cursor: Optional[str]) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: cursor} if cursor else {}
@@ -1,10 +1,21 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.cache import TTLCache
+import asyncio
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small pool hashes in parallel without stalling the event loop
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password")
+_password_jobs = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+# Decoded payloads of recently verified tokens
+_token_cache = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create JWT access token"""
@@ -26,14 +37,65 @@ def get_password_hash(password: str) -> str:
     """Hash password"""
     return pwd_context.hash(password)
 
+async def _run_password_job(func, *args):
+    """Run a bcrypt call on the password pool, rejecting work once the queue is full"""
+    if _password_jobs["pending"] >= settings.PASSWORD_HASH_MAX_PENDING:
+        _password_jobs["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    _password_jobs["pending"] += 1
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+    except Exception:
+        _password_jobs["failed"] += 1
+        raise
+    finally:
+        _password_jobs["pending"] -= 1
+    _password_jobs["completed"] += 1
+    return result
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash on the password pool"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash password on the password pool"""
+    return await _run_password_job(get_password_hash, password)
+
+def password_pool_stats() -> dict:
+    """Queue depth and throughput counters of the password pool"""
+    workers = settings.PASSWORD_HASH_WORKERS
+    return {
+        "workers": workers,
+        "in_flight": _password_jobs["pending"],
+        "queue_depth": max(0, _password_jobs["pending"] - workers),
+        "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+        "completed": _password_jobs["completed"],
+        "failed": _password_jobs["failed"],
+        "rejected": _password_jobs["rejected"]
+    }
+
 def verify_token(token: str) -> dict:
     """Verify JWT token"""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+    payload = _token_cache.get(token)
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        # Never keep a token past its own expiry
+        ttl = settings.AUTH_CACHE_TTL_SECONDS
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            _token_cache.set(token, payload, ttl)
+    return dict(payload)
\ No newline at end of file
@@ -0,0 +1,65 @@
+from datetime import date, datetime
+from enum import Enum
+from fastapi import Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
+import functools
+import json
+
+try:
+    import orjson  # Optional dependency; list responses fall back to the json module without it
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode plain rows (dicts of column values) as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+
+def loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+class FastJSONResponse(Response):
+    """JSON response for rows that are already in the response shape.
+
+    Returning it from an endpoint skips the response_model validation and
+    jsonable_encoder passes FastAPI would otherwise run over every row;
+    response_model still documents the shape. Content that is already
+    bytes is sent as is.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
+
+
+@functools.lru_cache(maxsize=None)
+def schema_columns(model, schema) -> tuple:
+    """The model attributes backing each field of a response schema, in field order"""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+async def fetch_rows(db: AsyncSession, query: Select, schema) -> List[Dict]:
+    """Run a select(Model) query for just the columns schema returns, as plain dicts.
+
+    No ORM objects are built, so there is no identity map bookkeeping or
+    attribute instrumentation per row.
+    """
+    model = query.column_descriptions[0]["entity"]
+    result = await db.execute(query.with_only_columns(*schema_columns(model, schema)))
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
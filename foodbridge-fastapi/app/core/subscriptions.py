@@ -0,0 +1,159 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+from app.core.geo import GEOCELL_PRECISION, bounding_box, covering_cells, encode_geohash, haversine_km
+
+
+class GeoArea:
+    """Area a connection wants located messages for: a bounding box or a circle"""
+
+    def __init__(self, min_lat: float, max_lat: float, min_lng: float, max_lng: float,
+                 center: Optional[tuple] = None, radius_km: Optional[float] = None):
+        if min_lat > max_lat or min_lng > max_lng:
+            raise ValueError("Bounding box minimums must not exceed its maximums")
+        self.min_lat, self.max_lat, self.min_lng, self.max_lng = min_lat, max_lat, min_lng, max_lng
+        self.center = center
+        self.radius_km = radius_km
+        self.cells = covering_cells(min_lat, max_lat, min_lng, max_lng)
+
+    @classmethod
+    def from_bbox(cls, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> "GeoArea":
+        return cls(float(min_lat), float(max_lat), float(min_lng), float(max_lng))
+
+    @classmethod
+    def from_radius(cls, latitude: float, longitude: float, radius_km: float) -> "GeoArea":
+        if radius_km <= 0:
+            raise ValueError("radius_km must be positive")
+        latitude, longitude, radius_km = float(latitude), float(longitude), float(radius_km)
+        return cls(*bounding_box(latitude, longitude, radius_km), center=(latitude, longitude), radius_km=radius_km)
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not (self.min_lat <= latitude <= self.max_lat and self.min_lng <= longitude <= self.max_lng):
+            return False
+        if self.radius_km is None:
+            return True
+        return float(haversine_km(self.center[0], self.center[1], [latitude], [longitude])[0]) <= self.radius_km
+
+    def describe(self) -> Dict:
+        if self.radius_km is not None:
+            return {"latitude": self.center[0], "longitude": self.center[1], "radius_km": self.radius_km}
+        return {"min_lat": self.min_lat, "min_lng": self.min_lng, "max_lat": self.max_lat, "max_lng": self.max_lng}
+
+
+class SubscriptionIndex:
+    """Connections indexed by topic, user role and geocell.
+
+    A connection with no topics receives every topic, and one with no area
+    receives located messages from anywhere. Areas are indexed under the
+    geohash prefixes covering them, so matching a located message looks up
+    the message's own prefixes instead of testing every connection.
+    """
+
+    def __init__(self):
+        self.all_topics: Set[str] = set()  # Connections without a topic filter
+        self.by_topic: Dict[str, Set[str]] = defaultdict(set)
+        self.by_role: Dict[str, Set[str]] = defaultdict(set)
+        self.anywhere: Set[str] = set()  # Connections without an area filter
+        self.by_cell: Dict[str, Set[str]] = defaultdict(set)
+        self.topics: Dict[str, Set[str]] = {}
+        self.areas: Dict[str, GeoArea] = {}
+        self.roles: Dict[str, Optional[str]] = {}
+
+    def add(self, connection_id: str, role: Optional[str] = None):
+        """Index a new connection; it receives everything until it subscribes"""
+        self.roles[connection_id] = role
+        if role:
+            self.by_role[role].add(connection_id)
+        self.topics[connection_id] = set()
+        self.all_topics.add(connection_id)
+        self.anywhere.add(connection_id)
+
+    def subscribe(self, connection_id: str, topics: Optional[Iterable[str]] = None, area: Optional[GeoArea] = None):
+        """Replace a connection's topic and area filters; empty filters match everything"""
+        if connection_id not in self.roles:
+            return
+        self._unindex_filters(connection_id)
+        topics = set(topics or ())
+        self.topics[connection_id] = topics
+        if topics:
+            for topic in topics:
+                self.by_topic[topic].add(connection_id)
+        else:
+            self.all_topics.add(connection_id)
+        if area is not None:
+            self.areas[connection_id] = area
+            for cell in area.cells:
+                self.by_cell[cell].add(connection_id)
+        else:
+            self.anywhere.add(connection_id)
+
+    def remove(self, connection_id: str):
+        if connection_id not in self.roles:
+            return
+        self._unindex_filters(connection_id)
+        self.topics.pop(connection_id, None)
+        role = self.roles.pop(connection_id)
+        if role:
+            self._discard(self.by_role, role, connection_id)
+
+    def _unindex_filters(self, connection_id: str):
+        for topic in self.topics.get(connection_id, ()):
+            self._discard(self.by_topic, topic, connection_id)
+        self.all_topics.discard(connection_id)
+        area = self.areas.pop(connection_id, None)
+        for cell in area.cells if area is not None else ():
+            self._discard(self.by_cell, cell, connection_id)
+        self.anywhere.discard(connection_id)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, connection_id: str):
+        members = index.get(key)
+        if members is not None:
+            members.discard(connection_id)
+            if not members:
+                del index[key]
+
+    def match(self, topic: str, roles: Optional[Iterable[str]] = None,
+              latitude: Optional[float] = None, longitude: Optional[float] = None) -> Set[str]:
+        """Connections that should receive a message on topic, for the given roles and location"""
+        filters: List[Set[str]] = [self.by_topic.get(topic, set()) | self.all_topics]
+        if roles is not None:
+            filters.append(set().union(*(self.by_role.get(role, ()) for role in roles)))
+
+        located = latitude is not None and longitude is not None
+        if located:
+            cell = encode_geohash(latitude, longitude, GEOCELL_PRECISION)
+            in_cells = set().union(*(self.by_cell.get(cell[:length], ()) for length in range(1, GEOCELL_PRECISION + 1)))
+            filters.append(self.anywhere | in_cells)
+
+        filters.sort(key=len)
+        matched = filters[0].intersection(*filters[1:])
+        if located:
+            # Covering cells overshoot the area, so check areas exactly
+            matched = {
+                connection_id for connection_id in matched
+                if connection_id not in self.areas or self.areas[connection_id].contains(latitude, longitude)
+            }
+        return matched
+
+    def accepts(self, connection_id: str, topic: str, roles: Optional[Iterable[str]] = None,
+                latitude: Optional[float] = None, longitude: Optional[float] = None) -> bool:
+        """Whether one connection's subscription matches a message"""
+        if connection_id not in self.roles:
+            return False
+        topics = self.topics[connection_id]
+        if topics and topic not in topics:
+            return False
+        if roles is not None and self.roles[connection_id] not in roles:
+            return False
+        area = self.areas.get(connection_id)
+        if area is not None and latitude is not None and longitude is not None:
+            return area.contains(latitude, longitude)
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            "topic_filtered": len(self.roles) - len(self.all_topics),
+            "area_filtered": len(self.areas),
+            "topics": len(self.by_topic),
+            "cells": len(self.by_cell),
+        }
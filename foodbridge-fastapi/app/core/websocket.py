@@ -1,87 +1,524 @@
-from fastapi import WebSocket, WebSocketDisconnect
-from typing import List, Dict, Any, Optional
+from fastapi import WebSocket, WebSocketDisconnect, status
+from typing import List, Dict, Any, Deque, Optional, Set, Tuple, Union
+from collections import deque
+from app.core.backplane import create_backplane
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.subscriptions import GeoArea, SubscriptionIndex
 import json
 import asyncio
 from datetime import datetime
 import logging
+import time
+import uuid
+
+try:
+    import msgpack  # Optional dependency, only needed for clients asking for the msgpack encoding
+except ImportError:
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Frame encodings a client can ask for in the handshake
+JSON = "json"
+MSGPACK = "msgpack"
+
+# What happens to a message that arrives when a client's outbound queue is full
+DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message of the same policy
+NEVER_DROP = "never_drop"  # Queue it anyway; a client that stops reading is still evicted by the send timeout
+DISCONNECT = "disconnect"  # Evict the client
+
+# Pause between checks for room in an outbox while a replay is paced into it
+REPLAY_PACE_SECONDS = 0.01
+
+# Roles that receive each message type sent through broadcast_to_role_based_channels
+ROLE_CHANNELS = {
+    "new_food_donation": ["ngo", "emergency_responder", "admin"],
+}
+
+# Topics a "subscribe_notifications" message subscribes to: the alerts and notifications the
+# dashboard shows. Direct messages to the user arrive regardless of topic
+NOTIFICATION_TOPICS = ["notification", "disaster_alert", "disaster_alert_batch", "emergency_alert", "system_update"]
+
+
+class OutboundMessage:
+    """A message serialized once as JSON text, and as msgpack the first time a client needs it"""
+    
+    __slots__ = ("text", "_packed")
+    
+    def __init__(self, message: Dict[str, Any]):
+        self.text = json.dumps(message, default=str)
+        self._packed: Optional[bytes] = None
+        
+    @property
+    def packed(self) -> bytes:
+        if self._packed is None:
+            # Pack what the JSON text holds, so both encodings carry the same values
+            self._packed = msgpack.packb(json.loads(self.text))
+        return self._packed
+
+
+class Outbox:
+    """Bounded queue of messages for one connection, drained by its writer task.
+
+    A client that opted into batching gets everything queued within
+    batch_window seconds as one frame holding an array of messages.
+    """
+    
+    def __init__(self, websocket: WebSocket, max_size: int, batch_window: float = 0.0, encoding: str = JSON):
+        self.websocket = websocket
+        self.max_size = max_size
+        self.batch_window = batch_window
+        self.encoding = encoding
+        self.messages: Deque[Tuple[str, OutboundMessage]] = deque()  # (policy, message)
+        self.held: Optional[Deque[Tuple[str, OutboundMessage]]] = None  # Live messages held back during a replay
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()  # When the client last sent anything
+        
+    def next_frame(self) -> Tuple[Union[str, bytes], int]:
+        """Take the next frame to send and the number of messages in it"""
+        if not self.batch_window:
+            _, message = self.messages.popleft()
+            return (message.packed if self.encoding == MSGPACK else message.text), 1
+        batch = [message for _, message in self.messages]
+        self.messages.clear()
+        if self.encoding == MSGPACK:
+            return msgpack.Packer().pack_array_header(len(batch)) + b"".join(message.packed for message in batch), len(batch)
+        return "[" + ",".join(message.text for message in batch) + "]", len(batch)
+        
+    def put(self, message: OutboundMessage, policy: str) -> int:
+        """Queue a message and return how many were dropped; raises QueueFull for DISCONNECT.
+
+        During a replay the message waits in `held`, under the same bound, so
+        it goes out after the replayed messages that precede it.
+        """
+        queue = self.messages if self.held is None else self.held
+        dropped = 0
+        if len(queue) >= self.max_size:
+            if policy == DROP_OLDEST:
+                for position, (queued_policy, _) in enumerate(queue):
+                    if queued_policy == DROP_OLDEST:
+                        del queue[position]
+                        break
+                else:
+                    return 1  # Everything queued must be kept, so the new message goes
+                dropped = 1
+            elif policy != NEVER_DROP:
+                raise asyncio.QueueFull()
+        queue.append((policy, message))
+        if queue is self.messages:
+            self.ready.set()
+        return dropped
+        
+    def put_replayed(self, messages: List[OutboundMessage]):
+        """Queue replayed messages without applying an overflow policy; the caller paces them"""
+        self.messages.extend((NEVER_DROP, message) for message in messages)
+        self.ready.set()
+
+
+class ReplayBuffer:
+    """Recent broadcasts kept per topic, numbered by one sequence across all topics"""
+    
+    def __init__(self, size_per_topic: int):
+        self.size_per_topic = size_per_topic
+        self.events: Dict[str, Deque[Tuple[int, Dict[str, Any], OutboundMessage]]] = {}  # topic -> (seq, envelope, message)
+        self.evicted_through: Dict[str, int] = {}  # Highest seq no longer buffered, per topic
+        self.last_seq = 0
+        
+    def next_seq(self) -> int:
+        self.last_seq += 1
+        return self.last_seq
+        
+    def append(self, seq: int, envelope: Dict[str, Any], message: OutboundMessage):
+        ring = self.events.setdefault(envelope["topic"], deque())
+        while len(ring) >= self.size_per_topic:
+            self.evicted_through[envelope["topic"]] = ring.popleft()[0]
+        ring.append((seq, envelope, message))
+        
+    def since(self, seq: int, topics: Optional[Set[str]] = None) -> Optional[List[Tuple[int, Dict[str, Any], OutboundMessage]]]:
+        """Buffered events after seq, oldest first, or None if any of them were already evicted"""
+        if seq > self.last_seq:
+            return None
+        missed = []
+        for topic, ring in self.events.items():
+            if topics and topic not in topics:
+                continue
+            if self.evicted_through.get(topic, 0) > seq:
+                return None
+            missed.extend(event for event in ring if event[0] > seq)
+        missed.sort(key=lambda event: event[0])
+        return missed
+
+
 class ConnectionManager:
-    """WebSocket connection manager for real-time communication"""
+    """WebSocket connection manager for real-time communication.
+
+    Every connection has a bounded outbox drained by its own writer task, so
+    sending only enqueues and never waits on a socket. Broadcasts are
+    serialized once and handed to a dispatcher task that fills the outboxes
+    of the connections whose subscriptions match the message's topic (its
+    type), target roles and location, which keeps the caller's cost
+    independent of the number of clients. What happens when an outbox is
+    full depends on the message type (see WS_OVERFLOW_POLICIES). Clients
+    that haven't taken a message within WS_SEND_TIMEOUT_SECONDS are evicted.
+
+    Broadcasts and user messages are also published as envelopes on the
+    backplane (see WS_BACKPLANE), so clients connected to other workers get
+    them too. Each process delivers an envelope id at most once.
+
+    Every broadcast this process dispatches gets the next number of its
+    stream and is kept in a per-topic replay buffer, so a reconnecting client
+    can pass the last seq it saw and get just the messages it missed.
+
+    Once started, a supervisor task sends a heartbeat to connections that
+    have been quiet for WS_HEARTBEAT_SECONDS and reaps those that haven't
+    sent anything for WS_IDLE_TIMEOUT_SECONDS. A user may hold up to
+    WS_MAX_CONNECTIONS_PER_USER connections, e.g. one per tab.
+    """
     
-    def __init__(self):
+    def __init__(self, send_timeout: float = settings.WS_SEND_TIMEOUT_SECONDS,
+                 queue_size: int = settings.WS_QUEUE_SIZE, backplane=None):
+        self.send_timeout = send_timeout
+        self.queue_size = queue_size
+        self.backplane = backplane if backplane is not None else create_backplane()
         self.active_connections: Dict[str, WebSocket] = {}
-        self.user_connections: Dict[int, str] = {}  # user_id -> connection_id
+        self.outboxes: Dict[str, Outbox] = {}
+        self.user_connections: Dict[int, List[str]] = {}  # user_id -> connection_ids, oldest first
+        self.connection_users: Dict[str, int] = {}  # connection_id -> user_id
+        self.subscriptions = SubscriptionIndex()
+        self._broadcasts: Deque[Dict[str, Any]] = deque()  # Broadcast envelopes waiting for the dispatcher
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._outgoing: Deque[Dict[str, Any]] = deque()  # Envelopes waiting to be published
+        self._publish_task: Optional[asyncio.Task] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._seen = TTLCache(settings.WS_BACKPLANE_DEDUP_ENTRIES)  # Envelope ids already delivered here
+        self.stream = uuid.uuid4().hex[:12]  # Names this process's sequence; seqs from another stream can't be resumed
+        self.replay = ReplayBuffer(settings.WS_REPLAY_BUFFER_SIZE)
+        self._stats = {"broadcasts": 0, "delivered": 0, "frames": 0, "failed": 0, "dropped": 0, "evicted_slow": 0,
+                       "evicted_overflow": 0, "replayed": 0, "resyncs": 0, "heartbeats": 0, "reaped_idle": 0,
+                       "reaped_dead": 0, "evicted_user_limit": 0, "last_fanout_ms": 0.0, "max_fanout_ms": 0.0}
+        self._backplane_stats = {"published": 0, "received": 0, "duplicates": 0, "publish_failures": 0}
+        
+    async def start(self):
+        """Start receiving envelopes published by other processes and supervising connections"""
+        await self.backplane.start(self._receive)
+        self._supervisor = asyncio.get_running_loop().create_task(self._supervise())
+        
+    async def stop(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
+        await self.backplane.stop()
+        
+    def touch(self, connection_id: str):
+        """Record that a client sent something, so it isn't reaped as idle"""
+        outbox = self.outboxes.get(connection_id)
+        if outbox is not None:
+            outbox.last_seen = time.monotonic()
+            
+    async def _supervise(self):
+        """Supervisor task: heartbeat quiet connections and reap idle or dead ones"""
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_SECONDS)
+            try:
+                await self.check_connections()
+            except Exception as e:
+                logger.error(f"WebSocket supervisor pass failed: {e}")
+                
+    async def check_connections(self):
+        """One supervisor pass over every connection"""
+        now = time.monotonic()
+        heartbeat = None
+        for connection_id, outbox in list(self.outboxes.items()):
+            if outbox.writer is not None and outbox.writer.done():
+                # The writer stopped without removing the connection
+                self._stats["reaped_dead"] += 1
+                self._evict(connection_id, outbox.websocket, status.WS_1011_INTERNAL_ERROR)
+                continue
+            idle = now - outbox.last_seen
+            if idle >= settings.WS_IDLE_TIMEOUT_SECONDS:
+                logger.info(f"Reaping idle WebSocket client {connection_id}")
+                self._stats["reaped_idle"] += 1
+                self._evict(connection_id, outbox.websocket, status.WS_1001_GOING_AWAY)
+            elif idle >= settings.WS_HEARTBEAT_SECONDS:
+                if heartbeat is None:
+                    heartbeat = OutboundMessage({"type": "heartbeat", "timestamp": datetime.now().isoformat()})
+                self._stats["heartbeats"] += 1
+                self._enqueue(connection_id, heartbeat, self._policy({"type": "heartbeat"}))
         
-    async def connect(self, websocket: WebSocket, connection_id: str, user_id: Optional[int] = None):
-        """Accept a new WebSocket connection"""
+    async def connect(self, websocket: WebSocket, connection_id: str, user_id: Optional[int] = None,
+                      role: Optional[str] = None, resume_from: Optional[int] = None, stream: Optional[str] = None,
+                      topics: Optional[List[str]] = None, batch_ms: int = 0, encoding: str = JSON):
+        """Accept a new WebSocket connection, replaying what it missed since resume_from.
+
+        batch_ms opts into batched frames (capped at WS_MAX_BATCH_MS) and
+        encoding picks json or msgpack frames; msgpack falls back to json
+        when the package isn't installed.
+        """
         await websocket.accept()
+        previous = self.active_connections.get(connection_id)
+        if previous is not None:
+            # A reconnect under the same id replaces the old socket, which may not have noticed yet
+            self._evict(connection_id, previous, status.WS_1000_NORMAL_CLOSURE)
         self.active_connections[connection_id] = websocket
+        self.subscriptions.add(connection_id, role)
+        if topics:
+            self.subscriptions.subscribe(connection_id, topics)
+        batch_ms = min(max(batch_ms, 0), settings.WS_MAX_BATCH_MS)
+        encoding = MSGPACK if encoding == MSGPACK and msgpack is not None else JSON
+        outbox = self.outboxes[connection_id] = Outbox(websocket, self.queue_size, batch_ms / 1000, encoding)
+        outbox.writer = asyncio.get_running_loop().create_task(self._write(connection_id, outbox))
         
         if user_id:
-            self.user_connections[user_id] = connection_id
+            connections = self.user_connections.setdefault(user_id, [])
+            connections.append(connection_id)
+            self.connection_users[connection_id] = user_id
+            # Bound per-user connections by closing the oldest ones
+            for oldest in connections[:-settings.WS_MAX_CONNECTIONS_PER_USER]:
+                self._stats["evicted_user_limit"] += 1
+                self._evict(oldest, self.active_connections[oldest], status.WS_1008_POLICY_VIOLATION)
             
         logger.info(f"WebSocket connected: {connection_id}, User: {user_id}")
         
-        # Send welcome message
+        # Send welcome message. Nothing below yields to the dispatcher before the replay
+        # holds live messages back, so a broadcast is either in the replay or
+        # dispatched to this connection after it, never both.
         await self.send_personal_message({
             "type": "connection_established",
             "message": "Connected to FOOD & DISASTER MANGEMENT real-time updates",
             "timestamp": datetime.now().isoformat(),
-            "connection_id": connection_id
+            "connection_id": connection_id,
+            "stream": self.stream,
+            "seq": self.replay.last_seq,
+            "batch_ms": batch_ms,
+            "encoding": encoding
         }, connection_id)
+        if resume_from is not None:
+            await self._resume(connection_id, resume_from, stream)
+            
+    async def _resume(self, connection_id: str, resume_from: int, stream: Optional[str]):
+        """Replay buffered broadcasts after resume_from, or ask the client to resync in full.
+
+        A replay goes out in chunks of a quarter of the outbox, each queued
+        once the writer has made room for it, and live messages dispatched
+        meanwhile are held until it's done. More missed messages than an
+        outbox holds would take too long to catch up on, so the client is
+        asked to resync instead.
+        """
+        missed = self.replay.since(resume_from, self.subscriptions.topics.get(connection_id))
+        if missed is not None:
+            missed = [
+                message for _, envelope, message in missed
+                if self.subscriptions.accepts(connection_id, envelope["topic"], envelope["roles"],
+                                              envelope["latitude"], envelope["longitude"])
+            ]
+        if (stream and stream != self.stream) or missed is None or len(missed) > self.queue_size:
+            self._stats["resyncs"] += 1
+            await self.send_personal_message({
+                "type": "resync_required",
+                "message": "Missed messages are no longer available; reload current data",
+                "stream": self.stream,
+                "seq": self.replay.last_seq
+            }, connection_id)
+            return
+        
+        outbox = self.outboxes[connection_id]
+        outbox.held = deque()
+        complete = OutboundMessage({
+            "type": "replay_complete",
+            "replayed": len(missed),
+            "stream": self.stream,
+            "seq": self.replay.last_seq
+        })
+        chunk_size = max(1, self.queue_size // 4)
+        try:
+            for start in range(0, len(missed), chunk_size):
+                chunk = missed[start:start + chunk_size]
+                while len(outbox.messages) + len(chunk) > self.queue_size:
+                    if self.outboxes.get(connection_id) is not outbox:
+                        return  # Evicted or disconnected mid-replay
+                    await asyncio.sleep(REPLAY_PACE_SECONDS)
+                outbox.put_replayed(chunk)
+                self._stats["replayed"] += len(chunk)
+            outbox.put_replayed([complete])
+        finally:
+            held, outbox.held = outbox.held, None
+            if self.outboxes.get(connection_id) is outbox:
+                for policy, message in held:
+                    self._enqueue(connection_id, message, policy)
         
-    def disconnect(self, connection_id: str, user_id: Optional[int] = None):
-        """Remove a WebSocket connection"""
+    def disconnect(self, connection_id: str, user_id: Optional[int] = None, websocket: Optional[WebSocket] = None):
+        """Remove a WebSocket connection; given websocket, only if it's still the one registered under the id"""
+        if websocket is not None and self.active_connections.get(connection_id) is not websocket:
+            return
         if connection_id in self.active_connections:
             del self.active_connections[connection_id]
-            
-        if user_id and user_id in self.user_connections:
-            del self.user_connections[user_id]
+        self.subscriptions.remove(connection_id)
+        
+        outbox = self.outboxes.pop(connection_id, None)
+        if outbox is not None and outbox.writer is not None and outbox.writer is not asyncio.current_task():
+            outbox.writer.cancel()
+        
+        user_id = self.connection_users.pop(connection_id, None) or user_id
+        connections = self.user_connections.get(user_id)
+        if connections and connection_id in connections:
+            connections.remove(connection_id)
+            if not connections:
+                del self.user_connections[user_id]
             
         logger.info(f"WebSocket disconnected: {connection_id}, User: {user_id}")
         
-    async def send_personal_message(self, message: Dict[str, Any], connection_id: str):
-        """Send a message to a specific connection"""
-        if connection_id in self.active_connections:
-            websocket = self.active_connections[connection_id]
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+            
+    def _evict(self, connection_id: str, websocket: WebSocket, code: int = status.WS_1013_TRY_AGAIN_LATER):
+        """Drop a client and close its socket in the background"""
+        if self.active_connections.get(connection_id) is websocket:
+            self.disconnect(connection_id)
+        asyncio.get_running_loop().create_task(self._close(websocket, code))
+        
+    async def _write(self, connection_id: str, outbox: Outbox):
+        """Writer task: send queued messages to one socket in order"""
+        websocket = outbox.websocket
+        while True:
+            await outbox.ready.wait()
+            if outbox.batch_window:
+                await asyncio.sleep(outbox.batch_window)  # Coalesce the rest of a burst into this frame
+            outbox.ready.clear()
+            while outbox.messages:
+                frame, count = outbox.next_frame()
+                try:
+                    async with asyncio.timeout(self.send_timeout):
+                        if isinstance(frame, bytes):
+                            await websocket.send_bytes(frame)
+                        else:
+                            await websocket.send_text(frame)
+                except TimeoutError:
+                    logger.warning(f"Evicting slow WebSocket client {connection_id}")
+                    self._stats["evicted_slow"] += 1
+                    self._evict(connection_id, websocket)
+                    return
+                except Exception as e:
+                    logger.error(f"Error sending message to {connection_id}: {e}")
+                    self._stats["failed"] += 1
+                    if self.active_connections.get(connection_id) is websocket:
+                        self.disconnect(connection_id)
+                    return
+                self._stats["delivered"] += count
+                self._stats["frames"] += 1
+                
+    def _enqueue(self, connection_id: str, message: OutboundMessage, policy: str):
+        outbox = self.outboxes.get(connection_id)
+        if outbox is None:
+            return
+        try:
+            self._stats["dropped"] += outbox.put(message, policy)
+        except asyncio.QueueFull:
+            logger.warning(f"Evicting WebSocket client {connection_id}: outbound queue full")
+            self._stats["evicted_overflow"] += 1
+            self._evict(connection_id, outbox.websocket)
+            
+    @staticmethod
+    def _policy(message: Dict[str, Any]) -> str:
+        return settings.WS_OVERFLOW_POLICIES.get(message.get("type"), settings.WS_DEFAULT_OVERFLOW_POLICY)
+        
+    async def _dispatch(self):
+        """Dispatcher task: copy queued broadcasts into every matching connection's outbox"""
+        while self._broadcasts:
+            envelope = self._broadcasts.popleft()
+            start = time.perf_counter()
+            seq = self.replay.next_seq()
+            message = OutboundMessage({**envelope["message"], "seq": seq, "stream": self.stream})
+            self.replay.append(seq, envelope, message)
+            targets = self.subscriptions.match(envelope["topic"], envelope["roles"], envelope["latitude"], envelope["longitude"])
+            for connection_id in targets:
+                if connection_id != envelope["exclude_connection"]:
+                    self._enqueue(connection_id, message, envelope["policy"])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._stats["last_fanout_ms"] = round(elapsed_ms, 2)
+            self._stats["max_fanout_ms"] = round(max(self._stats["max_fanout_ms"], elapsed_ms), 2)
+            await asyncio.sleep(0)  # Let writers start on this message before fanning out the next
+            
+    def _deliver(self, envelope: Dict[str, Any]):
+        """Deliver an envelope to the clients connected to this process"""
+        self._seen.set(envelope["id"], True, settings.WS_BACKPLANE_DEDUP_SECONDS)
+        if envelope["kind"] == "user":
+            connections = self.user_connections.get(envelope["user_id"])
+            if connections:
+                message = OutboundMessage(envelope["message"])
+                for connection_id in list(connections):
+                    self._enqueue(connection_id, message, envelope["policy"])
+            return
+        self._broadcasts.append(envelope)
+        if self._dispatch_task is None or self._dispatch_task.done():
+            self._dispatch_task = asyncio.get_running_loop().create_task(self._dispatch())
+            
+    def _receive(self, envelope: Dict[str, Any]):
+        """Backplane handler for envelopes published by any process"""
+        if self._seen.get(envelope["id"]) is not None:
+            self._backplane_stats["duplicates"] += 1
+            return
+        self._backplane_stats["received"] += 1
+        self._deliver(envelope)
+        
+    def _publish(self, message: Dict[str, Any], kind: str, **routing):
+        """Deliver locally now and hand the envelope to the publisher task for other processes"""
+        envelope = {"id": uuid.uuid4().hex, "kind": kind, "message": message,
+                    "policy": self._policy(message), **routing}
+        self._deliver(envelope)
+        self._outgoing.append(envelope)
+        if self._publish_task is None or self._publish_task.done():
+            self._publish_task = asyncio.get_running_loop().create_task(self._flush_outgoing())
+            
+    async def _flush_outgoing(self):
+        """Publisher task: publish envelopes in order"""
+        while self._outgoing:
+            envelope = self._outgoing.popleft()
             try:
-                await websocket.send_text(json.dumps(message))
+                await self.backplane.publish(envelope)
+                self._backplane_stats["published"] += 1
             except Exception as e:
-                logger.error(f"Error sending message to {connection_id}: {e}")
-                self.disconnect(connection_id)
+                self._backplane_stats["publish_failures"] += 1
+                logger.error(f"Publishing {envelope['kind']} message to the backplane failed: {e}")
+                
+    async def send_personal_message(self, message: Dict[str, Any], connection_id: str):
+        """Queue a message for a specific connection"""
+        if connection_id in self.outboxes:
+            self._enqueue(connection_id, OutboundMessage(message), self._policy(message))
                 
     async def send_user_message(self, message: Dict[str, Any], user_id: int):
+        """Send a message to a specific user, wherever they're connected"""
+        self._publish(message, "user", user_id=user_id)
+            
+    async def send_to_user(self, user_id: int, message: Dict[str, Any]):
         """Send a message to a specific user"""
-        if user_id in self.user_connections:
-            connection_id = self.user_connections[user_id]
-            await self.send_personal_message(message, connection_id)
+        await self.send_user_message(message, user_id)
             
-    async def broadcast(self, message: Dict[str, Any], exclude_connection: Optional[str] = None):
-        """Broadcast a message to all connected clients"""
+    async def broadcast(self, message: Dict[str, Any], exclude_connection: Optional[str] = None,
+                        roles: Optional[List[str]] = None, latitude: Optional[float] = None,
+                        longitude: Optional[float] = None):
+        """Queue a message for every client subscribed to its type, optionally only for some roles.
+
+        With a location, clients subscribed to an area only get it when the
+        location falls inside their area.
+        """
         message["timestamp"] = datetime.now().isoformat()
-        disconnected_connections = []
-        
-        for connection_id, websocket in self.active_connections.items():
-            if exclude_connection and connection_id == exclude_connection:
-                continue
-                
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to {connection_id}: {e}")
-                disconnected_connections.append(connection_id)
-                
-        # Clean up disconnected connections
-        for connection_id in disconnected_connections:
-            self.disconnect(connection_id)
+        self._stats["broadcasts"] += 1
+        self._publish(message, "broadcast", topic=message.get("type"), roles=roles, latitude=latitude,
+                      longitude=longitude, exclude_connection=exclude_connection)
             
     async def broadcast_to_roles(self, message: Dict[str, Any], target_roles: List[str]):
         """Broadcast a message to users with specific roles"""
-        # This would require role information in connections
-        # For now, broadcast to all - can be enhanced later
-        await self.broadcast(message)
+        await self.broadcast(message, roles=target_roles)
+        
+    async def broadcast_to_role_based_channels(self, message: Dict[str, Any], latitude: Optional[float] = None,
+                                               longitude: Optional[float] = None):
+        """Broadcast a message to the roles whose channel carries its type (see ROLE_CHANNELS)"""
+        await self.broadcast(message, roles=ROLE_CHANNELS.get(message.get("type")), latitude=latitude, longitude=longitude)
         
     async def send_notification(self, notification_data: Dict[str, Any], user_id: Optional[int] = None):
         """Send a notification via WebSocket"""
@@ -105,7 +542,7 @@ class ConnectionManager:
             "timestamp": datetime.now().isoformat()
         }
         
-        await self.broadcast(message)
+        await self.broadcast(message, latitude=alert_data.get("latitude"), longitude=alert_data.get("longitude"))
         logger.warning(f"Emergency alert broadcasted: {alert_data.get('title', 'Unknown')}")
         
     async def send_system_update(self, update_data: Dict[str, Any]):
@@ -125,12 +562,31 @@ class ConnectionManager:
     def get_user_count(self) -> int:
         """Get the number of authenticated users connected"""
         return len(self.user_connections)
+        
+    def stats(self) -> Dict[str, Any]:
+        """Connection counts, queue depths and delivery counters"""
+        return {
+            "connections": self.get_connection_count(),
+            "users": self.get_user_count(),
+            "send_timeout_seconds": self.send_timeout,
+            "queue_size": self.queue_size,
+            "queued": sum(len(outbox.messages) for outbox in self.outboxes.values()),
+            "max_queue_depth": max((len(outbox.messages) for outbox in self.outboxes.values()), default=0),
+            "pending_broadcasts": len(self._broadcasts),
+            "subscriptions": self.subscriptions.stats(),
+            "backplane": {"type": type(self.backplane).__name__, **self._backplane_stats},
+            "stream": self.stream,
+            "last_seq": self.replay.last_seq,
+            "replay_buffered": sum(len(ring) for ring in self.replay.events.values()),
+            **self._stats
+        }
 
 # Global connection manager instance
 manager = ConnectionManager()
 
 async def handle_websocket_message(websocket: WebSocket, connection_id: str, message: str):
     """Handle incoming WebSocket messages from clients"""
+    manager.touch(connection_id)
     try:
         data = json.loads(message)
         message_type = data.get("type", "unknown")
@@ -142,13 +598,36 @@ async def handle_websocket_message(websocket: WebSocket, connection_id: str, mes
                 "timestamp": datetime.now().isoformat()
             }, connection_id)
             
-        elif message_type == "subscribe_notifications":
-            # Handle notification subscription
+        elif message_type in ("subscribe", "subscribe_notifications"):
+            # Narrow what this connection receives; omitted filters match everything.
+            # subscribe_notifications takes the dashboard's topics instead of a topic list
+            try:
+                area = None
+                if data.get("bbox") is not None:
+                    area = GeoArea.from_bbox(**data["bbox"])
+                elif data.get("radius") is not None:
+                    area = GeoArea.from_radius(**data["radius"])
+                if message_type == "subscribe_notifications":
+                    topics = list(NOTIFICATION_TOPICS)
+                else:
+                    topics = [str(topic) for topic in data.get("topics") or []]
+            except (TypeError, ValueError) as e:
+                await manager.send_personal_message({
+                    "type": "subscription_error",
+                    "message": f"Invalid subscription: {e}"
+                }, connection_id)
+                return
+            manager.subscriptions.subscribe(connection_id, topics, area)
             await manager.send_personal_message({
                 "type": "subscription_confirmed",
-                "message": "Subscribed to real-time notifications"
+                "topics": topics,
+                "area": area.describe() if area is not None else None
             }, connection_id)
             
+        elif message_type == "heartbeat_ack":
+            # Liveness was already recorded above
+            pass
+            
         elif message_type == "user_activity":
             # Handle user activity updates
             activity_data = data.get("data", {})
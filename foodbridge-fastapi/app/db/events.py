@@ -0,0 +1,109 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+from app.models import Base
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Listeners called with a ChangeSet after every successful commit
+_commit_listeners: List[Callable] = []
+
+
+class RowChange(NamedTuple):
+    table: str
+    old: Optional[Dict]  # Column values before the change, None for inserts
+    new: Optional[Dict]  # Column values after the change, None for deletes
+
+
+class ChangeSet:
+    """Writes made by one transaction, collected at flush time.
+
+    `rows` holds a before/after snapshot of every ORM insert, update and
+    delete. `bulk_tables` lists tables written by UPDATE/DELETE/INSERT
+    statements, whose individual rows aren't known.
+    """
+
+    def __init__(self):
+        self.rows: List[RowChange] = []
+        self.bulk_tables: Set[str] = set()
+
+    @property
+    def tables(self) -> Set[str]:
+        return {change.table for change in self.rows} | self.bulk_tables
+
+    def __bool__(self):
+        return bool(self.rows or self.bulk_tables)
+
+
+def on_commit(listener: Callable):
+    """Register listener(changes) to run after each commit that wrote something"""
+    _commit_listeners.append(listener)
+    return listener
+
+
+def _changes(session: Session) -> ChangeSet:
+    changes = session.info.get("changes")
+    if changes is None:
+        changes = session.info["changes"] = ChangeSet()
+    return changes
+
+
+def _current_values(target) -> Dict:
+    state = inspect(target)
+    return {attr.key: state.dict.get(attr.key) for attr in state.mapper.column_attrs}
+
+
+def _previous_values(target) -> Dict:
+    state = inspect(target)
+    values = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        values[attr.key] = history.deleted[0] if history.deleted else state.dict.get(attr.key)
+    return values
+
+
+def _record(target, old, new):
+    session = inspect(target).session
+    if session is not None:
+        _changes(session).rows.append(RowChange(target.__table__.name, old, new))
+
+
+@event.listens_for(Base, "after_insert", propagate=True)
+def _after_insert(mapper, connection, target):
+    _record(target, None, _current_values(target))
+
+
+@event.listens_for(Base, "after_update", propagate=True)
+def _after_update(mapper, connection, target):
+    _record(target, _previous_values(target), _current_values(target))
+
+
+@event.listens_for(Base, "before_delete", propagate=True)
+def _before_delete(mapper, connection, target):
+    _record(target, _current_values(target), None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_statements(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _changes(orm_execute_state.session).bulk_tables.add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_changes(session):
+    changes = session.info.pop("changes", None)
+    if not changes:
+        return
+    for listener in _commit_listeners:
+        try:
+            listener(changes)
+        except Exception as e:
+            logger.error(f"Commit listener {listener.__name__} failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("changes", None)
@@ -0,0 +1,63 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.geo import geocell_for
+from app.db.base import Base
+from app.models import User, DisasterAlert, FoodInventory, VulnerabilityAssessment
+import logging
+
+logger = logging.getLogger(__name__)
+
+GEOCELL_MODELS = (User, DisasterAlert, FoodInventory, VulnerabilityAssessment)
+
+
+def sync_schema(engine: Engine):
+    """Bring an existing database up to date with the models.
+
+    `create_all` only creates missing tables, so databases created before a
+    column or index was added are patched here: missing nullable columns are
+    added, missing indexes are created and derived columns are backfilled.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                logger.info(f"Added column {table.name}.{column.name}")
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=connection, checkfirst=True)
+
+    backfill_geocells(engine)
+
+
+def backfill_geocells(engine: Engine, batch_size: int = 1000):
+    """Populate geocell for rows that have coordinates but no cell yet"""
+    with Session(engine) as db:
+        for model in GEOCELL_MODELS:
+            # Carry updated_at through unchanged so the backfill doesn't bump it
+            columns = [model.id, model.latitude, model.longitude]
+            if hasattr(model, "updated_at"):
+                columns.append(model.updated_at)
+
+            while True:
+                rows = db.query(*columns).filter(
+                    model.geocell.is_(None),
+                    model.latitude.isnot(None),
+                    model.longitude.isnot(None)
+                ).limit(batch_size).all()
+                if not rows:
+                    break
+
+                db.bulk_update_mappings(model, [
+                    {**row._asdict(), "geocell": geocell_for(row.latitude, row.longitude)}
+                    for row in rows
+                ])
+                db.commit()
@@ -1,20 +1,136 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-# Create database engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Map a DATABASE_URL onto its async driver (aiosqlite locally, asyncpg in production)"""
+    scheme, _, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+def sqlite_pragmas() -> list:
+    """Per-connection pragmas applied in SQLite tuned mode"""
+    return [
+        "journal_mode=WAL",
+        "synchronous=NORMAL",
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+        f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+    ]
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in sqlite_pragmas():
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+def set_sqlite_read_only(dbapi_connection, connection_record):
+    set_sqlite_pragmas(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+class RoutingSession(Session):
+    """Session that sends flushes and DML to the writer engine and plain reads to the readers.
+
+    Once a session has written it stays on the writer, so later reads in the
+    same request see its own changes.
+    """
+
+    def __init__(self, *args, writer=None, reader=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or (clause is not None and clause.is_dml) or self.info.get("wrote"):
+            self.info["wrote"] = True
+            return self.writer
+        return self.reader
+
+def create_sqlite_engines(url: str):
+    """Writer and reader async engines for SQLite tuned mode.
+
+    The writer pool holds a single connection, so concurrent writers queue on
+    checkout instead of failing with "database is locked". Readers share a
+    pool of query_only connections that WAL lets run alongside the writer.
+    """
+    writer = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    reader = create_async_engine(
+        url,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.SQLITE_READ_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    event.listen(writer.sync_engine, "connect", set_sqlite_pragmas)
+    event.listen(reader.sync_engine, "connect", set_sqlite_read_only)
+    return writer, reader
+
+def create_routing_sessionmaker(writer, reader):
+    return async_sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        writer=writer.sync_engine,
+        reader=reader.sync_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+sqlite_tuned = is_sqlite and settings.SQLITE_TUNED
+async_database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+
+# Create database engine (used by scripts and schema management)
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
+if sqlite_tuned:
+    event.listen(engine, "connect", set_sqlite_pragmas)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
+if sqlite_tuned:
+    async_engine, async_read_engine = create_sqlite_engines(async_database_url)
+    AsyncSessionLocal = create_routing_sessionmaker(async_engine, async_read_engine)
+else:
+    # Pooled async engine used by the API routers
+    async_engine = create_async_engine(
+        async_database_url,
+        # aiosqlite defaults to NullPool for file databases; pool its connections too
+        poolclass=AsyncAdaptedQueuePool if is_sqlite else None,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    async_read_engine = async_engine
+
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+async def get_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -5,11 +5,16 @@ import uvicorn
 
 from app.core.config import settings
 from app.api.v1 import api_router
-from app.db.session import engine
-from app.db.base import Base
+from app.db.session import engine, async_engine, async_read_engine, AsyncSessionLocal
+from app.db.schema import sync_schema
+from app.core.websocket import manager
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.expiry import expiry_tracker
+from app.core.allocation import shutdown_executor
+from app.api.v1.food_inventory import announce_expired_inventory
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and bring existing ones up to date
+sync_schema(engine)
 
 app = FastAPI(
     title="Climate Resilience & Food Security Platform",
@@ -78,6 +83,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include API routes
@@ -102,6 +108,36 @@ async def root():
         "api_base": "/api/v1"
     }
 
+@app.on_event("startup")
+async def start_realtime_backplane():
+    """Receive realtime messages published by other workers"""
+    await manager.start()
+
+@app.on_event("shutdown")
+async def stop_realtime_backplane():
+    await manager.stop()
+
+@app.on_event("startup")
+async def start_expiry_sweeper():
+    """Mark expired food inventory unavailable in the background"""
+    await expiry_tracker.start(AsyncSessionLocal, announce_expired_inventory)
+
+@app.on_event("shutdown")
+async def stop_expiry_sweeper():
+    await expiry_tracker.stop()
+
+@app.on_event("shutdown")
+async def stop_allocation_workers():
+    """Don't leave solver processes behind on reloads and test runs"""
+    shutdown_executor()
+
+@app.on_event("shutdown")
+async def close_database_pool():
+    """Release pooled database connections"""
+    await async_engine.dispose()
+    if async_read_engine is not async_engine:
+        await async_read_engine.dispose()
+
 @app.get("/health", tags=["system"])
 async def health_check():
     """Health check endpoint"""
@@ -112,5 +148,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
     )
\ No newline at end of file
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from app.core.geo import GEOCELL_PRECISION, track_geocell
 import enum
 
 Base = declarative_base()
@@ -75,6 +76,7 @@ class User(Base):
     location = Column(String)
     latitude = Column(Float)
     longitude = Column(Float)
+    geocell = Column(String(GEOCELL_PRECISION), index=True)  # Geohash of latitude/longitude
     is_active = Column(Boolean, default=True)
     is_verified = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -83,6 +85,11 @@ class User(Base):
     # Relationships
     disaster_alerts = relationship("DisasterAlert", back_populates="created_by_user")
     vulnerability_assessments = relationship("VulnerabilityAssessment", back_populates="assessor")
+    
+    __table_args__ = (
+        Index("ix_users_role_geocell", "role", "geocell"),
+        Index("ix_users_created_id", "created_at", "id"),
+    )
 
 class DisasterAlert(Base):
     __tablename__ = "disaster_alerts"
@@ -95,6 +102,7 @@ class DisasterAlert(Base):
     location = Column(String, nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    geocell = Column(String(GEOCELL_PRECISION), index=True)  # Geohash of latitude/longitude
     radius_km = Column(Float, default=10.0)  # Affected area radius
     start_time = Column(DateTime)
     end_time = Column(DateTime)
@@ -107,6 +115,12 @@ class DisasterAlert(Base):
     
     # Relationships
     created_by_user = relationship("User", back_populates="disaster_alerts")
+    
+    __table_args__ = (
+        Index("ix_disaster_alerts_active_geocell", "is_active", "geocell"),
+        Index("ix_disaster_alerts_active_type_created", "is_active", "disaster_type", "created_at"),
+        Index("ix_disaster_alerts_active_created_id", "is_active", "created_at", "id"),
+    )
 
 class FoodInventory(Base):
     __tablename__ = "food_inventory"
@@ -120,7 +134,9 @@ class FoodInventory(Base):
     location = Column(String, nullable=False)
     latitude = Column(Float)
     longitude = Column(Float)
+    geocell = Column(String(GEOCELL_PRECISION), index=True)  # Geohash of latitude/longitude
     owner_organization = Column(String)
+    external_id = Column(String)  # Item id in the owner's warehouse system, for feed syncs
     contact_person = Column(String)
     contact_phone = Column(String)
     contact_email = Column(String)
@@ -130,6 +146,15 @@ class FoodInventory(Base):
     storage_requirements = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_food_inventory_available_geocell", "is_available", "geocell"),
+        Index("ix_food_inventory_available_created_id", "is_available", "created_at", "id"),
+        Index("ix_food_inventory_available_expiry", "is_available", "expiry_date"),
+        Index("ix_food_inventory_owner_external", "owner_organization", "external_id", unique=True),
+        # Covers every column the inventory summary reads, so it scans this instead of the table
+        Index("ix_food_inventory_summary", "category", "is_available", "is_emergency_reserve", "expiry_date", "quantity"),
+    )
 
 class VulnerabilityAssessment(Base):
     __tablename__ = "vulnerability_assessments"
@@ -139,6 +164,7 @@ class VulnerabilityAssessment(Base):
     location = Column(String, nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
+    geocell = Column(String(GEOCELL_PRECISION), index=True)  # Geohash of latitude/longitude
     population = Column(Integer)
     
     # Climate vulnerability factors
@@ -175,6 +201,11 @@ class VulnerabilityAssessment(Base):
     
     # Relationships
     assessor = relationship("User", back_populates="vulnerability_assessments")
+    
+    __table_args__ = (
+        Index("ix_vulnerability_assessments_level_geocell", "overall_vulnerability", "geocell"),
+        Index("ix_vulnerability_assessments_date_id", "assessment_date", "id"),
+    )
 
 class FoodDonation(Base):
     __tablename__ = "food_donations"
@@ -242,6 +273,12 @@ class FoodDonation(Base):
     farmer = relationship("User", foreign_keys=[farmer_id], backref="food_donations")
     claimed_by_user = relationship("User", foreign_keys=[claimed_by], backref="claimed_donations")
 
+    __table_args__ = (
+        # Only active donations are summarised, so only they are indexed; is_active makes it covering
+        Index("ix_food_donations_active_status_urgent", "is_active", "status", "is_urgent",
+              sqlite_where=is_active == True, postgresql_where=is_active == True),
+    )
+
 class EmergencyResponse(Base):
     __tablename__ = "emergency_responses"
     
@@ -304,6 +341,12 @@ class FoodDistribution(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_food_distributions_scheduled_id", "scheduled_date", "id"),
+        # Covers every column the distribution summary reads
+        Index("ix_food_distributions_summary", "status", "scheduled_date", "actual_beneficiaries"),
+    )
 
 class NotificationType(str, enum.Enum):
     INFO = "info"
@@ -347,6 +390,10 @@ class Notification(Base):
     
     # Relationships
     target_user = relationship("User", backref="notifications")
+    
+    __table_args__ = (
+        Index("ix_notifications_created_id", "created_at", "id"),
+    )
 
 class EmergencyAlert(Base):
     __tablename__ = "emergency_alerts"
@@ -406,4 +453,8 @@ class SystemEvent(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships  
-    user = relationship("User", backref="system_events")
\ No newline at end of file
+    user = relationship("User", backref="system_events")
+
+# Keep geohash cells of geo-located models in sync with their coordinates
+for _geo_model in (User, DisasterAlert, FoodInventory, VulnerabilityAssessment):
+    track_geocell(_geo_model)
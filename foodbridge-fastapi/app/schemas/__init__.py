@@ -97,6 +97,7 @@ class FoodInventoryBase(BaseModel):
     latitude: Optional[float] = None
     longitude: Optional[float] = None
     owner_organization: Optional[str] = None
+    external_id: Optional[str] = None
     contact_person: Optional[str] = None
     contact_phone: Optional[str] = None
     contact_email: Optional[str] = None
@@ -107,6 +108,10 @@ class FoodInventoryBase(BaseModel):
 class FoodInventoryCreate(FoodInventoryBase):
     pass
 
+class FoodInventoryFeedLine(FoodInventoryBase):
+    """One line of a warehouse inventory feed; the owner comes from the sync request"""
+    external_id: str
+
 class FoodInventoryUpdate(BaseModel):
     quantity: Optional[float] = None
     expiry_date: Optional[datetime] = None
@@ -224,12 +229,20 @@ class DashboardMetrics(BaseModel):
     high_risk_communities: int
     emergency_reserves_low: int
 
+class AllocationAssignment(BaseModel):
+    inventory_id: int
+    source: str
+    kg: float
+    distance_km: float
+
 class ResourceAllocation(BaseModel):
     location: str
     priority: AlertSeverity
     required_food_kg: float
     available_food_kg: float
     gap_kg: float
+    recommended_sources: List[str] = []
+    assignments: List[AllocationAssignment] = []
 
 # Real-time Features Schemas
 class NotificationBase(BaseModel):
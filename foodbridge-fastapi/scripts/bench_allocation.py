@@ -0,0 +1,68 @@
+"""
+Benchmark community-to-source matching for the resource allocation solver.
+Compares the per-community scan (one haversine pass over every food item
+for every community) with candidate_arcs, the KD-tree lookup allocate()
+uses to build the solver's arcs, and checks both find the same nearest
+sources in reach at the same distances.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.allocation import candidate_arcs
+from app.core.config import settings
+from app.core.geo import haversine_km
+import numpy as np
+import random
+import time
+
+CASES = [(500, 5_000), (2_000, 20_000), (5_000, 50_000)]
+RADIUS_KM = 37.5
+K = settings.ALLOCATION_CANDIDATES
+
+
+def random_coords(count):
+    return [(random.uniform(-35.0, -22.0), random.uniform(16.5, 33.0)) for _ in range(count)]
+
+
+def scan_arcs(communities, sources):
+    """Reference implementation: score every source for every community"""
+    source_lats = np.array([lat for lat, _ in sources])
+    source_lngs = np.array([lng for _, lng in sources])
+    arcs = []
+    for community, (lat, lng) in enumerate(communities):
+        distances = haversine_km(lat, lng, source_lats, source_lngs)
+        for source in np.argsort(distances, kind="stable")[:K]:
+            if distances[source] <= RADIUS_KM:
+                arcs.append((int(source), community, float(distances[source])))
+    return arcs
+
+
+def main():
+    random.seed(7)
+    print(f"{'communities':>12} {'sources':>9} {'arcs':>8} {'scan s':>9} {'kd-tree s':>10} {'speedup':>8}")
+    for community_count, source_count in CASES:
+        communities = random_coords(community_count)
+        sources = random_coords(source_count)
+
+        start = time.perf_counter()
+        expected = scan_arcs(communities, sources)
+        scan_seconds = time.perf_counter() - start
+
+        # Same call allocate() makes to build the solver's arcs
+        start = time.perf_counter()
+        arc_source, arc_community, arc_km = candidate_arcs(communities, sources, RADIUS_KM, K)
+        tree_seconds = time.perf_counter() - start
+
+        found = sorted(zip(arc_source.tolist(), arc_community.tolist(), arc_km.tolist()))
+        expected.sort()
+        assert [arc[:2] for arc in expected] == [arc[:2] for arc in found]
+        assert np.allclose([arc[2] for arc in expected], [arc[2] for arc in found])
+
+        print(f"{community_count:>12} {source_count:>9} {len(found):>8} {scan_seconds:>9.3f} {tree_seconds:>10.3f} "
+              f"{scan_seconds / tree_seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark per-request authentication overhead in get_current_user.
+Resolves the same bearer token repeatedly against a throwaway SQLite
+database, once with the token and user caches cleared before every call
+(a JWT decode plus a user query each time, as before caching) and once
+with them warm.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.db.session import engine, AsyncSessionLocal, async_engine
+from app.models import User, UserRole
+from app.core import security
+from app.api.v1 import auth
+import asyncio
+import time
+
+CALLS = 5_000
+
+
+async def resolve(credentials, calls: int, cold: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        if cold:
+            security._token_cache.clear()
+            auth._user_cache.clear()
+        async with AsyncSessionLocal() as db:
+            await auth.get_current_user(credentials, db)
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(email="bench@example.org", username="bench", full_name="Bench User",
+                    hashed_password="x", role=UserRole.NGO))
+        db.commit()
+
+    token = security.create_access_token(data={"sub": "bench"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    await resolve(credentials, 100, cold=True)  # Warm up the connection pool
+    cold_us = await resolve(credentials, CALLS, cold=True)
+    warm_us = await resolve(credentials, CALLS, cold=False)
+    await async_engine.dispose()
+
+    print(f"{'path':>10} {'us/request':>12}")
+    print(f"{'uncached':>10} {cold_us:>12.1f}")
+    print(f"{'cached':>10} {warm_us:>12.1f}")
+    print(f"speedup {cold_us / warm_us:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark realtime delivery across worker processes over the local socket backplane.
+Starts several processes, each with its own ConnectionManager and simulated
+clients. The first one broadcasts a burst of alerts and messages a user
+connected to the last one, then republishes an envelope it already sent
+to check that receivers deliver it only once. Each process reports what
+its clients received and the publish-to-delivery latency.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.backplane import LocalSocketBackplane
+from app.core.websocket import ConnectionManager
+import asyncio
+import json
+import multiprocessing
+import tempfile
+import time
+
+WORKERS = 4
+CLIENTS_PER_WORKER = 500
+MESSAGES = 200
+
+
+class RecordingBackplane(LocalSocketBackplane):
+    """Keeps the first envelope it publishes so it can be sent again"""
+
+    first_envelope = None
+
+    async def publish(self, envelope):
+        if self.first_envelope is None:
+            self.first_envelope = envelope
+        await super().publish(envelope)
+
+
+class SimulatedSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.received.append((time.time(), json.loads(text)))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def worker(index: int, directory: str, ready, go, results):
+    manager = ConnectionManager(backplane=RecordingBackplane(directory))
+    await manager.start()
+    sockets = [SimulatedSocket() for _ in range(CLIENTS_PER_WORKER)]
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, f"worker{index}-{i}", user_id=1000 + index * CLIENTS_PER_WORKER + i)
+    ready.release()
+    while not go.is_set():
+        await asyncio.sleep(0.01)
+
+    if index == 0:
+        for seq in range(MESSAGES):
+            await manager.broadcast({"type": "emergency_alert", "data": {"seq": seq, "sent_at": time.time()}})
+            await asyncio.sleep(0.001)
+        last_user = 1000 + (WORKERS - 1) * CLIENTS_PER_WORKER
+        await manager.send_user_message({"type": "notification", "data": {"sent_at": time.time()}}, last_user)
+        await asyncio.sleep(0.1)
+        await manager.backplane.publish(manager.backplane.first_envelope)  # Redelivery of an envelope already sent
+
+    deadline = time.time() + 10
+    while time.time() < deadline and any(
+        sum(message["type"] == "emergency_alert" for _, message in socket.received) < MESSAGES for socket in sockets
+    ):
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+
+    latencies = sorted(
+        (received_at - message["data"]["sent_at"]) * 1000
+        for socket in sockets for received_at, message in socket.received
+        if message["type"] == "emergency_alert"
+    )
+    stats = manager.stats()["backplane"]
+    results.put({
+        "worker": index,
+        "alerts": min(sum(message["type"] == "emergency_alert" for _, message in socket.received) for socket in sockets),
+        "user_messages": sum(message["type"] == "notification" for socket in sockets for _, message in socket.received),
+        "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        "duplicates": stats["duplicates"],
+    })
+    await manager.stop()
+
+
+def run_worker(*args):
+    asyncio.run(worker(*args))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        ready = multiprocessing.Semaphore(0)
+        go = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=run_worker, args=(index, directory, ready, go, results))
+                     for index in range(WORKERS)]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+        go.set()
+        rows = sorted((results.get(timeout=60) for _ in processes), key=lambda row: row["worker"])
+        for process in processes:
+            process.join()
+
+    print(f"{WORKERS} workers x {CLIENTS_PER_WORKER} clients, {MESSAGES} alerts published by worker 0")
+    print(f"{'worker':>6} {'alerts/client':>13} {'user msgs':>9} {'p50 ms':>8} {'p99 ms':>8} {'dupes dropped':>13}")
+    for row in rows:
+        print(f"{row['worker']:>6} {row['alerts']:>13} {row['user_messages']:>9} {row['p50']:>8.2f} "
+              f"{row['p99']:>8.2f} {row['duplicates']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark WebSocket broadcast delivery latency over simulated connections.
+Connects 10k in-memory sockets to the ConnectionManager, a few of them
+slow or stalled, and measures how long the caller of broadcast() waits and
+how long after the broadcast started each client received an emergency
+alert: first with the old one-after-another loop, then through the
+per-connection queues and writer tasks, and finally with every client
+subscribed to a 50 km radius somewhere in a 10 x 10 degree region so only
+those near the alert receive it.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.subscriptions import GeoArea
+from app.core.websocket import ConnectionManager
+import asyncio
+import json
+import random
+import time
+
+CONNECTIONS = 10_000
+SLOW_CLIENTS = 50  # Take SLOW_MS to accept each message
+SLOW_MS = 20
+STALLED_CLIENTS = 3  # Take STALL_SECONDS, longer than the send timeout
+STALL_SECONDS = 2.5
+SEND_TIMEOUT = 1.0
+REGION = (-5.0, 5.0, 33.0, 43.0)  # min_lat, max_lat, min_lng, max_lng of client areas in the routed run
+AREA_RADIUS_KM = 50
+
+
+class SimulatedSocket:
+    """Stands in for a WebSocket; records when the last message arrived"""
+
+    def __init__(self):
+        self.delay = 0.0
+        self.received_at = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)  # A healthy socket still yields while writing to its transport
+        self.received_at = time.perf_counter()
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def build_manager() -> ConnectionManager:
+    manager = ConnectionManager(send_timeout=SEND_TIMEOUT)
+    sockets = [SimulatedSocket() for _ in range(CONNECTIONS)]
+    for i, socket in enumerate(sockets):
+        await manager.connect(socket, f"conn-{i}")
+    while manager.stats()["delivered"] < CONNECTIONS:  # Wait for the welcome messages
+        await asyncio.sleep(0.01)
+
+    picked = random.sample(sockets, SLOW_CLIENTS + STALLED_CLIENTS)
+    for socket in picked[:SLOW_CLIENTS]:
+        socket.delay = SLOW_MS / 1000
+    for socket in picked[SLOW_CLIENTS:]:
+        socket.delay = STALL_SECONDS
+    for socket in sockets:
+        socket.received_at = None
+    return manager
+
+
+async def sequential_broadcast(manager: ConnectionManager, message: dict):
+    """The broadcast loop as it was: serialize and await each socket in turn"""
+    for connection_id, websocket in manager.active_connections.items():
+        await websocket.send_text(json.dumps(message))
+
+
+async def run(mode: str):
+    manager = await build_manager()
+    sockets = list(manager.active_connections.values())
+    message = {"type": "emergency_alert", "data": {"title": "Flood warning", "severity": "critical"}, "priority": "high"}
+
+    if mode == "routed":
+        min_lat, max_lat, min_lng, max_lng = REGION
+        for connection_id in manager.active_connections:
+            area = GeoArea.from_radius(random.uniform(min_lat, max_lat), random.uniform(min_lng, max_lng), AREA_RADIUS_KM)
+            manager.subscriptions.subscribe(connection_id, area=area)
+
+    targets = {manager.active_connections[connection_id] for connection_id in
+               manager.subscriptions.match("emergency_alert", latitude=0.0, longitude=38.0)}
+
+    start = time.perf_counter()
+    if mode == "sequential":
+        await sequential_broadcast(manager, message)
+    elif mode == "routed":
+        await manager.broadcast(message, latitude=0.0, longitude=38.0)
+    else:
+        await manager.broadcast(message)
+    call = time.perf_counter() - start
+
+    # Wait until every targeted client has the alert or has been evicted
+    while any(socket.received_at is None and socket in targets for socket in manager.active_connections.values()):
+        await asyncio.sleep(0.01)
+
+    latencies = sorted((socket.received_at - start) * 1000 for socket in sockets if socket.received_at is not None)
+    evicted = manager.stats()["evicted_slow"]
+    for connection_id in list(manager.active_connections):
+        manager.disconnect(connection_id)
+    return {
+        "delivered": len(latencies),
+        "call": call * 1000,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+        "evicted": evicted,
+    }
+
+
+async def main():
+    random.seed(7)
+    print(f"{CONNECTIONS} connections, {SLOW_CLIENTS} slow ({SLOW_MS} ms), {STALLED_CLIENTS} stalled ({STALL_SECONDS} s), "
+          f"send timeout {SEND_TIMEOUT} s")
+    print(f"{'mode':>11} {'call ms':>9} {'delivered':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'evicted':>8}")
+    for mode in ("sequential", "queued", "routed"):
+        result = await run(mode)
+        print(f"{mode:>11} {result['call']:>9.2f} {result['delivered']:>9} {result['p50']:>9.1f} "
+              f"{result['p99']:>9.1f} {result['max']:>9.1f} {result['evicted']:>8}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Benchmark ingesting food inventory one record per request versus in bulk.
+Loads the same stock lines into a throwaway SQLite database twice: first
+the way create_food_inventory stores a record (add, commit and refresh per
+row), then through the bulk ingest path, which validates and inserts
+BULK_CHUNK_SIZE rows per executemany and commit.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.db.base import Base
+from app.models import FoodInventory
+from app.schemas import FoodInventoryCreate
+from app.core.bulk import bulk_insert
+from app.core.config import settings
+from app.core.geo import geocell_for
+import asyncio
+import random
+import tempfile
+import time
+
+ROWS = 10_000
+
+
+def stock_lines():
+    return [{
+        "item_name": f"Maize flour {index}",
+        "category": random.choice(["grains", "proteins", "vegetables"]),
+        "quantity": round(random.uniform(10, 1000), 2),
+        "unit": "kg",
+        "location": f"Warehouse {index % 40}",
+        "latitude": random.uniform(-5.0, 5.0),
+        "longitude": random.uniform(33.0, 43.0),
+        "owner_organization": "World Food Programme",
+    } for index in range(ROWS)]
+
+
+async def one_by_one(sessions, lines):
+    async with sessions() as db:
+        for line in lines:
+            item = FoodInventory(**FoodInventoryCreate.model_validate(line).model_dump())
+            db.add(item)
+            await db.commit()
+            await db.refresh(item)
+
+
+async def bulk(sessions, lines):
+    async def records():
+        for line in lines:
+            yield line
+
+    async with sessions() as db:
+        def values(item: FoodInventoryCreate) -> dict:
+            return {**item.model_dump(), "geocell": geocell_for(item.latitude, item.longitude)}
+        result = await bulk_insert(db, FoodInventory, FoodInventoryCreate, records(), values)
+    assert not result.errors
+
+
+async def main():
+    random.seed(9)
+    lines = stock_lines()
+    print(f"{ROWS} stock lines, bulk chunks of {settings.BULK_CHUNK_SIZE}")
+    print(f"{'path':>12} {'seconds':>8} {'rows/s':>9}")
+    for name, ingest in (("one by one", one_by_one), ("bulk", bulk)):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bench.db")
+            Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+            engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+            sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            start = time.perf_counter()
+            await ingest(sessions, lines)
+            elapsed = time.perf_counter() - start
+            async with sessions() as db:
+                assert await db.scalar(select(func.count()).select_from(FoodInventory)) == ROWS
+            await engine.dispose()
+        print(f"{name:>12} {elapsed:>8.2f} {ROWS / elapsed:>9.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
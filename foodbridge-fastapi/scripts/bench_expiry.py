@@ -0,0 +1,130 @@
+"""
+Benchmark expiry queries, the expiry sweeper and the in-memory expiry heap.
+Seeds a throwaway SQLite database with food inventory, a slice of it
+already expired, and times:
+  - the available-and-expiring-within-30-days filter with and without the
+    (is_available, expiry_date) index,
+  - one sweep marking every expired item unavailable in batches,
+  - the next 20 items to expire, from SQL and from the tracker's heap.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import FoodInventory
+from app.core.expiry import ExpiryTracker
+from datetime import datetime, timedelta
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+
+ROWS = 500_000
+EXPIRED_SHARE = 0.1
+BATCH_SIZE = 1000
+HORIZON_DAYS = 30
+NEXT = 20
+REPEATS = 5
+
+
+def seed(engine, now: datetime):
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.bulk_insert_mappings(FoodInventory, [{
+            "item_name": f"Item {index}",
+            "category": "grains",
+            "quantity": random.uniform(1, 1000),
+            "unit": "kg",
+            "expiry_date": now + (timedelta(hours=-random.uniform(1, 24 * 60)) if random.random() < EXPIRED_SHARE
+                                  else timedelta(hours=random.uniform(1, 24 * 730))),
+            "location": "Benchmark warehouse",
+            "nutritional_value": "x" * 200,
+            "is_available": random.random() < 0.9,
+            "created_at": now,
+        } for index in range(ROWS)])
+        db.commit()
+
+
+def timed(run):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+async def async_timed(run):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def expiring_soon_count(engine, now):
+    query = select(func.count()).select_from(FoodInventory).where(
+        FoodInventory.is_available == True,
+        FoodInventory.expiry_date.isnot(None),
+        FoodInventory.expiry_date <= now + timedelta(days=HORIZON_DAYS)
+    )
+    with Session(engine) as db:
+        return timed(lambda: db.scalar(query))
+
+
+async def main():
+    random.seed(3)
+    now = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        seed(engine, now)
+        print(f"{ROWS} inventory items, {EXPIRED_SHARE:.0%} expired, median of {REPEATS} runs")
+
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_food_inventory_available_expiry"))
+        without_ms, without_count = expiring_soon_count(engine, now)
+        with engine.begin() as connection:
+            for index in FoodInventory.__table__.indexes:
+                if index.name == "ix_food_inventory_available_expiry":
+                    index.create(bind=connection)
+        with_ms, with_count = expiring_soon_count(engine, now)
+        assert with_count == without_count
+        print(f"expiring within {HORIZON_DAYS} days ({with_count} items): {without_ms:.1f} ms unindexed, "
+              f"{with_ms:.1f} ms indexed")
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+        tracker = ExpiryTracker(sweep_seconds=300, batch_size=BATCH_SIZE, horizon_days=HORIZON_DAYS)
+        start = time.perf_counter()
+        expired = await tracker.sweep(session_factory)
+        sweep_ms = (time.perf_counter() - start) * 1000
+        print(f"sweep: {expired} items marked unavailable in batches of {BATCH_SIZE} in {sweep_ms:.0f} ms, "
+              f"heap holds {tracker.stats()['tracked']} items")
+        with Session(engine) as db:
+            left = db.scalar(select(func.count()).select_from(FoodInventory).where(
+                FoodInventory.is_available == True, FoodInventory.expiry_date <= now))
+        assert left == 0, f"{left} expired items still available"
+
+        next_query = select(FoodInventory).where(
+            FoodInventory.is_available == True,
+            FoodInventory.expiry_date > datetime.utcnow()
+        ).order_by(FoodInventory.expiry_date, FoodInventory.id).limit(NEXT)
+        async with session_factory() as db:
+            sql_ms, from_sql = await async_timed(lambda: db.scalars(next_query))
+            heap_ms, from_heap = await async_timed(lambda: tracker.expiring_next(db, NEXT))
+        assert [item.id for item in from_sql.all()] == [item["id"] for item in from_heap]
+        print(f"next {NEXT} to expire: {sql_ms:.2f} ms from SQL, {heap_ms:.3f} ms from the heap")
+        await async_engine.dispose()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
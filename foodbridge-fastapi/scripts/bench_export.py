@@ -0,0 +1,117 @@
+"""
+Benchmark streaming exports of a 1M-row food inventory table.
+Seeds a throwaway SQLite database, then runs each export format in a fresh
+process that streams the rows from a server-side cursor and discards the
+encoded chunks, reporting throughput, output size and the process's peak
+RSS. For comparison, the buffered run loads every row and encodes the
+whole result as one JSON document, as a single huge list response would.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert, select
+from app.db.base import Base
+from app.models import FoodInventory
+from app.schemas import FoodInventory as FoodInventorySchema
+from app.core.geo import geocell_for
+from datetime import datetime, timedelta
+import asyncio
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+
+ROWS = 1_000_000
+SEED_BATCH = 50_000
+MODES = ["buffered", "ndjson", "csv", "csv.gz"]
+
+
+def seed(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for start in range(0, ROWS, SEED_BATCH):
+            rows = []
+            for index in range(start, min(start + SEED_BATCH, ROWS)):
+                lat = random.uniform(-5.0, 5.0)
+                lng = random.uniform(33.0, 43.0)
+                rows.append({
+                    "item_name": f"Maize flour {index}",
+                    "category": random.choice(["grains", "proteins", "vegetables", "dairy"]),
+                    "quantity": round(random.uniform(10, 1000), 2),
+                    "unit": "kg",
+                    "expiry_date": now + timedelta(days=random.randint(1, 365)),
+                    "location": f"Warehouse {index % 40}",
+                    "latitude": lat,
+                    "longitude": lng,
+                    "geocell": geocell_for(lat, lng),
+                    "owner_organization": "World Food Programme",
+                    "contact_person": "Amina Odhiambo",
+                    "contact_phone": "+254700000000",
+                    "is_emergency_reserve": index % 10 == 0,
+                    "is_available": True,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            connection.execute(insert(FoodInventory), rows)
+    engine.dispose()
+
+
+async def export(path: str, mode: str) -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from app.core.export import ExportFormat, stream_rows
+    from app.core.serialization import dumps, schema_columns
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    sessions = async_sessionmaker(engine)
+    query = select(*schema_columns(FoodInventory, FoodInventorySchema)).order_by(FoodInventory.id)
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    size = 0
+    if mode == "buffered":
+        async with sessions() as db:
+            result = await db.execute(query)
+            keys = list(result.keys())
+            size = len(dumps([dict(zip(keys, row)) for row in result.all()]))
+    else:
+        async for chunk in stream_rows(sessions, query, ExportFormat(mode)):
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return {
+        "seconds": elapsed,
+        "mb": size / 1024 / 1024,
+        "start_rss_mb": start_rss / 1024,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run(path: str, mode: str, results):
+    results.put(asyncio.run(export(path, mode)))
+
+
+def main():
+    random.seed(1)
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        started = time.perf_counter()
+        seed(path)
+        print(f"Seeded {ROWS} inventory rows in {time.perf_counter() - started:.1f} s")
+        print(f"{'mode':>9} {'seconds':>8} {'rows/s':>9} {'MB out':>8} {'RSS before MB':>14} {'peak RSS MB':>12}")
+        for mode in MODES:
+            results = context.Queue()
+            process = context.Process(target=run, args=(path, mode, results))
+            process.start()
+            result = results.get()
+            process.join()
+            print(f"{mode:>9} {result['seconds']:>8.1f} {ROWS / result['seconds']:>9.0f} {result['mb']:>8.1f} "
+                  f"{result['start_rss_mb']:>14.0f} {result['peak_rss_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark reconciling a 100k-line warehouse feed against food inventory.
+Seeds a throwaway SQLite database with the feed, then compares rewriting
+the organization's inventory from scratch (delete everything, insert the
+feed) with syncing a copy of the feed in which 1% of the lines changed:
+a few hundred updated, some dropped and some new. Each sync is timed
+split into reading and diffing, then applying the writes.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.db.base import Base
+from app.models import FoodInventory
+from app.core.config import settings
+from app.core.geo import geocell_for
+from app.core.inventory_sync import read_feed, plan_sync, apply_sync
+import asyncio
+import random
+import tempfile
+import time
+
+LINES = 100_000
+CHANGED = 0.01
+ORGANIZATION = "Central Warehouse"
+
+
+def feed_lines():
+    return [{
+        "external_id": f"SKU-{index:06d}",
+        "item_name": f"Maize flour {index}",
+        "category": random.choice(["grains", "proteins", "vegetables"]),
+        "quantity": round(random.uniform(10, 1000), 2),
+        "unit": "kg",
+        "location": f"Bay {index % 200}",
+        "latitude": random.uniform(-5.0, 5.0),
+        "longitude": random.uniform(33.0, 43.0),
+        "expiry_date": f"2027-{index % 12 + 1:02d}-15T00:00:00",
+    } for index in range(LINES)]
+
+
+def changed_feed(lines):
+    """Copy of the feed with CHANGED of its lines updated, dropped or added"""
+    lines = [dict(line) for line in lines]
+    count = int(LINES * CHANGED)
+    for line in random.sample(lines, count // 2):
+        line["quantity"] = round(line["quantity"] - 5, 2)
+    dropped = set(random.sample(range(LINES), count // 4))
+    lines = [line for index, line in enumerate(lines) if index not in dropped]
+    for index in range(count // 4):
+        lines.append({**lines[index], "external_id": f"SKU-NEW-{index:04d}"})
+    return lines
+
+
+async def records(lines):
+    for line in lines:
+        yield line
+
+
+async def rewrite(db: AsyncSession, lines):
+    """Today's alternative: drop the organization's rows and insert the whole feed again"""
+    feed = await read_feed(records(lines), ORGANIZATION)
+    await db.execute(delete(FoodInventory).where(FoodInventory.owner_organization == ORGANIZATION))
+    rows = [{**line, "geocell": geocell_for(line["latitude"], line["longitude"])} for line in feed.lines.values()]
+    for start in range(0, len(rows), settings.BULK_CHUNK_SIZE):
+        await db.execute(insert(FoodInventory), rows[start:start + settings.BULK_CHUNK_SIZE])
+    await db.commit()
+    return len(rows) + LINES
+
+
+async def sync(db: AsyncSession, lines, dry_run=False):
+    start = time.perf_counter()
+    feed = await read_feed(records(lines), ORGANIZATION)
+    plan = await plan_sync(db, ORGANIZATION, feed)
+    planned = time.perf_counter()
+    if not dry_run:
+        await apply_sync(db, plan)
+    counts = plan.counts()
+    return planned - start, time.perf_counter() - planned, counts
+
+
+async def main():
+    random.seed(2)
+    lines = feed_lines()
+    changed = changed_feed(lines)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async with sessions() as db:
+            await sync(db, lines)  # Initial load
+
+        print(f"{LINES} feed lines, {CHANGED:.0%} changed")
+        print(f"{'run':>16} {'plan s':>7} {'write s':>8} {'total s':>8} {'inserted':>9} {'updated':>8} {'deleted':>8}")
+        async with sessions() as db:
+            start = time.perf_counter()
+            await rewrite(db, lines)
+            elapsed = time.perf_counter() - start
+            print(f"{'full rewrite':>16} {'':>7} {'':>8} {elapsed:>8.2f} {LINES:>9} {'':>8} {LINES:>8}")
+        for name, feed, dry_run in (("unchanged feed", lines, False), ("1% dry run", changed, True),
+                                    ("1% changed", changed, False), ("same again", changed, False)):
+            async with sessions() as db:
+                plan_s, write_s, counts = await sync(db, feed, dry_run)
+            print(f"{name:>16} {plan_s:>7.2f} {write_s:>8.2f} {plan_s + write_s:>8.2f} {counts['inserted']:>9} "
+                  f"{counts['updated']:>8} {counts['deleted']:>8}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
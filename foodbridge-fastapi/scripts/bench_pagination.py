@@ -0,0 +1,84 @@
+"""
+Benchmark deep pages of the alert list with skip offsets and with cursors.
+Seeds a throwaway SQLite database with disaster alerts and times fetching
+a 100-row page at increasing depths, once with the old skip offset and
+once with the cursor the page before it returned.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import DisasterAlert, DisasterType, AlertSeverity
+from app.core.pagination import paginate, next_page
+from datetime import datetime, timedelta
+import random
+import statistics
+import tempfile
+import time
+
+ROWS = 200_000
+PAGE = 100
+DEPTHS = [0, 1_000, 10_000, 100_000, 190_000]
+REPEATS = 5
+
+
+def seed(engine):
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    rows = [{
+        "title": f"Alert {index}",
+        "description": "Benchmark alert",
+        "disaster_type": random.choice(list(DisasterType)),
+        "severity": random.choice(list(AlertSeverity)),
+        "latitude": random.uniform(-5, 5),
+        "longitude": random.uniform(33, 43),
+        "location": "Benchmark",
+        "is_active": True,
+        # Timestamps collide in pairs so the id tiebreak is exercised
+        "created_at": now - timedelta(seconds=index // 2),
+    } for index in range(ROWS)]
+    with Session(engine) as db:
+        db.bulk_insert_mappings(DisasterAlert, rows)
+        db.commit()
+
+
+def page_query(cursor=None, skip=0):
+    query = select(DisasterAlert.id, DisasterAlert.created_at).where(DisasterAlert.is_active == True)
+    return paginate(query, DisasterAlert.created_at, DisasterAlert.id, cursor, skip, PAGE)
+
+
+def timed(db, query):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        rows = db.execute(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    random.seed(5)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seed(engine)
+        print(f"{ROWS} alerts, {PAGE}-row pages, median of {REPEATS} runs")
+        print(f"{'depth':>8} {'skip ms':>9} {'cursor ms':>10} {'same rows':>10}")
+        with Session(engine) as db:
+            for depth in DEPTHS:
+                skip_ms, skip_rows = timed(db, page_query(skip=depth))
+                cursor = None
+                if depth:
+                    # The cursor the page ending just before depth would have returned
+                    previous = db.execute(page_query(skip=depth - PAGE)).all()
+                    _, cursor = next_page(previous, PAGE, "created_at")
+                cursor_ms, cursor_rows = timed(db, page_query(cursor=cursor))
+                print(f"{depth:>8} {skip_ms:>9.2f} {cursor_ms:>10.2f} {str(skip_rows == cursor_rows):>10}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
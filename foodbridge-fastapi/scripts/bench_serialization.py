@@ -0,0 +1,145 @@
+"""
+Benchmark rendering a 10k-row list response, from query to JSON bytes.
+Seeds a throwaway SQLite database with food inventory and builds the
+/food/inventory body four ways: ORM objects through FastAPI's own
+response_model validation and JSONResponse (the old path), ORM objects
+through a TypeAdapter's dump_json, and the selected columns as plain rows
+encoded with orjson or with the json module. Every body is checked
+against the old path's output.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from typing import List
+from app.db.base import Base
+from app.models import FoodInventory
+from app.schemas import FoodInventory as FoodInventorySchema
+from app.core import serialization
+from app.core.geo import geocell_for
+from datetime import datetime, timedelta
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+
+ROWS = 10_000
+REPEATS = 5
+
+
+def seed(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    rows = []
+    for index in range(ROWS):
+        lat = random.uniform(-5.0, 5.0)
+        lng = random.uniform(33.0, 43.0)
+        rows.append({
+            "item_name": f"Maize flour {index}",
+            "category": random.choice(["grains", "proteins", "vegetables", "dairy"]),
+            "quantity": round(random.uniform(10, 1000), 2),
+            "unit": "kg",
+            "expiry_date": now + timedelta(days=random.randint(1, 365)),
+            "location": f"Warehouse {index % 40}",
+            "latitude": lat,
+            "longitude": lng,
+            "geocell": geocell_for(lat, lng),
+            "owner_organization": "World Food Programme",
+            "contact_person": "Amina Odhiambo",
+            "contact_phone": "+254700000000",
+            "contact_email": "stores@example.org",
+            "is_emergency_reserve": index % 10 == 0,
+            "is_available": True,
+            "nutritional_value": '{"kcal": 364}',
+            "storage_requirements": "Dry, off the floor",
+            "created_at": now - timedelta(minutes=index),
+            "updated_at": now,
+        })
+    with Session(engine) as db:
+        db.bulk_insert_mappings(FoodInventory, rows)
+        db.commit()
+    engine.dispose()
+
+
+def query():
+    return select(FoodInventory).where(FoodInventory.is_available == True).order_by(FoodInventory.created_at.desc()).limit(ROWS)
+
+
+field = create_response_field(name="Response_list_food_inventory", type_=List[FoodInventorySchema])
+adapter = TypeAdapter(List[FoodInventorySchema])
+
+
+async def response_model_path(db: AsyncSession):
+    items = (await db.scalars(query())).all()
+    fetched = time.perf_counter()
+    content = await serialize_response(field=field, response_content=items)
+    return fetched, JSONResponse(content).body
+
+
+async def type_adapter_path(db: AsyncSession):
+    items = (await db.scalars(query())).all()
+    fetched = time.perf_counter()
+    return fetched, adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+async def rows_orjson_path(db: AsyncSession):
+    rows = await serialization.fetch_rows(db, query(), FoodInventorySchema)
+    fetched = time.perf_counter()
+    return fetched, serialization.FastJSONResponse(rows).body
+
+
+async def rows_json_path(db: AsyncSession):
+    rows = await serialization.fetch_rows(db, query(), FoodInventorySchema)
+    fetched = time.perf_counter()
+    orjson, serialization.orjson = serialization.orjson, None
+    try:
+        return fetched, serialization.FastJSONResponse(rows).body
+    finally:
+        serialization.orjson = orjson
+
+
+async def main():
+    random.seed(3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        seed(path)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        paths = [("response_model", response_model_path), ("TypeAdapter json", type_adapter_path),
+                 ("rows + orjson", rows_orjson_path), ("rows + json", rows_json_path)]
+        if serialization.orjson is None:
+            paths.remove(("rows + orjson", rows_orjson_path))
+
+        expected = None
+        print(f"{ROWS} inventory rows, median of {REPEATS} runs")
+        print(f"{'path':>16} {'fetch ms':>9} {'encode ms':>10} {'total ms':>9} {'KB':>7}")
+        for name, render in paths:
+            fetch, encode = [], []
+            for _ in range(REPEATS):
+                async with AsyncSession(engine) as db:
+                    start = time.perf_counter()
+                    fetched, body = await render(db)
+                    done = time.perf_counter()
+                fetch.append((fetched - start) * 1000)
+                encode.append((done - fetched) * 1000)
+            if expected is None:
+                expected = json.loads(body)
+            elif json.loads(body) != expected:
+                print(f"{name}: body differs from the response_model path")
+            fetch_ms, encode_ms = statistics.median(fetch), statistics.median(encode)
+            print(f"{name:>16} {fetch_ms:>9.1f} {encode_ms:>10.1f} {fetch_ms + encode_ms:>9.1f} {len(body) / 1024:>7.0f}")
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Benchmark radius lookups with and without the geocell index.
+Seeds growing numbers of food inventory rows across South Africa into a
+throwaway SQLite database and times the bounding-box scan against the
+geocell range query used by the API.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, and_
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import FoodInventory
+from app.core.geo import within_radius, geocell_for
+import random
+import tempfile
+import time
+
+SIZES = [10_000, 50_000, 200_000]
+QUERIES = 200
+RADIUS_KM = 25
+
+
+def seed(db: Session, count: int):
+    """Insert random inventory rows between -22 and -35 latitude"""
+    rows = []
+    for index in range(count):
+        lat = random.uniform(-35.0, -22.0)
+        lng = random.uniform(16.5, 33.0)
+        rows.append({
+            "item_name": f"Item {index}",
+            "quantity": random.uniform(10, 1000),
+            "unit": "kg",
+            "location": "Benchmark",
+            "latitude": lat,
+            "longitude": lng,
+            "geocell": geocell_for(lat, lng),
+            "is_available": True
+        })
+    db.bulk_insert_mappings(FoodInventory, rows)
+    db.commit()
+
+
+def time_queries(db: Session, points, clause_for) -> float:
+    start = time.perf_counter()
+    for lat, lng in points:
+        db.query(FoodInventory.id).filter(clause_for(lat, lng)).all()
+    return (time.perf_counter() - start) / len(points) * 1000
+
+
+def bbox_clause(lat, lng):
+    return and_(
+        FoodInventory.latitude.between(lat - RADIUS_KM/111, lat + RADIUS_KM/111),
+        FoodInventory.longitude.between(lng - RADIUS_KM/111, lng + RADIUS_KM/111)
+    )
+
+
+def geocell_clause(lat, lng):
+    return within_radius(FoodInventory, lat, lng, RADIUS_KM)
+
+
+def main():
+    random.seed(42)
+    points = [(random.uniform(-34.0, -23.0), random.uniform(18.0, 32.0)) for _ in range(QUERIES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+
+        seeded = 0
+        print(f"{'rows':>10} {'bbox ms':>10} {'geocell ms':>12} {'speedup':>8}")
+        with Session(engine) as db:
+            for size in SIZES:
+                seed(db, size - seeded)
+                seeded = size
+
+                bbox_ms = time_queries(db, points, bbox_clause)
+                geocell_ms = time_queries(db, points, geocell_clause)
+                print(f"{size:>10} {bbox_ms:>10.3f} {geocell_ms:>12.3f} {bbox_ms / geocell_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
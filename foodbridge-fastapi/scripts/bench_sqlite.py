@@ -0,0 +1,132 @@
+"""
+Benchmark mixed read/write throughput on SQLite with and without tuned mode.
+Runs concurrent sessions against a throwaway database seeded with food
+inventory. Readers run the radius and listing queries used by the API and
+writers insert notifications and adjust stock, first on the default pooled
+engine and then on the WAL writer/reader split used when SQLITE_TUNED is set.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.db.base import Base
+from app.db.session import create_sqlite_engines, create_routing_sessionmaker
+from app.models import FoodInventory, Notification
+from app.core.geo import within_radius, geocell_for
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+
+ROWS = 20_000
+WORKERS = 32
+OPERATIONS = 1_500
+WRITE_RATIOS = [0.05, 0.2, 0.5]
+
+
+def seed(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    rows = []
+    for index in range(ROWS):
+        lat = random.uniform(-35.0, -22.0)
+        lng = random.uniform(16.5, 33.0)
+        rows.append({
+            "item_name": f"Item {index}",
+            "quantity": random.uniform(10, 1000),
+            "unit": "kg",
+            "location": "Benchmark",
+            "latitude": lat,
+            "longitude": lng,
+            "geocell": geocell_for(lat, lng),
+            "is_available": True
+        })
+    with Session(engine) as db:
+        db.bulk_insert_mappings(FoodInventory, rows)
+        db.commit()
+    engine.dispose()
+
+
+async def read(db: AsyncSession):
+    lat, lng = random.uniform(-34.0, -23.0), random.uniform(18.0, 32.0)
+    if random.random() < 0.5:
+        await db.scalars(select(FoodInventory).where(within_radius(FoodInventory, lat, lng, 25)))
+    else:
+        await db.scalars(select(FoodInventory).order_by(FoodInventory.created_at.desc()).limit(50))
+
+
+async def write(db: AsyncSession):
+    db.add(Notification(title="Stock update", message="Benchmark write", category="system"))
+    await db.execute(
+        update(FoodInventory)
+        .where(FoodInventory.id == random.randint(1, ROWS))
+        .values(quantity=FoodInventory.quantity - 1)
+    )
+    await db.commit()
+
+
+async def run(session_factory, write_ratio: float):
+    """Run OPERATIONS mixed operations over WORKERS concurrent sessions"""
+    remaining = iter(range(OPERATIONS))
+    latencies = {"read": [], "write": []}
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            kind = "write" if random.random() < write_ratio else "read"
+            start = time.perf_counter()
+            try:
+                async with session_factory() as db:
+                    await (write(db) if kind == "write" else read(db))
+            except Exception:
+                errors += 1
+            latencies[kind].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(WORKERS)))
+    return OPERATIONS / (time.perf_counter() - start), latencies, errors
+
+
+def p95(values):
+    return sorted(values)[int(len(values) * 0.95)] if values else 0.0
+
+
+async def main():
+    random.seed(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        seed(template)
+
+        print(f"{'mode':>8} {'writes':>7} {'ops/s':>9} {'read p95 ms':>12} {'write p95 ms':>13} {'errors':>7}")
+        for write_ratio in WRITE_RATIOS:
+            for mode in ("default", "tuned"):
+                path = os.path.join(tmp, f"{mode}.db")
+                shutil.copy(template, path)
+                url = f"sqlite+aiosqlite:///{path}"
+
+                if mode == "tuned":
+                    writer, reader = create_sqlite_engines(url)
+                    session_factory = create_routing_sessionmaker(writer, reader)
+                    engines = [writer, reader]
+                else:
+                    engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=10, max_overflow=20)
+                    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+                    engines = [engine]
+
+                throughput, latencies, errors = await run(session_factory, write_ratio)
+                for engine in engines:
+                    await engine.dispose()
+
+                print(f"{mode:>8} {write_ratio:>7.0%} {throughput:>9.1f} {p95(latencies['read']):>12.1f} "
+                      f"{p95(latencies['write']):>13.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+"""
+Benchmark the inventory, distribution and donation summary endpoints' queries.
+Seeds a throwaway SQLite database and computes each summary twice: with the
+separate count queries the endpoints used to run, and with the single-pass
+conditional aggregates from app.core.aggregation. Statements are counted on
+the engine; the script fails if a single-pass summary issues more than one
+or if the two ways disagree.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, create_engine, event, func, select
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models import FoodInventory, FoodDistribution, FoodDonation, DonationStatus, ProduceType
+from app.core.aggregation import (
+    inventory_summary_query, inventory_summary, distribution_summary_query, donation_summary_query
+)
+from datetime import datetime, timedelta
+import random
+import statistics
+import tempfile
+import time
+
+INVENTORY_ROWS = 200_000
+DISTRIBUTION_ROWS = 50_000
+DONATION_ROWS = 50_000
+REPEATS = 5
+CATEGORIES = ["grains", "proteins", "vegetables", "fruits", "dairy", "oils", None]
+DISTRIBUTION_STATUSES = ["planned", "ongoing", "completed", "cancelled"]
+
+
+def seed(engine, now: datetime):
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.bulk_insert_mappings(FoodInventory, [{
+            "item_name": f"Item {index}",
+            "category": random.choice(CATEGORIES),
+            "quantity": random.uniform(1, 1000),
+            "unit": "kg",
+            "expiry_date": now + timedelta(days=random.randint(-30, 365)) if random.random() < 0.8 else None,
+            "location": "Benchmark warehouse",
+            "nutritional_value": "x" * 200,
+            "storage_requirements": "Cool and dry",
+            "is_emergency_reserve": random.random() < 0.1,
+            "is_available": random.random() < 0.85,
+            "created_at": now,
+        } for index in range(INVENTORY_ROWS)])
+        db.bulk_insert_mappings(FoodDistribution, [{
+            "event_name": f"Distribution {index}",
+            "location": "Benchmark",
+            "latitude": 0.0,
+            "longitude": 37.0,
+            "scheduled_date": now + timedelta(days=random.randint(-400, 60)),
+            "actual_beneficiaries": random.randint(0, 500),
+            "food_items_distributed": "[]",
+            "status": random.choice(DISTRIBUTION_STATUSES),
+        } for index in range(DISTRIBUTION_ROWS)])
+        db.bulk_insert_mappings(FoodDonation, [{
+            "title": f"Donation {index}",
+            "description": "Benchmark produce",
+            "produce_type": random.choice(list(ProduceType)),
+            "quantity": random.uniform(1, 500),
+            "unit": "kg",
+            "farm_location": "Benchmark farm",
+            "latitude": 0.0,
+            "longitude": 37.0,
+            "farmer_id": 1,
+            "status": random.choice(list(DonationStatus)),
+            "is_active": random.random() < 0.9,
+            "is_urgent": random.random() < 0.2,
+        } for index in range(DONATION_ROWS)])
+        db.commit()
+
+
+def separate_inventory(db, now):
+    """The inventory summary as it was: three counts, a group-by and an expiry count"""
+    available = FoodInventory.is_available == True
+    category_stats = db.execute(select(
+        FoodInventory.category,
+        func.sum(FoodInventory.quantity).label("total_quantity"),
+        func.count(FoodInventory.id).label("item_count")
+    ).where(available).group_by(FoodInventory.category).order_by(FoodInventory.category)).all()
+    return {
+        "total_items": db.scalar(select(func.count()).select_from(FoodInventory)),
+        "available_items": db.scalar(select(func.count()).select_from(FoodInventory).where(available)),
+        "emergency_reserves": db.scalar(select(func.count()).select_from(FoodInventory).where(
+            FoodInventory.is_emergency_reserve == True)),
+        "expiring_soon_30_days": db.scalar(select(func.count()).select_from(FoodInventory).where(and_(
+            FoodInventory.expiry_date.isnot(None),
+            FoodInventory.expiry_date <= now + timedelta(days=30),
+            available
+        ))),
+        "category_breakdown": [
+            {"category": stat.category or "uncategorized", "total_quantity": float(stat.total_quantity or 0),
+             "item_count": stat.item_count}
+            for stat in category_stats
+        ]
+    }
+
+
+def separate_distribution(db, now):
+    """The distribution summary as it was: five queries"""
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "total_events": db.scalar(select(func.count()).select_from(FoodDistribution)),
+        "completed_events": db.scalar(select(func.count()).select_from(FoodDistribution).where(
+            FoodDistribution.status == "completed")),
+        "upcoming_events": db.scalar(select(func.count()).select_from(FoodDistribution).where(and_(
+            FoodDistribution.scheduled_date >= now,
+            FoodDistribution.status.in_(["planned", "ongoing"])
+        ))),
+        "total_beneficiaries_served": int(db.scalar(select(func.sum(FoodDistribution.actual_beneficiaries))) or 0),
+        "events_this_month": db.scalar(select(func.count()).select_from(FoodDistribution).where(
+            FoodDistribution.scheduled_date >= month_start)),
+    }
+
+
+def separate_donation(db, now):
+    """The donation summary as it was: five counts over active donations"""
+    def count(*conditions):
+        return db.scalar(select(func.count()).select_from(FoodDonation).where(FoodDonation.is_active == True, *conditions))
+    return {
+        "total_donations": count(),
+        "available_donations": count(FoodDonation.status == DonationStatus.AVAILABLE),
+        "claimed_donations": count(FoodDonation.status == DonationStatus.CLAIMED),
+        "collected_donations": count(FoodDonation.status == DonationStatus.COLLECTED),
+        "urgent_donations": count(FoodDonation.status == DonationStatus.AVAILABLE, FoodDonation.is_urgent == True),
+    }
+
+
+def single_inventory(db, now):
+    return inventory_summary(db.execute(inventory_summary_query(now)).all())
+
+
+def single_distribution(db, now):
+    summary = db.execute(distribution_summary_query(now)).one()._asdict()
+    summary["total_beneficiaries_served"] = int(summary["total_beneficiaries_served"])
+    return summary
+
+
+def single_donation(db, now):
+    return db.execute(donation_summary_query()).one()._asdict()
+
+
+def comparable(value):
+    """Round floats so sums accumulated in a different order compare equal"""
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, dict):
+        return {key: comparable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [comparable(item) for item in value]
+    return value
+
+
+def timed(db, now, summarize, statements):
+    timings = []
+    for _ in range(REPEATS):
+        statements.clear()
+        start = time.perf_counter()
+        result = summarize(db, now)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(statements), result
+
+
+def main():
+    random.seed(9)
+    now = datetime.utcnow()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        seed(engine, now)
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        print(f"{INVENTORY_ROWS} inventory items, {DISTRIBUTION_ROWS} distributions, {DONATION_ROWS} donations, "
+              f"median of {REPEATS} runs")
+        print(f"{'summary':>13} {'separate ms':>12} {'queries':>8} {'single ms':>10} {'queries':>8}")
+        with Session(engine) as db:
+            for name, separate, single in (
+                ("inventory", separate_inventory, single_inventory),
+                ("distribution", separate_distribution, single_distribution),
+                ("donation", separate_donation, single_donation),
+            ):
+                separate_ms, separate_queries, expected = timed(db, now, separate, statements)
+                single_ms, single_queries, result = timed(db, now, single, statements)
+                assert single_queries == 1, f"{name} summary ran {single_queries} queries"
+                assert comparable(result) == comparable(expected), f"{name} summary differs:\n{result}\n{expected}"
+                print(f"{name:>13} {separate_ms:>12.1f} {separate_queries:>8} {single_ms:>10.1f} {single_queries:>8}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark frames and bytes sent to one WebSocket client during a message storm.
+Pushes a burst of system updates, notifications and disaster alerts through
+the ConnectionManager to a simulated client, once per combination of
+batching window and encoding, and counts the frames the client receives and
+their size. Compressed sizes replay the frames through raw deflate with the
+context kept between messages, as permessage-deflate does (window and memory
+settings follow the websockets server defaults).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.websocket import ConnectionManager, msgpack
+import asyncio
+import random
+import time
+import zlib
+
+STORM_SECONDS = 2.0
+MESSAGES_PER_SECOND = 500
+MODES = [(0, "json"), (50, "json"), (0, "msgpack"), (50, "msgpack")]
+
+
+class SimulatedSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.frames.append(text.encode())
+
+    async def send_bytes(self, data: bytes):
+        self.frames.append(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def deflated_size(frames) -> int:
+    compressor = zlib.compressobj(wbits=-12, memLevel=5)
+    total = 0
+    for frame in frames:
+        # Each message ends with a sync flush, whose trailing 00 00 ff ff isn't sent
+        total += len(compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+    return total
+
+
+def storm_message(index: int) -> dict:
+    kind = random.choices(["system_update", "notification", "disaster_alert"], weights=[6, 3, 1])[0]
+    if kind == "system_update":
+        return {"type": kind, "data": {"event_type": "inventory_changed", "data_type": "food_inventory",
+                                       "record_id": index, "change_type": "update",
+                                       "description": f"Stock level updated for item {index}"}}
+    if kind == "notification":
+        return {"type": kind, "data": {"id": index, "title": "Distribution scheduled",
+                                       "message": f"Food distribution #{index} scheduled near Kisumu",
+                                       "type": "info", "priority": "medium", "category": "distribution"}}
+    return {"type": kind, "data": {"id": index, "title": "Flash flood warning", "description": "River levels rising fast",
+                                   "disaster_type": "flood", "severity": "high", "location": "Budalangi",
+                                   "latitude": round(random.uniform(-1, 1), 5), "longitude": round(random.uniform(33, 35), 5),
+                                   "created_by": "responder", "created_by_role": "emergency_responder"}}
+
+
+async def run(batch_ms: int, encoding: str):
+    random.seed(11)
+    manager = ConnectionManager()
+    socket = SimulatedSocket()
+    await manager.connect(socket, "client", batch_ms=batch_ms, encoding=encoding)
+    await asyncio.sleep(0.3)
+    socket.frames.clear()
+
+    total = int(STORM_SECONDS * MESSAGES_PER_SECOND)
+    interval = 1 / MESSAGES_PER_SECOND
+    start = time.perf_counter()
+    for index in range(total):
+        await manager.broadcast(storm_message(index))
+        # Pace the storm in real time, sleeping only once the schedule is ahead
+        ahead = start + (index + 1) * interval - time.perf_counter()
+        if ahead > 0:
+            await asyncio.sleep(ahead)
+    await asyncio.sleep(0.3)
+    elapsed = time.perf_counter() - start
+    manager.disconnect("client")
+
+    raw = sum(len(frame) for frame in socket.frames)
+    return {
+        "frames_per_s": len(socket.frames) / elapsed,
+        "bytes_per_msg": raw / total,
+        "deflated_per_msg": deflated_size(socket.frames) / total,
+    }
+
+
+async def main():
+    print(f"{int(STORM_SECONDS * MESSAGES_PER_SECOND)} messages at {MESSAGES_PER_SECOND}/s to one client")
+    print(f"{'batch ms':>8} {'encoding':>8} {'frames/s':>9} {'bytes/msg':>10} {'deflated/msg':>13}")
+    for batch_ms, encoding in MODES:
+        if encoding == "msgpack" and msgpack is None:
+            print(f"{batch_ms:>8} {encoding:>8} {'(msgpack not installed)':>34}")
+            continue
+        result = await run(batch_ms, encoding)
+        print(f"{batch_ms:>8} {encoding:>8} {result['frames_per_s']:>9.0f} {result['bytes_per_msg']:>10.1f} "
+              f"{result['deflated_per_msg']:>13.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Concurrent load test against a running API server.
+Fires a fixed number of GET requests over a pool of concurrent workers and
+reports throughput and latency percentiles per endpoint, so the sync and
+async database layers can be compared under the same traffic.
+
+    uvicorn app.main:app --workers 1
+    python scripts/load_test.py --concurrency 50 --requests 2000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/disasters/alerts",
+    "/api/v1/disasters/stats/overview",
+    "/api/v1/food/inventory",
+    "/api/v1/food/search/nearby-resources?lat=-26.2041&lng=28.0473&radius_km=50",
+    "/api/v1/disasters/alerts/nearby/-26.2041/28.0473",
+    "/api/v1/food/stats/inventory-summary",
+    "/api/v1/vulnerability/assessments",
+    "/api/v1/analytics/dashboard",
+]
+
+
+async def run_path(client: httpx.AsyncClient, path: str, total: int, concurrency: int):
+    """Issue `total` requests to one path with at most `concurrency` in flight"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the API server")
+    parser.add_argument("--concurrency", type=int, default=50, help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--token", help="Bearer token for authenticated endpoints")
+    parser.add_argument("paths", nargs="*", default=DEFAULT_PATHS, help="Endpoint paths to load")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    print(f"{'endpoint':<70} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=60) as client:
+        for path in args.paths:
+            latencies, errors, elapsed = await run_path(client, path, args.requests, args.concurrency)
+            print(f"{path[:70]:<70} {len(latencies) / elapsed:>8.1f} "
+                  f"{statistics.median(latencies):>8.1f} {percentile(latencies, 0.95):>8.1f} "
+                  f"{percentile(latencies, 0.99):>8.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before anything imports its settings
+_database_dir = tempfile.mkdtemp(prefix="foodbridge-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_database_dir, 'test.db')}"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.security import create_access_token
+from app.db import events
+from app.db.session import SessionLocal, engine, async_engine, async_read_engine
+from app.models import Base, User, UserRole
+
+
+@pytest.fixture
+def client():
+    """Test client without lifespan events, so no background sweeper runs alongside a test"""
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    """Sync session on the test database for seeding rows"""
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_tables():
+    yield
+    # Pooled aiosqlite connections are tied to the event loop that opened them
+    async_engine.sync_engine.dispose()
+    async_read_engine.sync_engine.dispose()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    # Tell the caches built from committed writes that every table was emptied
+    wiped = events.ChangeSet()
+    wiped.bulk_tables.update(table.name for table in Base.metadata.sorted_tables)
+    for listener in events._commit_listeners:
+        listener(wiped)
+
+
+@pytest.fixture
+def admin_headers(db):
+    """Authorization header of an admin user"""
+    admin = User(username="admin", email="admin@example.org", hashed_password="-", full_name="Admin", role=UserRole.ADMIN)
+    db.add(admin)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': admin.username})}"}
+
+
+@pytest.fixture
+def statements():
+    """SQL statements the API's async engines send to the database while the test runs"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engines = {async_engine.sync_engine, async_read_engine.sync_engine}
+    for sync_engine in engines:
+        event.listen(sync_engine, "before_cursor_execute", record)
+    yield executed
+    for sync_engine in engines:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+
+class FakeWebSocket:
+    """Stands in for a client socket, keeping the messages written to it"""
+
+    def __init__(self):
+        self.frames = []
+        self.closed = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        self.frames.append(frame)
+
+    async def send_bytes(self, frame):
+        self.frames.append(frame)
+
+    async def close(self, code=1000):
+        self.closed = code
+
+    def messages(self, message_type=None):
+        """Decoded messages received so far, optionally only those of one type"""
+        decoded = []
+        for frame in self.frames:
+            payload = json.loads(frame)
+            decoded.extend(payload if isinstance(payload, list) else [payload])
+        return [message for message in decoded if message_type is None or message.get("type") == message_type]
+
+
+@pytest.fixture
+def fake_websocket():
+    return FakeWebSocket
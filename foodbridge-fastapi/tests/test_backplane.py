@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from app.core.backplane import InMemoryBackplane
+from app.core.websocket import ConnectionManager
+
+
+async def settle():
+    """Let the dispatcher, publisher and writer tasks run"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def workers():
+    """Two managers sharing a hub, standing in for two worker processes"""
+    hub = []
+    managers = [ConnectionManager(backplane=InMemoryBackplane(hub)) for _ in range(2)]
+    for manager in managers:
+        await manager.start()
+    yield managers
+    for manager in managers:
+        for connection_id in list(manager.active_connections):
+            manager.disconnect(connection_id)
+        await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_clients_of_every_worker_once(workers, fake_websocket):
+    worker_a, worker_b = workers
+    on_a, on_b = fake_websocket(), fake_websocket()
+    await worker_a.connect(on_a, "on-a")
+    await worker_b.connect(on_b, "on-b")
+
+    await worker_a.send_system_update({"event_type": "refresh"})
+    await settle()
+
+    assert len(on_a.messages("system_update")) == 1
+    assert len(on_b.messages("system_update")) == 1
+    assert worker_a.stats()["backplane"]["published"] == 1
+    assert worker_a.stats()["backplane"]["received"] == 0
+    assert worker_b.stats()["backplane"]["received"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redelivered_envelopes_are_dropped(workers, fake_websocket):
+    worker_a, worker_b = workers
+    on_a, on_b = fake_websocket(), fake_websocket()
+    await worker_a.connect(on_a, "on-a")
+    await worker_b.connect(on_b, "on-b")
+
+    # A peer on the hub that records what is published, like a broker echoing it back
+    published = []
+    await InMemoryBackplane(worker_a.backplane.hub).start(published.append)
+
+    await worker_a.send_system_update({"event_type": "refresh"})
+    await settle()
+    for envelope in published:
+        worker_a._receive(envelope)
+        worker_b._receive(envelope)
+    await settle()
+
+    assert len(published) == 1
+    assert len(on_a.messages("system_update")) == 1
+    assert len(on_b.messages("system_update")) == 1
+    assert worker_a.stats()["backplane"]["duplicates"] == 1
+    assert worker_b.stats()["backplane"]["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_user_message_reaches_the_worker_holding_the_user(workers, fake_websocket):
+    worker_a, worker_b = workers
+    socket = fake_websocket()
+    await worker_b.connect(socket, "user-7", user_id=7)
+
+    await worker_a.send_user_message({"type": "notification", "data": {"title": "Hello"}}, 7)
+    await settle()
+
+    assert len(socket.messages("notification")) == 1
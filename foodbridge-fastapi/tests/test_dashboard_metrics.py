@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+import pytest
+from app.core.dashboard import dashboard_metrics, compute_dashboard_counts
+from app.db.session import AsyncSessionLocal
+from app.models import FoodInventory, FoodDistribution, FoodDonation, ProduceType
+from app.schemas import DashboardMetrics
+
+
+@pytest.mark.asyncio
+async def test_materialized_metrics_match_a_recompute():
+    async with AsyncSessionLocal() as db:
+        await dashboard_metrics.rebuild(db)
+
+        rice = FoodInventory(item_name="Rice", quantity=500, unit="kg", location="Depot A")
+        reserve = FoodInventory(item_name="Beans", quantity=40, unit="kg", location="Depot B", is_emergency_reserve=True)
+        oil = FoodInventory(item_name="Oil", quantity=30, unit="litres", location="Depot B")
+        db.add_all([rice, reserve, oil])
+        await db.commit()
+
+        db.add(FoodDonation(
+            title="Tomatoes", produce_type=ProduceType.VEGETABLES, quantity=50, unit="kg",
+            farm_location="Farm", latitude=-1.0, longitude=36.0, farmer_id=1
+        ))
+        upcoming = FoodDistribution(
+            event_name="Market day", location="Square", latitude=-1.0, longitude=36.0,
+            scheduled_date=datetime.utcnow() + timedelta(days=3), status="planned"
+        )
+        finished = FoodDistribution(
+            event_name="School drive", location="School", latitude=-1.0, longitude=36.0,
+            scheduled_date=datetime.utcnow() + timedelta(days=5), status="planned"
+        )
+        db.add_all([upcoming, finished])
+        await db.commit()
+
+        rice.quantity = 350
+        reserve.quantity = 150
+        oil.unit = "kg"
+        finished.status = "completed"
+        await db.commit()
+
+        await db.delete(rice)
+        await db.commit()
+
+        # Every write above is a row change, so the store never needed a rebuild
+        assert not dashboard_metrics.is_stale
+        materialized = (await dashboard_metrics.snapshot(db)).dict()
+        counts, scheduled = await compute_dashboard_counts(db)
+
+    recomputed = DashboardMetrics(upcoming_distributions=len(scheduled), **counts).dict()
+    assert materialized == pytest.approx(recomputed)
+    assert recomputed["total_food_inventory_kg"] == pytest.approx(180)
+    assert recomputed["upcoming_distributions"] == 1
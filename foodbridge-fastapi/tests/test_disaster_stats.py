@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from app.models import DisasterAlert, DisasterType, AlertSeverity
+
+
+def add_alert(db, disaster_type, is_active=True, age_days=0):
+    db.add(DisasterAlert(
+        title=f"{disaster_type.value} alert",
+        disaster_type=disaster_type,
+        severity=AlertSeverity.MEDIUM,
+        location="Test district",
+        latitude=-1.28,
+        longitude=36.82,
+        is_active=is_active,
+        created_at=datetime.utcnow() - timedelta(days=age_days)
+    ))
+
+
+def test_stats_overview_runs_one_statement(client, db, statements):
+    add_alert(db, DisasterType.FLOOD)
+    add_alert(db, DisasterType.FLOOD, age_days=10)
+    add_alert(db, DisasterType.DROUGHT, is_active=False)
+    add_alert(db, DisasterType.WILDFIRE, is_active=False, age_days=30)
+    db.commit()
+
+    response = client.get("/api/v1/disasters/stats/overview")
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    stats = response.json()
+    assert stats["total_alerts"] == 4
+    assert stats["active_alerts"] == 2
+    assert stats["recent_alerts_7_days"] == 2
+    assert stats["alerts_by_type"]["flood"] == 2
+    assert stats["alerts_by_type"]["drought"] == 0
+
+
+def test_stats_overview_with_no_alerts(client, statements):
+    response = client.get("/api/v1/disasters/stats/overview")
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    stats = response.json()
+    assert stats["total_alerts"] == 0
+    assert set(stats["alerts_by_type"]) == {disaster_type.value for disaster_type in DisasterType}
+    assert not any(stats["alerts_by_type"].values())
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from app.core.dashboard import dashboard_metrics
+from app.core.expiry import ExpiryTracker
+from app.db.session import AsyncSessionLocal
+from app.models import FoodInventory
+
+
+def add_item(db, name, expires_in_days):
+    db.add(FoodInventory(
+        item_name=name,
+        quantity=10,
+        unit="kg",
+        location="Depot",
+        expiry_date=datetime.utcnow() + timedelta(days=expires_in_days)
+    ))
+
+
+@pytest.mark.asyncio
+async def test_sweep_without_expired_items_writes_nothing(db, statements):
+    add_item(db, "Rice", 30)
+    db.commit()
+    async with AsyncSessionLocal() as session:
+        await dashboard_metrics.rebuild(session)
+    statements.clear()
+
+    tracker = ExpiryTracker(sweep_seconds=300, batch_size=2, horizon_days=60)
+    assert await tracker.sweep(AsyncSessionLocal) == 0
+
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE")]
+    # No bulk write reached the commit listeners, so the dashboard wasn't invalidated
+    assert not dashboard_metrics.is_stale
+    assert tracker.stats()["tracked"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_retires_expired_items_in_batches(db):
+    for index in range(5):
+        add_item(db, f"Milk {index}", -index - 1)
+    add_item(db, "Rice", 30)
+    db.commit()
+
+    tracker = ExpiryTracker(sweep_seconds=300, batch_size=2, horizon_days=60)
+    assert await tracker.sweep(AsyncSessionLocal) == 5
+
+    available = db.scalars(select(FoodInventory.item_name).where(FoodInventory.is_available == True)).all()
+    assert available == ["Rice"]
@@ -0,0 +1,80 @@
+import json
+import pytest
+from sqlalchemy import select
+from app.core.security import create_access_token
+from app.models import FoodInventory, User, UserRole
+
+SYNC_URL = "/api/v1/food/inventory/sync"
+
+
+def headers_for(db, username, organization, role=UserRole.NGO):
+    db.add(User(username=username, email=f"{username}@example.org", hashed_password="-",
+                full_name=username, role=role, organization=organization))
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+def feed(*external_ids):
+    return json.dumps([
+        {"external_id": external_id, "item_name": f"Item {external_id}", "quantity": 10, "unit": "kg", "location": "Depot"}
+        for external_id in external_ids
+    ])
+
+
+@pytest.fixture
+def stocked(db):
+    db.add_all([
+        FoodInventory(item_name=f"Item {external_id}", quantity=10, unit="kg", location="Depot",
+                      owner_organization="Depot Co", external_id=external_id)
+        for external_id in ("a", "b")
+    ])
+    db.commit()
+
+
+def available(db):
+    db.expire_all()
+    return sorted(db.scalars(select(FoodInventory.external_id).where(FoodInventory.is_available == True)).all())
+
+
+def test_members_sync_their_own_organization(client, db, stocked):
+    headers = headers_for(db, "depot", "Depot Co")
+
+    response = client.post(SYNC_URL, params={"owner_organization": "Depot Co"}, content=feed("b", "c"), headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 1
+    assert response.json()["deleted"] == 1
+    assert available(db) == ["b", "c"]
+
+
+def test_other_organizations_cannot_sync(client, db, stocked):
+    headers = headers_for(db, "rival", "Rival Co")
+
+    response = client.post(SYNC_URL, params={"owner_organization": "Depot Co"}, content=feed("c"), headers=headers)
+
+    assert response.status_code == 403
+    assert available(db) == ["a", "b"]
+
+
+def test_admins_can_sync_any_organization(client, db, stocked, admin_headers):
+    response = client.post(SYNC_URL, params={"owner_organization": "Depot Co"}, content=feed("a", "b"), headers=admin_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["unchanged"] == 2
+
+
+def test_empty_feed_is_refused_without_allow_empty(client, db, stocked):
+    headers = headers_for(db, "depot", "Depot Co")
+
+    refused = client.post(SYNC_URL, params={"owner_organization": "Depot Co"}, content="[]", headers=headers)
+    assert refused.status_code == 400
+    assert available(db) == ["a", "b"]
+
+    preview = client.post(SYNC_URL, params={"owner_organization": "Depot Co", "dry_run": True}, content="[]", headers=headers)
+    assert preview.status_code == 200
+    assert preview.json()["deleted"] == 2
+    assert available(db) == ["a", "b"]
+
+    confirmed = client.post(SYNC_URL, params={"owner_organization": "Depot Co", "allow_empty": True}, content="[]", headers=headers)
+    assert confirmed.status_code == 200
+    assert available(db) == []
@@ -0,0 +1,105 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.models import DisasterAlert, DisasterType, AlertSeverity, User, UserRole
+
+START = datetime(2024, 1, 1)
+
+
+def alert_values(index, created_at):
+    return {
+        "title": f"Alert {index}",
+        "disaster_type": DisasterType.FLOOD,
+        "severity": AlertSeverity.LOW,
+        "location": "Test district",
+        "latitude": -1.28,
+        "longitude": 36.82,
+        "is_active": True,
+        "created_at": created_at
+    }
+
+
+@pytest.fixture
+def alerts(db):
+    """Seven alerts, two of them sharing a timestamp; ids newest first"""
+    times = [START + timedelta(hours=hours) for hours in (0, 1, 2, 2, 3, 4, 5)]
+    rows = [DisasterAlert(**alert_values(index, created_at)) for index, created_at in enumerate(times)]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)]
+
+
+def walk(client, url, limit, headers=None):
+    """Follow X-Next-Cursor from the first page to the last; return the pages of ids"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_alert_pages_follow_the_cursor(client, alerts):
+    pages = walk(client, "/api/v1/disasters/alerts", limit=3)
+
+    assert pages == [alerts[0:3], alerts[3:6], alerts[6:7]]
+
+
+def test_last_full_page_has_no_cursor(client, alerts):
+    response = client.get("/api/v1/disasters/alerts", params={"limit": len(alerts)})
+
+    assert [row["id"] for row in response.json()] == alerts
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_skip_still_pages_by_offset(client, alerts):
+    response = client.get("/api/v1/disasters/alerts", params={"skip": 2, "limit": 3})
+
+    assert [row["id"] for row in response.json()] == alerts[2:5]
+    assert NEXT_CURSOR_HEADER in response.headers
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor!",
+    urlsafe_b64encode(b'{"id": 3}').decode(),
+    urlsafe_b64encode(b'["yesterday", 3]').decode(),
+    urlsafe_b64encode(b"[null]").decode(),
+])
+def test_tampered_cursor_is_rejected(client, alerts, cursor):
+    response = client.get("/api/v1/disasters/alerts", params={"cursor": cursor})
+
+    assert response.status_code == 400
+
+
+def test_rows_without_a_sort_key_are_paged_last(client, db, alerts):
+    # Raw inserts skip the ORM default, leaving created_at NULL
+    undated = [
+        db.execute(insert(DisasterAlert).values(**alert_values(f"undated {index}", None))).inserted_primary_key[0]
+        for index in range(3)
+    ]
+    db.commit()
+
+    pages = walk(client, "/api/v1/disasters/alerts", limit=4)
+
+    assert [alert_id for page in pages for alert_id in page] == alerts + sorted(undated, reverse=True)
+    assert pages[1] == alerts[4:] + [max(undated)]
+
+
+def test_user_pages_follow_the_cursor(client, db, admin_headers):
+    for index in range(4):
+        db.add(User(
+            username=f"user{index}", email=f"user{index}@example.org", hashed_password="-",
+            full_name=f"User {index}", role=UserRole.DONOR, created_at=START + timedelta(days=index)
+        ))
+    db.commit()
+    expected = [row["id"] for row in client.get("/api/v1/auth/users", headers=admin_headers).json()]
+
+    pages = walk(client, "/api/v1/auth/users", limit=2, headers=admin_headers)
+
+    assert len(expected) == 5
+    assert pages == [expected[0:2], expected[2:4], expected[4:5]]
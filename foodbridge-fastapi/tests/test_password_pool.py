@@ -0,0 +1,20 @@
+import pytest
+from app.core.security import _run_password_job, password_pool_stats
+
+
+def reject_hash(password):
+    raise ValueError("malformed hash")
+
+
+@pytest.mark.asyncio
+async def test_failed_jobs_are_not_counted_as_completed():
+    before = password_pool_stats()
+
+    assert await _run_password_job(str.upper, "secret") == "SECRET"
+    with pytest.raises(ValueError):
+        await _run_password_job(reject_hash, "secret")
+
+    after = password_pool_stats()
+    assert after["completed"] - before["completed"] == 1
+    assert after["failed"] - before["failed"] == 1
+    assert after["in_flight"] == 0
@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import and_, func, select
+from app.core.aggregation import donation_summary_query
+from app.db.session import AsyncSessionLocal
+from app.models import FoodInventory, FoodDistribution, FoodDonation, DonationStatus, ProduceType
+
+
+@pytest.fixture
+def now():
+    return datetime.utcnow()
+
+
+@pytest.fixture
+def inventory(db, now):
+    for index, (category, quantity, expires_in, reserve, available) in enumerate([
+        ("grains", 500.0, 200, False, True),
+        ("grains", 120.5, 10, True, True),
+        ("proteins", 80.0, 5, False, False),
+        ("proteins", 60.25, None, True, True),
+        (None, 15.0, 20, False, True),
+        ("dairy", 40.0, -3, False, False),
+    ]):
+        db.add(FoodInventory(
+            item_name=f"Item {index}",
+            category=category,
+            quantity=quantity,
+            unit="kg",
+            location="Depot",
+            expiry_date=now + timedelta(days=expires_in) if expires_in is not None else None,
+            is_emergency_reserve=reserve,
+            is_available=available
+        ))
+    db.commit()
+
+
+@pytest.fixture
+def distributions(db, now):
+    for index, (days, status, beneficiaries) in enumerate([
+        (3, "planned", None),
+        (10, "ongoing", 20),
+        (-2, "completed", 150),
+        (-90, "completed", 300),
+        (5, "cancelled", 0),
+    ]):
+        db.add(FoodDistribution(
+            event_name=f"Distribution {index}",
+            location="Square",
+            latitude=-1.0,
+            longitude=36.0,
+            scheduled_date=now + timedelta(days=days),
+            actual_beneficiaries=beneficiaries,
+            status=status
+        ))
+    db.commit()
+
+
+@pytest.fixture
+def donations(db):
+    for index, (status, active, urgent) in enumerate([
+        (DonationStatus.AVAILABLE, True, True),
+        (DonationStatus.AVAILABLE, True, False),
+        (DonationStatus.CLAIMED, True, True),
+        (DonationStatus.COLLECTED, True, False),
+        (DonationStatus.AVAILABLE, False, True),
+        (DonationStatus.EXPIRED, True, False),
+    ]):
+        db.add(FoodDonation(
+            title=f"Donation {index}",
+            produce_type=ProduceType.GRAINS,
+            quantity=10,
+            unit="kg",
+            farm_location="Farm",
+            latitude=-1.0,
+            longitude=36.0,
+            farmer_id=1,
+            status=status,
+            is_active=active,
+            is_urgent=urgent
+        ))
+    db.commit()
+
+
+def separate_inventory(db, now):
+    """The inventory summary as it was: three counts, a group-by and an expiry count"""
+    available = FoodInventory.is_available == True
+    category_stats = db.execute(select(
+        FoodInventory.category,
+        func.sum(FoodInventory.quantity).label("total_quantity"),
+        func.count(FoodInventory.id).label("item_count")
+    ).where(available).group_by(FoodInventory.category).order_by(FoodInventory.category)).all()
+    return {
+        "total_items": db.scalar(select(func.count()).select_from(FoodInventory)),
+        "available_items": db.scalar(select(func.count()).select_from(FoodInventory).where(available)),
+        "emergency_reserves": db.scalar(select(func.count()).select_from(FoodInventory).where(
+            FoodInventory.is_emergency_reserve == True)),
+        "expiring_soon_30_days": db.scalar(select(func.count()).select_from(FoodInventory).where(and_(
+            FoodInventory.expiry_date.isnot(None),
+            FoodInventory.expiry_date <= now + timedelta(days=30),
+            available
+        ))),
+        "category_breakdown": [
+            {"category": stat.category or "uncategorized", "total_quantity": float(stat.total_quantity or 0),
+             "item_count": stat.item_count}
+            for stat in category_stats
+        ]
+    }
+
+
+def separate_distribution(db, now):
+    """The distribution summary as it was: five queries"""
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        "total_events": db.scalar(select(func.count()).select_from(FoodDistribution)),
+        "completed_events": db.scalar(select(func.count()).select_from(FoodDistribution).where(
+            FoodDistribution.status == "completed")),
+        "upcoming_events": db.scalar(select(func.count()).select_from(FoodDistribution).where(and_(
+            FoodDistribution.scheduled_date >= now,
+            FoodDistribution.status.in_(["planned", "ongoing"])
+        ))),
+        "total_beneficiaries_served": int(db.scalar(select(func.sum(FoodDistribution.actual_beneficiaries))) or 0),
+        "events_this_month": db.scalar(select(func.count()).select_from(FoodDistribution).where(
+            FoodDistribution.scheduled_date >= month_start)),
+    }
+
+
+def separate_donation(db):
+    """The donation summary as it was: five counts over active donations"""
+    def count(*conditions):
+        return db.scalar(select(func.count()).select_from(FoodDonation).where(FoodDonation.is_active == True, *conditions))
+    return {
+        "total_donations": count(),
+        "available_donations": count(FoodDonation.status == DonationStatus.AVAILABLE),
+        "claimed_donations": count(FoodDonation.status == DonationStatus.CLAIMED),
+        "collected_donations": count(FoodDonation.status == DonationStatus.COLLECTED),
+        "urgent_donations": count(FoodDonation.status == DonationStatus.AVAILABLE, FoodDonation.is_urgent == True),
+    }
+
+
+def test_inventory_summary_matches_separate_queries(client, db, now, inventory, statements):
+    response = client.get("/api/v1/food/stats/inventory-summary")
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    assert response.json() == separate_inventory(db, now)
+
+
+def test_distribution_summary_matches_separate_queries(client, db, now, distributions, statements):
+    response = client.get("/api/v1/food/stats/distribution-summary")
+
+    assert response.status_code == 200
+    assert len(statements) == 1, statements
+    assert response.json() == separate_distribution(db, now)
+
+
+def test_summaries_of_empty_tables(client, statements):
+    inventory = client.get("/api/v1/food/stats/inventory-summary").json()
+    distribution = client.get("/api/v1/food/stats/distribution-summary").json()
+
+    assert len(statements) == 2, statements
+    assert inventory["total_items"] == 0
+    assert inventory["category_breakdown"] == []
+    assert distribution["total_beneficiaries_served"] == 0
+
+
+@pytest.mark.asyncio
+async def test_donation_summary_matches_separate_queries(db, donations, statements):
+    async with AsyncSessionLocal() as session:
+        summary = (await session.execute(donation_summary_query())).one()._asdict()
+
+    assert len(statements) == 1, statements
+    assert summary == separate_donation(db)
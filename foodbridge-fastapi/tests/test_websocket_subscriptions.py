@@ -0,0 +1,65 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.core import websocket
+from app.core.backplane import InMemoryBackplane
+from app.core.websocket import ConnectionManager, handle_websocket_message
+
+NAIROBI = {"latitude": -1.29, "longitude": 36.82}
+LAGOS = {"latitude": 6.52, "longitude": 3.38}
+
+
+async def settle():
+    """Let the dispatcher and writer tasks run"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest_asyncio.fixture
+async def manager(monkeypatch):
+    connections = ConnectionManager(backplane=InMemoryBackplane())
+    monkeypatch.setattr(websocket, "manager", connections)
+    yield connections
+    for connection_id in list(connections.active_connections):
+        connections.disconnect(connection_id)
+
+
+async def alert(manager, location):
+    await manager.broadcast({"type": "disaster_alert", "data": {"title": "Flood"}}, **location)
+
+
+@pytest.mark.asyncio
+async def test_subscribe_notifications_scopes_alerts_to_the_area(manager, fake_websocket):
+    socket = fake_websocket()
+    await manager.connect(socket, "dashboard")
+    await handle_websocket_message(socket, "dashboard", json.dumps({
+        "type": "subscribe_notifications",
+        "radius": {**NAIROBI, "radius_km": 100}
+    }))
+
+    await alert(manager, LAGOS)
+    await alert(manager, NAIROBI)
+    await manager.broadcast({"type": "new_food_donation", "data": {}}, **NAIROBI)
+    await settle()
+
+    confirmed = socket.messages("subscription_confirmed")
+    assert confirmed and "disaster_alert" in confirmed[0]["topics"]
+    assert len(socket.messages("disaster_alert")) == 1
+    assert socket.messages("new_food_donation") == []
+
+
+@pytest.mark.asyncio
+async def test_subscribe_notifications_drops_other_topics(manager, fake_websocket):
+    subscribed, unsubscribed = fake_websocket(), fake_websocket()
+    await manager.connect(subscribed, "subscribed")
+    await manager.connect(unsubscribed, "unsubscribed")
+    await handle_websocket_message(subscribed, "subscribed", json.dumps({"type": "subscribe_notifications"}))
+
+    await manager.broadcast({"type": "donation_claimed", "data": {}})
+    await alert(manager, LAGOS)
+    await settle()
+
+    assert subscribed.messages("donation_claimed") == []
+    assert len(subscribed.messages("disaster_alert")) == 1
+    assert len(unsubscribed.messages("donation_claimed")) == 1